@@ -0,0 +1,76 @@
+"""
+Per-call overhead of FakeTensor primitives on small arrays.
+
+For tiny inputs the math is negligible, so the time per call is almost
+entirely dispatch: argument coercion, backend lookup, recording and
+wrapping. Each op is timed in three settings:
+
+  • numpy    – the bare backend call, as a floor
+  • eager    – no tape active (inference)
+  • record   – inside a tape, with the input registered as a leaf
+
+Run:
+    python benchmarks/op_overhead.py [--size 4] [--number 20000]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+import faketensor as ft
+from faketensor.ndarray import array
+from faketensor.src.base import tape
+
+
+def _cases(x, w):
+    xn, wn = x.np, w.np
+    return [
+        ("add",       lambda: ft.add(x, w),        lambda: np.add(xn, wn)),
+        ("multiply",  lambda: ft.multiply(x, w),   lambda: np.multiply(xn, wn)),
+        ("divide",    lambda: ft.divide(x, w),     lambda: np.divide(xn, wn)),
+        ("matmul",    lambda: ft.matmul(x, w),     lambda: np.matmul(xn, wn)),
+        ("log",       lambda: ft.log(x),           lambda: np.log(np.maximum(xn, 1e-12))),
+        ("sum",       lambda: ft.sum(x, axis=0),   lambda: np.sum(xn, axis=0)),
+        ("reshape",   lambda: ft.reshape(x, (-1,)), lambda: np.reshape(xn, (-1,))),
+        ("x * w + x", lambda: x * w + x,           lambda: xn * wn + xn),
+    ]
+
+
+def _time(fn, number):
+    # best of 5, in microseconds per call
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def run(size=4, number=20000):
+    rng = np.random.default_rng(0)
+    x = array(rng.uniform(0.5, 1.5, size=(size, size)))
+    w = array(rng.uniform(0.5, 1.5, size=(size, size)))
+
+    rows = []
+    for name, op, ref in _cases(x, w):
+        t_np = _time(ref, number)
+        t_eager = _time(op, number)
+        with tape() as t:
+            t.track(x)
+            t.track(w)
+            t_rec = _time(op, number // 4)
+            assert len(t), "nothing was recorded"
+            t.clear()
+        rows.append((name, t_np, t_eager, t_rec))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'op':<10} {'numpy':>9} {'eager':>9} {'record':>9}   (us/call, {args.size}x{args.size})")
+    for name, t_np, t_eager, t_rec in run(args.size, args.number):
+        print(f"{name:<10} {t_np:9.2f} {t_eager:9.2f} {t_rec:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Benchmark suite for FakeTensor.
+
+Covers the paths where regressions tend to hide:
+
+  • primitive.*   – single-primitive calls, small (dispatch-bound) and
+                    large (math-bound), eager and while recording
+  • mlp.*         – forward + backward of a `Cell` via `value_and_grad`
+  • reduce.*      – sum/mean/max over several `axis`/`keepdims`, with grad
+  • pytree.*      – `flatten_pytree` / `unflatten_pytree` on deep trees
+  • optim.*       – `SGD.update` on many parameters
+
+Usage (from the repository root, with faketensor importable):
+
+    python benchmarks/suite.py run [-k PATTERN] [--out results.json]
+    python benchmarks/suite.py save [-k PATTERN]        # refresh baseline.json
+    python benchmarks/suite.py compare [results.json] [--threshold 0.15]
+
+`compare` runs the suite (unless a results file is given) and prints the
+ratio to the stored baseline for every benchmark; it exits with status 1
+if any benchmark got slower than the threshold. Baselines are machine
+specific: refresh `baseline.json` on the machine you compare on.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import faketensor as ft
+from faketensor.ndarray import array
+from faketensor.nn import Cell, Variable
+from faketensor.optimizers import SGD
+from faketensor.src.base import tape
+from faketensor.src.tree_util import flatten_pytree, unflatten_pytree
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> setup(); setup returns the zero-argument callable to time
+BENCHMARKS = {}
+
+
+def bench(name):
+    def deco(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return deco
+
+
+def _rng():
+    return np.random.default_rng(0)
+
+
+# ----------------------------------------------------------------------
+# Primitives
+# ----------------------------------------------------------------------
+
+_SIZES = {"small": (4, 4), "large": (1000, 1000)}
+
+_UNARY = {"log": ft.log, "abs": ft.abs}
+_BINARY = {"add": ft.add, "multiply": ft.multiply, "divide": ft.divide}
+
+
+def _recorded(call, *leaves):
+    def run():
+        with tape() as t:
+            for leaf in leaves:
+                t.track(leaf)
+            call()
+        assert len(t), "nothing was recorded"
+    return run
+
+
+def _register_primitives():
+    for size, shape in _SIZES.items():
+        for op_name, op in _BINARY.items():
+            def setup(op=op, shape=shape):
+                rng = _rng()
+                x = array(rng.uniform(0.5, 1.5, size=shape))
+                y = array(rng.uniform(0.5, 1.5, size=shape))
+                return lambda: op(x, y)
+
+            def setup_rec(op=op, shape=shape):
+                rng = _rng()
+                x = array(rng.uniform(0.5, 1.5, size=shape))
+                y = array(rng.uniform(0.5, 1.5, size=shape))
+                return _recorded(lambda: op(x, y), x, y)
+
+            bench(f"primitive.{op_name}.{size}")(setup)
+            bench(f"primitive.{op_name}.{size}.record")(setup_rec)
+
+        for op_name, op in _UNARY.items():
+            def setup(op=op, shape=shape):
+                x = array(_rng().uniform(0.5, 1.5, size=shape))
+                return lambda: op(x)
+
+            bench(f"primitive.{op_name}.{size}")(setup)
+
+    for size, n in (("small", 4), ("large", 256)):
+        def setup(n=n):
+            rng = _rng()
+            a = array(rng.normal(size=(n, n)))
+            b = array(rng.normal(size=(n, n)))
+            return lambda: ft.matmul(a, b)
+
+        bench(f"primitive.matmul.{size}")(setup)
+
+
+_register_primitives()
+
+
+# ----------------------------------------------------------------------
+# MLP forward + backward
+# ----------------------------------------------------------------------
+
+class _MLP(Cell):
+    def __init__(self, sizes, rng):
+        super().__init__()
+        self.n = len(sizes) - 1
+        for i, (a, b) in enumerate(zip(sizes[:-1], sizes[1:])):
+            setattr(self, f"w{i}", Variable(rng.normal(size=(a, b)) / np.sqrt(a)))
+            setattr(self, f"b{i}", Variable(np.zeros(b)))
+
+    def call(self, x):
+        for i in range(self.n):
+            x = x @ getattr(self, f"w{i}") + getattr(self, f"b{i}")
+            if i < self.n - 1:
+                x = ft.clip(x, 0.0, 1e9)
+        return x
+
+
+def _mlp_setup(batch, sizes):
+    rng = _rng()
+    model = _MLP(sizes, rng)
+    x = array(rng.normal(size=(batch, sizes[0])))
+    y = array(rng.normal(size=(batch, sizes[-1])))
+
+    def loss(m, x, y):
+        return ft.mean((m(x) - y) ** 2.0)
+
+    step = ft.value_and_grad(loss)
+    return lambda: step(model, x, y)
+
+
+bench("mlp.value_and_grad.small")(lambda: _mlp_setup(32, (64, 128, 10)))
+bench("mlp.value_and_grad.large")(lambda: _mlp_setup(256, (512, 1024, 1024, 10)))
+
+
+# ----------------------------------------------------------------------
+# Reductions
+# ----------------------------------------------------------------------
+
+_REDUCTIONS = {"sum": ft.sum, "mean": ft.mean, "max": ft.max}
+_AXES = {"all": None, "0": 0, "1": 1, "01": (0, 1)}
+
+
+def _register_reductions():
+    for r_name, r in _REDUCTIONS.items():
+        for a_name, axis in _AXES.items():
+            for keepdims in (False, True):
+                def setup(r=r, axis=axis, keepdims=keepdims):
+                    x = array(_rng().normal(size=(256, 256)))
+                    g = ft.grad(lambda x: ft.sum(r(x, axis=axis, keepdims=keepdims)))
+                    return lambda: g(x)
+
+                kd = ".keepdims" if keepdims else ""
+                bench(f"reduce.{r_name}.axis{a_name}{kd}")(setup)
+
+
+_register_reductions()
+
+
+# ----------------------------------------------------------------------
+# Pytrees
+# ----------------------------------------------------------------------
+
+def _deep_tree(depth, width, leaf):
+    if depth == 0:
+        return leaf
+    kids = [_deep_tree(depth - 1, width, leaf) for _ in range(width)]
+    return {"a": kids, "b": tuple(kids[:1]), "c": leaf} if depth % 2 else kids
+
+
+@bench("pytree.flatten.deep")
+def _pytree_flatten():
+    tree = _deep_tree(10, 2, array(np.zeros(2)))
+    return lambda: flatten_pytree(tree)
+
+
+@bench("pytree.unflatten.deep")
+def _pytree_unflatten():
+    leaves, treedef = flatten_pytree(_deep_tree(10, 2, array(np.zeros(2))))
+    return lambda: unflatten_pytree(leaves, treedef)
+
+
+# ----------------------------------------------------------------------
+# Optimizers
+# ----------------------------------------------------------------------
+
+class _ManyParams(Cell):
+    def __init__(self, n, rng):
+        super().__init__()
+        for i in range(n):
+            setattr(self, f"p{i}", Variable(rng.normal(size=(16,))))
+
+
+@bench("optim.sgd_momentum.update.500params")
+def _sgd_update():
+    rng = _rng()
+    model = _ManyParams(500, rng)
+    grads = [rng.normal(size=(16,)) * 1e-3 for _ in range(500)]
+    opt = SGD(model, lr=1e-3, momentum=0.9)
+    return lambda: opt.update(grads)
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def _time(fn, repeat=7, min_time=0.05):
+    """Median and min seconds per call, auto-ranging the loop count like timeit."""
+    fn()   # warm up (imports, caches)
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= min_time / 5 or number >= 1 << 20:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return statistics.median(samples), min(samples), number
+
+
+def _select(pattern):
+    names = sorted(BENCHMARKS)
+    if pattern:
+        names = [n for n in names if fnmatch.fnmatch(n, pattern) or pattern in n]
+    return names
+
+
+def run(pattern=None, verbose=True):
+    """Run the selected benchmarks; returns {name: {median, min, number}} in us."""
+    results = {}
+    for name in _select(pattern):
+        median, best, number = _time(BENCHMARKS[name]())
+        results[name] = {"median": median * 1e6, "min": best * 1e6, "number": number}
+        if verbose:
+            print(f"{name:<44} {median * 1e6:12.2f} us", flush=True)
+    return results
+
+
+def _meta():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def _write(path, results):
+    with open(path, "w") as f:
+        json.dump({"meta": _meta(), "results": results}, f, indent=1, sort_keys=True)
+
+
+def _read(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(base, new, threshold=0.15):
+    """Print per-benchmark ratios new/base; returns the names that regressed."""
+    regressed = []
+    print(f"{'benchmark':<44} {'base us':>10} {'new us':>10} {'ratio':>7}")
+    for name in sorted(new):
+        if name not in base:
+            print(f"{name:<44} {'-':>10} {new[name]['median']:10.2f} {'new':>7}")
+            continue
+        b, n = base[name]["median"], new[name]["median"]
+        ratio = n / b if b else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  slower"
+            regressed.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{name:<44} {b:10.2f} {n:10.2f} {ratio:7.2f}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FakeTensor benchmark suite")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="run benchmarks")
+    p_run.add_argument("-k", dest="pattern", help="substring or glob to select benchmarks")
+    p_run.add_argument("--out", help="write results to this JSON file")
+
+    p_save = sub.add_parser("save", help="run and store as the baseline")
+    p_save.add_argument("-k", dest="pattern")
+    p_save.add_argument("--baseline", default=BASELINE)
+
+    p_cmp = sub.add_parser("compare", help="compare against the baseline")
+    p_cmp.add_argument("results", nargs="?", help="results JSON (default: run now)")
+    p_cmp.add_argument("-k", dest="pattern")
+    p_cmp.add_argument("--baseline", default=BASELINE)
+    p_cmp.add_argument("--threshold", type=float, default=0.15,
+                       help="relative slowdown reported as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        results = run(args.pattern)
+        if args.out:
+            _write(args.out, results)
+        return 0
+
+    if args.cmd == "save":
+        results = run(args.pattern)
+        if args.pattern and os.path.exists(args.baseline):
+            merged = _read(args.baseline)
+            merged.update(results)
+            results = merged
+        _write(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    base = _read(args.baseline)
+    if args.results:
+        new = _read(args.results)
+    else:
+        new = run(args.pattern, verbose=False)
+    regressed = compare(base, new, args.threshold)
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,19 @@
 
 # 3. Rest of imports (order no longer matters)
 from .src.autograd.backward import grad, value_and_grad
+from .src.autograd.forward import jvp
+from .src.autograd.hessian import hvp, hessian_diag
 from .src import autograd
 from .src.base import function, no_record
+from .src.jit import jit
+from .src.vmap import vmap
+from .src.profiler import profile
+from .src.autograd.stats import memory_stats
+from .src.amp import autocast, LossScaler
+from .src.lazy import lazy, materialize
+from .src.dtype_policy import (
+    dtype_policy, set_default_dtype, get_default_dtype, DTypePromotionError
+)
 from .src.functions import *
 from .src._typing import Array
 from .src.DType import (
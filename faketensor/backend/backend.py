@@ -53,3 +53,18 @@ def xp():
 
 def get_device():
     return _device
+
+
+def apply(fn, *args, **kwargs):
+    """
+    Call `fn(lib, *args, **kwargs)` with the active array module `lib`.
+
+    For backend routines that are not a single function of the array
+    module, e.g. ones that fill a fresh buffer in place. While a `jit` or
+    `vmap` trace is active the whole call is recorded as one op; recording
+    its steps one by one would lose the in-place writes.
+    """
+    trace = getattr(_xp, "_trace", None)
+    if trace is None:
+        return fn(_xp, *args, **kwargs)
+    return trace.call(fn, (trace.lib,) + args, kwargs)
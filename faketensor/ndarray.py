@@ -1,2 +1,5 @@
 from .src.ndarray.base import array
-from .src.ndarray.array_creation import ones, ones_like, zeros, zeros_like, full, full_like
\ No newline at end of file
+from .src.ndarray.array_creation import (
+    ones, ones_like, zeros, zeros_like, full, full_like, from_dlpack,
+    memmap, load,
+)
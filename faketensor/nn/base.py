@@ -160,11 +160,11 @@ class Cell:
 
         Notes:
             This method performs an in-place data copy into each parameter’s
-            internal array buffer (`old.np[...] = new.np`).
+            internal array buffer (`old[...] = new`), bumping its version.
         """
 
         for old, new in zip(self.trainable_parameters(), new_params):
-            old.np[...] = new.np
+            old[...] = new
 
     def __call__(self, *args, **kwargs):
         return self.call(*args, **kwargs)
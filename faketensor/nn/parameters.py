@@ -2,6 +2,8 @@ from typing import Generic, TypeVar
 from ..src.array import NDarray
 
 class Variable(NDarray):
+    __slots__ = ("name",)
+
     def __init__(self, data, dtype=None, name: str = None):
         super().__init__(data, dtype)
         self.train = True
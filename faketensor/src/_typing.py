@@ -11,6 +11,8 @@ class Array(Protocol):
     """A protocol representing any array-like object that supports basic arithmetic operations.
     """
 
+    __slots__ = ()
+
     np:Any
 
     @property
@@ -0,0 +1,191 @@
+"""
+Mixed precision: autocast and dynamic loss scaling.
+
+    scaler = ft.LossScaler()
+    step = ft.value_and_grad(scaler.scaled(loss_fn))
+
+    for x, y in batches:
+        with ft.autocast():
+            scaled_loss, grads = step(model, x, y)
+        loss = scaled_loss / scaler.scale
+        scaler.step(opt, grads)      # unscale, skip on inf/nan, adapt scale
+
+Inside `autocast()`:
+
+  • matmul and elementwise arithmetic (add, subtract, multiply, divide)
+    run in float16: float32 inputs are cast down first, float64 inputs
+    are left alone (as in torch autocast)
+  • sum, mean and prod accumulate in float32: float16 inputs are cast up,
+    so losses and statistics come out in float32
+  • everything else runs in the dtype of its inputs
+
+Casts are recorded like any other primitive, so the `Variable`s stay the
+float32 master copies: their float16 images exist only for the ops that
+use them, and gradients are cast back to float32 on the way to them.
+Activations saved for backward are float16, which halves their memory.
+
+Autocast adds a call hook on `Primitive` (see `base.add_call_hook`) while
+a block is open; it costs nothing outside the block.
+"""
+
+from contextlib import contextmanager
+
+from ..backend.backend import xp
+from .DType import float16, normalize_dtype
+from . import base
+from .base import raw
+from .functions import cast
+from .jit.utils import tree_map
+
+
+LOW_PRECISION = frozenset({"matmul", "add", "subtract", "multiply", "divide"})
+FULL_PRECISION = frozenset({"sum", "mean", "prod"})
+
+# One entry per open `autocast` block: its low-precision dtype, or None
+# if it disabled autocasting.
+_STACK = []
+
+
+def _cast_args(args, n, dtype):
+    cast_any = False
+    out = list(args)
+    for i in range(n):
+        dt = getattr(raw(args[i]), "dtype", None)
+        # float64 is an explicit request for precision: never touch it
+        if dt is not None and dt.kind == "f" and dt.itemsize <= 4 and dt != dtype:
+            out[i] = cast(args[i], dtype)
+            cast_any = True
+    return tuple(out) if cast_any else args
+
+
+def _autocast_call(call, p, *args, **params):
+    low = _STACK[-1]
+    if low is not None:
+        if p.name in LOW_PRECISION:
+            args = _cast_args(args, p.nargs, low)
+        elif p.name in FULL_PRECISION:
+            args = _cast_args(args, p.nargs, xp().dtype("float32"))
+    return call(p, *args, **params)
+
+
+@contextmanager
+def autocast(dtype=float16, enabled=True):
+    """
+    Run matmul and elementwise arithmetic in `dtype` (float16 by default)
+    and reductions in float32 inside the block.
+
+    Args:
+        dtype: Low-precision dtype.
+        enabled (bool): False turns autocasting off inside an enclosing
+            `autocast` block (e.g. for a numerically sensitive layer).
+    """
+    if not _STACK:
+        base.add_call_hook(_autocast_call, base.HOOK_AUTOCAST)
+    _STACK.append(xp().dtype(normalize_dtype(dtype)) if enabled else None)
+    try:
+        yield
+    finally:
+        _STACK.pop()
+        if not _STACK:
+            base.remove_call_hook(_autocast_call)
+
+
+class LossScaler:
+    """
+    Dynamic loss scaling for float16 training.
+
+    The loss is multiplied by `scale` before differentiation so small
+    float16 gradients do not flush to zero. When a step produces inf/nan
+    gradients it is skipped and the scale is cut by `backoff_factor`;
+    after `growth_interval` clean steps in a row it grows by
+    `growth_factor`.
+
+    Args:
+        init_scale (float): Initial scale.
+        growth_factor (float): Multiplier after `growth_interval` clean steps.
+        backoff_factor (float): Multiplier after an overflowing step.
+        growth_interval (int): Clean steps needed before growing.
+        min_scale (float): Lower bound of the scale.
+
+    Attributes:
+        scale (float): Current scale.
+        found_inf (bool): Whether the last `unscale` saw inf/nan.
+    """
+
+    def __init__(self, init_scale=2.0 ** 15, growth_factor=2.0, backoff_factor=0.5,
+                 growth_interval=2000, min_scale=1.0):
+        self.scale = float(init_scale)
+        self.growth_factor = growth_factor
+        self.backoff_factor = backoff_factor
+        self.growth_interval = growth_interval
+        self.min_scale = min_scale
+        self.found_inf = False
+        self._clean_steps = 0
+
+    def scaled(self, fun):
+        """`fun` with its (scalar loss) output multiplied by the current scale."""
+        def scaled_fun(*args, **kwargs):
+            loss = fun(*args, **kwargs)
+            # Scale in float32 with autocast off: a float16 product would
+            # overflow to inf while the gradients themselves stay finite.
+            with autocast(enabled=False):
+                dt = getattr(raw(loss), "dtype", None)
+                if dt is not None and dt.kind == "f" and dt.itemsize < 4:
+                    loss = cast(loss, "float32")
+                return loss * self.scale
+        scaled_fun.__name__ = getattr(fun, "__name__", "scaled_fun")
+        return scaled_fun
+
+    def unscale(self, grads):
+        """
+        Divide a pytree of gradients by the scale; sets `found_inf`.
+
+        Returns:
+            The unscaled gradients, with the structure of `grads`.
+        """
+        lib = xp()
+        inv = 1.0 / self.scale
+        found = False
+
+        def unscale_one(g):
+            nonlocal found
+            if g is None:
+                return None
+            r = raw(g)
+            if not hasattr(r, "dtype"):
+                return g
+            if not found and not bool(lib.isfinite(r).all()):
+                found = True
+            return g * inv
+
+        out = tree_map(unscale_one, grads)
+        self.found_inf = found
+        return out
+
+    def update(self, found_inf=None):
+        """Adapt the scale after a step (`found_inf` defaults to the last `unscale`)."""
+        if found_inf is None:
+            found_inf = self.found_inf
+        if found_inf:
+            self.scale = max(self.scale * self.backoff_factor, self.min_scale)
+            self._clean_steps = 0
+            return
+        self._clean_steps += 1
+        if self._clean_steps >= self.growth_interval:
+            self.scale *= self.growth_factor
+            self._clean_steps = 0
+
+    def step(self, optimizer, grads):
+        """
+        Unscale `grads` and apply them with `optimizer.update`, unless they
+        overflowed; then adapt the scale.
+
+        Returns:
+            bool: True if the update was applied.
+        """
+        grads = self.unscale(grads)
+        applied = not self.found_inf
+        if applied:
+            optimizer.update(grads)
+        self.update()
+        return applied
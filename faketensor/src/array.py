@@ -1,6 +1,10 @@
 from ._typing import Array
 from ..backend.backend import xp    # unified backend (numpy OR cupy)
 from .functions import *
+from .jit.placeholder import FT_Tracer
+from .lazy.value import LazyValue, PENDING, flush
+from .base import needs_grad, bump_version, raw
+from .dtype_policy import default_float
 from typing import Optional
 
 # -------------------------
@@ -17,13 +21,24 @@ def as_ndarray(x):
     if isinstance(x, lib.ndarray):
         return x
 
-    # Python scalars
+    # Placeholder values flowing through a `jit` trace, and deferred
+    # values of lazy mode
+    if isinstance(x, (FT_Tracer, LazyValue)):
+        return x
+
+    # Python scalars (floats follow the default dtype policy; NumPy
+    # float64 scalars subclass float but keep their dtype)
+    if type(x) is float:
+        return lib.asarray(x, dtype=default_float())
     if isinstance(x, (int, float, bool)):
         return lib.asarray(x)
 
     # Lists or tuples
     if isinstance(x, (list, tuple)):
-        return lib.asarray(x)
+        arr = lib.asarray(x)
+        if arr.dtype.kind == "f":
+            arr = arr.astype(default_float(), copy=False)
+        return arr
 
     # If user passed a raw numpy array → convert to backend array
     try:
@@ -35,7 +50,7 @@ def as_ndarray(x):
 
     # Our NDarray
     if isinstance(x, NDarray):
-        return lib.asarray(x.np)
+        return x.np if isinstance(x.np, (FT_Tracer, LazyValue)) else lib.asarray(x.np)
     
     if lib.isscalar(x):            
         return lib.array(x)
@@ -44,16 +59,42 @@ def as_ndarray(x):
 
 
 def as_nd(x):
+    """
+    Wrap `x` as an NDarray, sharing its buffer when it already is one.
+
+    Backend arrays, tracers, lazy values and NDarrays holding any of them
+    take the `_new_nd` fast path; everything else (scalars, lists, foreign
+    arrays) goes through `NDarray(x)`.
+    """
+    fast = (xp().ndarray, FT_Tracer, LazyValue)
+    if isinstance(x, fast):
+        return _new_nd(x)
+    if isinstance(x, NDarray) and isinstance(x.np, fast):
+        return _new_nd(x.np)
     return NDarray(x)
 
 
+_PY_SCALARS = (int, float, complex, bool)
+
+def _operand(x):
+    """
+    Operand of a binary operator. Python scalars are passed to the
+    primitive as-is, so NumPy treats them as weakly typed and `x * 2.0`
+    keeps `x`'s dtype; everything else is wrapped with `as_nd`.
+    """
+    return x if type(x) in _PY_SCALARS else as_nd(x)
+
+
 # -------------------------
 # NDarray class
 # -------------------------
 
 class NDarray(Array):
+    # Instances are created for every primitive output, so keep them small:
+    # no per-instance __dict__. Subclasses must declare their own slots.
+    __slots__ = ("np", "train", "__weakref__")
+
     def __init__(self, data, dtype=None) -> None:
-        super().__init__()
         arr = as_ndarray(data)
         self.np = arr.astype(dtype) if dtype else arr
         self.train = True
@@ -88,8 +129,8 @@ class NDarray(Array):
         return len(self.np)
 
     def astype(self, dtype):
-        """Return a new NDarray with the same values, different dtype."""
-        return NDarray(self.np, dtype=dtype)
+        """Return a new NDarray with the same values, different dtype (differentiable)."""
+        return cast(self, dtype)
     
     def __hash__(self):
         return id(self)   # identity-based hashing
@@ -106,12 +147,41 @@ class NDarray(Array):
     def __str__(self):
         return str(self.np)
 
-    def __array__(self):
-        """Allows NumPy to extract underlying data when needed."""
-        return self.np
+    def __array__(self, dtype=None, copy=None):
+        """
+        Allows NumPy to extract underlying data. The buffer is shared
+        unless `copy=True` or `dtype` needs a conversion; a conversion with
+        `copy=False` raises ValueError, as NumPy 2 expects.
+        """
+        if dtype is not None and dtype != self.np.dtype:
+            if copy is False:
+                raise ValueError(
+                    f"converting {self.np.dtype} to {dtype} needs a copy, "
+                    "but copy=False was requested"
+                )
+            return self.np.astype(dtype)
+        return self.np.copy() if copy else self.np
 
     __array_priority__ = 200  # ensure our ops dominate numpy’s
 
+    # -------------------------
+    # NumPy protocols / interop
+    # -------------------------
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Route NumPy ufuncs to faketensor primitives (see `interop`)."""
+        return _interop.array_ufunc(ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """Route NumPy functions to faketensor primitives (see `interop`)."""
+        return _interop.array_function(func, types, args, kwargs)
+
+    def __dlpack__(self, *args, **kwargs):
+        """Export the backend buffer via DLPack (zero-copy)."""
+        return self.np.__dlpack__(*args, **kwargs)
+
+    def __dlpack_device__(self):
+        return self.np.__dlpack_device__()
+
     def __float__(self):
         return float(self.np)
 
@@ -119,10 +189,13 @@ class NDarray(Array):
         return int(self.np)
     
     def __setitem__(self, k, v):
-        self.np[k] = v
+        if PENDING:
+            flush()     # pending lazy values may still read this buffer
+        self.np[k] = raw(v)
+        bump_version(self)
 
-    def __getitem__(self, id):
-        return NDarray(self.np[id])
+    def __getitem__(self, key):
+        return getitem(self, key)
     
     # -------------------------
     # Array makers
@@ -142,19 +215,19 @@ class NDarray(Array):
     # Binary ops (forward)
     # -------------------------
     def __add__(self, other):
-        return add(self, as_nd(other))
+        return add(self, _operand(other))
 
     def __sub__(self, other):
-        return subtract(self, as_nd(other))
+        return subtract(self, _operand(other))
 
     def __mul__(self, other):
-        return multiply(self, as_nd(other))
+        return multiply(self, _operand(other))
 
     def __truediv__(self, other):
-        return divide(self, as_nd(other))
+        return divide(self, _operand(other))
 
     def __pow__(self, other):
-        return power(self, as_nd(other))
+        return power(self, _operand(other))
     
     def __matmul__(self, other):
         return matmul(self, other)
@@ -166,16 +239,70 @@ class NDarray(Array):
     # Binary ops (reverse)
     # -------------------------
     def __radd__(self, other):
-        return add(as_nd(other), self)
+        return add(_operand(other), self)
 
     def __rsub__(self, other):
-        return subtract(as_nd(other), self)
+        return subtract(_operand(other), self)
 
     def __rmul__(self, other):
-        return multiply(as_nd(other), self)
+        return multiply(_operand(other), self)
 
     def __rtruediv__(self, other):
-        return divide(as_nd(other), self)
+        return divide(_operand(other), self)
 
     def __rpow__(self, other):
-        return power(as_nd(other), self)
+        return power(_operand(other), self)
+
+    def __rmatmul__(self, other):
+        return matmul(other, self)
+
+    # -------------------------
+    # In-place ops
+    # -------------------------
+    def _inplace(self, ufunc, op, other):
+        """
+        `self <op>= other`, written into `self`'s buffer.
+
+        Values a tape or jvp level tracks (and jit tracers) are updated
+        functionally instead: the name is rebound to a new NDarray, so the
+        recorded graph stays valid. Writes bump the buffer's version, so a
+        backward pass that saved it raises instead of using stale data.
+        Pending lazy values are evaluated first; they may read the buffer.
+        """
+        if needs_grad(self, other) or isinstance(self.np, FT_Tracer):
+            return op(self, _operand(other))
+        if PENDING:
+            flush()
+        ufunc(self.np, raw(other), out=self.np)
+        bump_version(self)
+        return self
+
+    def __iadd__(self, other):
+        return self._inplace(xp().add, add, other)
+
+    def __isub__(self, other):
+        return self._inplace(xp().subtract, subtract, other)
+
+    def __imul__(self, other):
+        return self._inplace(xp().multiply, multiply, other)
+
+    def __itruediv__(self, other):
+        return self._inplace(xp().divide, divide, other)
+
+
+_object_new = object.__new__
+
+def _new_nd(arr):
+    """
+    Internal constructor: wrap a backend array (or tracer) as-is.
+
+    Skips `as_ndarray`'s type dispatch; the caller guarantees `arr` is
+    already a backend array.
+    """
+    obj = _object_new(NDarray)
+    obj.np = arr
+    obj.train = True
+    return obj
+
+
+from . import interop as _interop
@@ -1,7 +1,12 @@
 from typing import Callable, Any, Tuple, Union
 from ...backend import backend as b
-from ..base import TAPE_STACK, tape
-from ..array import NDarray
+from contextlib import nullcontext
+from .. import base
+from ..base import tape, first_order
+from ..dtype_policy import default_float
+from ..lazy import runtime as lazy_runtime
+from ..lazy.value import LazyValue
+from ..array import NDarray, as_nd
 from ...nn.parameters import Variable
 from ...nn.base import Cell
 from typing import Dict, Any
@@ -56,18 +61,58 @@ def _extract_np(x):
     return x.np if is_leaf(x) else x
 
 
-def _id(x):
-    return id(x.np) if is_leaf(x) else id(x)
-
-
 def _zero_like(x):
     return b.xp().zeros_like(_extract_np(x))
 
 
+def _prune_tape(tape_records, out_slot, leaf_slots):
+    """
+    Select the nodes that lie on a path between the leaves and `out`.
+
+    A node only contributes to a leaf gradient if (a) one of its parents
+    depends on a differentiable leaf and (b) its output feeds `out`.
+    Everything else (label preprocessing, constant subexpressions, side
+    computations whose results are discarded) is dead for gradient
+    purposes and its `grad_fn` never needs to run.
+
+    Two linear sweeps over the tape:
+      1. forward:  slots reachable *from* the leaves
+      2. backward: slots that reach `out`, restricted to (1)
+
+    Returns
+    -------
+    tuple
+        (live_nodes, reachable) where `live_nodes` is in tape order and
+        `reachable[slot]` is truthy iff the slot depends on a leaf.
+    """
+    reachable = bytearray(tape_records.num_slots)
+    for s in leaf_slots:
+        reachable[s] = 1
+    for node in tape_records:
+        for ps in node.parent_slots:
+            if reachable[ps]:
+                reachable[node.out_slot] = 1
+                break
+
+    needed = bytearray(tape_records.num_slots)
+    needed[out_slot] = 1
+    live = []
+    for node in reversed(tape_records):
+        s = node.out_slot
+        if not (needed[s] and reachable[s]):
+            continue
+        live.append(node)
+        for ps in node.parent_slots:
+            needed[ps] = 1
+
+    live.reverse()
+    return live, reachable
+
+
 # ================================================================
 # BACKWARD CORE (internal)
 # ================================================================
-def _backward(fun, original_args, diff_leaves):
+def _backward(fun, original_args, diff_leaves, create_graph=False):
     """
     Execute a function under tracing, build a tape of operations, and
     perform a full reverse-mode automatic differentiation pass.
@@ -88,26 +133,43 @@ def _backward(fun, original_args, diff_leaves):
         A list of leaf nodes (NDarray/Variable) that require gradients.
         These correspond to leaves extracted after pytree flattening.
 
+    create_graph : bool
+        If False (default), the reverse sweep runs under `first_order()`:
+        grad rules compute on raw backend arrays and record nothing, so the
+        returned gradients are plain arrays that cannot be differentiated
+        again. If True, grad rules run as ordinary primitives and are
+        recorded on any enclosing tape (`grad` of `grad`). An enclosing
+        tape that is recording implies True.
+
     Algorithm
     ---------
-    1. Run `fun(*args)` inside a `tape()` context, collecting a linear tape.
+    1. Track every leaf on a new tape, then run `fun(*args)` inside
+       a `tape()` context, collecting a linear tape. The tape is popped
+       off TAPE_STACK as soon as `fun` returns.
 
-    2. Initialize gradient dictionary:
-          grads[id(out)] = ones_like(out)
+    2. Initialize a gradient table with one entry per tape slot:
+          grads[slot(out)] = ones_like(out)
 
        This is reverse-mode initialization (∂out/∂out = 1).
 
-    3. Traverse all recorded Nodes in reverse order:
+    3. Prune the tape to the nodes lying between `diff_leaves` and `out`
+       (see `_prune_tape`); every other `grad_fn` is skipped.
+
+    4. Traverse the remaining Nodes in reverse order:
           for node in reversed(tape):
-              g = grads[id(node.out)]
+              g = grads[node.out_slot]
               parent_grads = node.grad_fn(g)
-              accumulate into grads for each parent
+              accumulate into grads[s] for s in node.parent_slots
+              release node.out / closures and clear grads[node.out_slot]
 
-    4. Return:
-        (out, grads)
+       Peak memory during backward is therefore the live frontier of
+       gradients plus the activations still needed by unvisited nodes.
 
-       where `grads` maps:
-           id(leaf) → gradient array
+    5. Return:
+        (out, leaf_grads)
+
+       where `leaf_grads[i]` is the gradient of `diff_leaves[i]`, or None
+       if `out` does not depend on it.
 
     Notes
     -----
@@ -120,43 +182,204 @@ def _backward(fun, original_args, diff_leaves):
     Returns
     -------
     tuple
-        (output_of_fun, gradient_dict)
+        (output_of_fun, leaf_grads)
     """
-    with tape():
+    # Under an enclosing `grad` the outer tape must see the backward pass,
+    # or differentiating the gradient would silently give zeros.
+    create_graph = create_graph or (base._RECORDING and bool(base.TAPE_STACK))
+
+    with tape() as tape_records:
+        leaf_slots = [tape_records.track(x) for x in diff_leaves]
         out = fun(*original_args)
 
-    tape_records = TAPE_STACK[-1] if TAPE_STACK else []
+    out_slot = tape_records.slot(out)
+    live_nodes, reachable = _prune_tape(tape_records, out_slot, leaf_slots)
+    grads = [None] * tape_records.num_slots
 
-    grads = { _id(out): b.xp().ones_like(out) }
+    stats = base.MEMORY_STATS
+    if stats is not None:
+        entry = tape_records.stats(stats.top)
+        entry["live_nodes"] = len(live_nodes)
+        mem = _GradBytes()
+    else:
+        mem = None
+    # Dead nodes are never visited again; let their activations go now.
+    tape_records.clear()
 
-    for node in reversed(tape_records):
-        g = grads.get(_id(node.out))
+    seed = getattr(out, "np", out)
+    dtype = seed.dtype if seed.dtype.kind in "fc" else default_float()
+    if isinstance(seed, LazyValue):     # `ones_like` would evaluate it
+        grads[out_slot] = b.xp().ones(seed.shape, dtype=dtype)
+    else:
+        grads[out_slot] = b.xp().ones_like(seed, dtype=dtype)
+    if mem is not None:
+        mem.add(grads[out_slot])
+
+    with nullcontext() if create_graph else first_order():
+        _reverse_sweep(live_nodes, grads, reachable, mem)
+
+    if stats is not None:
+        entry["peak_grad_bytes"] = mem.peak
+        stats.passes.append(entry)
+
+    return out, [grads[s] for s in leaf_slots]
+
+
+class _GradBytes:
+    """
+    Bytes held by the gradient table during a backward pass.
+
+    Buffers are reference counted by their owning array, so a gradient
+    passed through unchanged to several parents (`add`) or reshaped into
+    a view is only counted once.
+    """
+
+    __slots__ = ("held", "peak", "_refs")
+
+    def __init__(self):
+        self.held = 0
+        self.peak = 0
+        self._refs = {}
+
+    def add(self, x):
+        r = base._root(x)
+        ref = self._refs.get(id(r))
+        if ref is not None:
+            ref[0] += 1
+            return
+        n = int(getattr(r, "nbytes", 0) or 0)
+        self._refs[id(r)] = [1, n, r]
+        self.held += n
+        if self.held > self.peak:
+            self.peak = self.held
+
+    def drop(self, x):
+        ref = self._refs.get(id(base._root(x)))
+        if ref is None:
+            return
+        ref[0] -= 1
+        if ref[0] == 0:
+            del self._refs[id(ref[2])]
+            self.held -= ref[1]
+
+
+def _reverse_sweep(live_nodes, grads, reachable, mem=None):
+    """
+    Run the `grad_fn`s of `live_nodes` in reverse, accumulating into `grads`.
+
+    `mem`, if given, is a `_GradBytes` tracking the size of `grads`.
+    """
+    prof = base.PROFILER
+    # In-place writes are rare; skip the version checks until one happens.
+    check = bool(base._VERSIONS)
+    for node in reversed(live_nodes):
+        s = node.out_slot
+        # Every consumer of `node.out` comes later on the tape, so its
+        # gradient is complete here and no longer needed afterwards.
+        g = grads[s]
+        grads[s] = None
         if g is None:
+            node.release()
             continue
+        if check:
+            node.check_versions()
+
+        if prof is None:
+            parent_grads = node.grad_fn(g)
+        else:
+            parent_grads = prof.grad(node, g)
+
+        for ps, pg in zip(node.parent_slots, parent_grads):
+            # Parents that cannot lead back to a differentiable leaf
+            # (constants, frozen tensors) never accumulate a gradient.
+            if pg is None or not reachable[ps]:
+                continue
+            cur = grads[ps]
+            grads[ps] = pg if cur is None else cur + pg
+            if mem is not None:
+                mem.add(grads[ps])
+                if cur is not None:
+                    mem.drop(cur)
 
-        raw_parent_grads = node.grad_fn(g)
+        if mem is not None:
+            mem.drop(g)
+        del g, parent_grads
+        node.release()
 
-        # Block grads for non-trainable tensors
-        parent_grads = []
-        for p, pg in zip(node.parents, raw_parent_grads):
-            if is_leaf(p):
-                parent_grads.append(pg)
-            else:
-                parent_grads.append(None)
 
-        for p, pg in zip(node.parents, parent_grads):
-            if pg is None:
-                continue
-            pid = _id(p)
-            grads[pid] = grads.get(pid, 0) + pg
+def _normalize_argnum(argnum, nargs):
+    """
+    Turn `argnum` into a tuple of non-negative argument indices.
 
+    `None` selects every argument; negative indices count from the end.
+    """
+    if argnum is None:
+        return tuple(range(nargs))
+    nums = (argnum,) if isinstance(argnum, int) else tuple(argnum)
+    out = []
+    for i in nums:
+        if not isinstance(i, int) or not -nargs <= i < nargs:
+            raise ValueError(
+                f"argnum {i!r} is out of range for a call with {nargs} arguments"
+            )
+        out.append(i % nargs)
+    return tuple(out)
+
+
+def _value_and_grads(fun, args, argnum, create_graph):
+    """
+    Shared body of `grad` and `value_and_grad`.
+
+    Only the leaves of the arguments selected by `argnum` are handed to
+    `_backward`. Leaves of the other arguments get no tape slot of their
+    own, so `_prune_tape` drops every node that only leads back to them
+    and their `grad_fn`s never run.
+    """
+    selected = _normalize_argnum(argnum, len(args))
+
+    per_arg = []
+    diff_leaves = []
+    for i in selected:
+        a = args[i]
+        repl = expand_cell(a)
+        leaves, treedef = flatten_pytree(repl if repl is not None else a)
+        per_arg.append((leaves, treedef))
+        diff_leaves.extend(x for x in leaves if is_leaf(x))
+
+    out, leaf_grads = _backward(fun, args, diff_leaves, create_graph)
+    if lazy_runtime.active():
+        # one graph for the value and every gradient
+        out, leaf_grads = lazy_runtime.materialize((out, leaf_grads))
+
+    leaf_grads = iter(leaf_grads)
+    trees = []
+    for leaves, treedef in per_arg:
+        flat_grads = []
+        for leaf in leaves:
+            if is_leaf(leaf):
+                g = next(leaf_grads)
+                flat_grads.append(as_nd(_zero_like(leaf) if g is None else g))
+            else:
+                flat_grads.append(None)
+        trees.append(unflatten_pytree(flat_grads, treedef))
+
+    if argnum is None:
+        grads = trees[0] if len(args) == 1 else trees
+    elif isinstance(argnum, int):
+        grads = trees[0]
+    else:
+        grads = tuple(trees)
     return out, grads
 
 
 # ================================================================
 # PUBLIC API: grad()
 # ================================================================
-def grad(fun):
+def grad(
+    fun: Callable,
+    argnum: Union[int, tuple, list, None] = None,
+    create_graph: bool = False,
+) -> Callable:
     """
     Transform a function into one that returns gradients w.r.t. its arguments.
 
@@ -177,6 +400,33 @@ def grad(fun):
         wrapped(x, y, z)
     returns a pytree of gradients matching the argument structure.
 
+    argnum
+    ------
+    Selects the arguments to differentiate:
+        • None (default): every argument; the result is the gradient of the
+          single argument, or a list with one entry per argument.
+        • int: only that argument; the result is its gradient.
+        • tuple/list of ints: those arguments; the result is a tuple.
+
+    Trainable leaves inside non-selected arguments (frozen embeddings,
+    a teacher model) are treated as constants, and backward skips every
+    `grad_fn` that would only contribute to them.
+
+    create_graph
+    ------------
+    By default the backward pass is first-order: grad rules run on raw
+    backend arrays and nothing is recorded, which is all training needs.
+    Pass `create_graph=True` to record the backward pass so the gradient
+    can be differentiated again:
+
+        d2f = grad(grad(f, create_graph=True))
+
+    It is implied when an enclosing `grad` is recording, so
+    `grad(grad(f))` gives the same result.
+
+    Forward mode does not need it: `jvp(grad(f), ...)` (and `hvp`) works
+    with the default.
+
     Cell expansion
     --------------
     If an argument is a `Cell`, it is automatically replaced with its
@@ -199,27 +449,7 @@ def grad(fun):
         A function returning gradients matching the structure of input args.
     """
     def wrapped(*args):
-        expanded_args = []
-        for a in args:
-            repl = expand_cell(a)
-            expanded_args.append(repl if repl is not None else a)
-
-        leaves, treedef = flatten_pytree(expanded_args)
-        diff_leaves = [x for x in leaves if is_leaf(x)]
-
-        out, gdict = _backward(fun, args, diff_leaves)
-
-        flat_grads = []
-        for leaf in leaves:
-            if is_leaf(leaf):
-                gid = _id(leaf)
-                flat_grads.append(gdict.get(gid, b.xp().zeros_like(leaf.np)))
-            else:
-                flat_grads.append(None)
-
-        grads_tree = unflatten_pytree(flat_grads, treedef)
-
-        return grads_tree[0] if len(args) == 1 else grads_tree
+        return _value_and_grads(fun, args, argnum, create_graph)[1]
 
     return wrapped
 
@@ -227,7 +457,11 @@ def grad(fun):
 # ================================================================
 # PUBLIC API: value_and_grad()
 # ================================================================
-def value_and_grad(fun: Callable, argnum: Union[int, tuple, list, None] = None) -> Callable:
+def value_and_grad(
+    fun: Callable,
+    argnum: Union[int, tuple, list, None] = None,
+    create_graph: bool = False,
+) -> Callable:
     """
     Create a function that returns both the value and gradient of fun(*args).
 
@@ -249,11 +483,16 @@ def value_and_grad(fun: Callable, argnum: Union[int, tuple, list, None] = None)
     • Runs `_backward` to compute value + gradients.
     • Reconstructs gradient pytrees matching the input args.
 
-    argnum (currently unused)
-    -------------------------
-    Present for API compatibility with JAX.  
-    FakeTensor currently differentiates w.r.t *all* leaves.
-    Support for selective argnums can be added easily.
+    argnum
+    ------
+    Same as in `grad`: an int, a tuple of ints or None (all arguments).
+
+        step = value_and_grad(loss, argnum=0)
+        loss, g_model = step(model, frozen_embeddings, batch)
+
+    create_graph
+    ------------
+    Same as in `grad`: record the backward pass for higher-order use.
 
     Returns
     -------
@@ -262,26 +501,6 @@ def value_and_grad(fun: Callable, argnum: Union[int, tuple, list, None] = None)
             (fun(*args), gradients)
     """
     def wrapped(*args):
-        expanded_args = []
-        for a in args:
-            repl = expand_cell(a)
-            expanded_args.append(repl if repl is not None else a)
-
-        leaves, treedef = flatten_pytree(expanded_args)
-        diff_leaves = [x for x in leaves if is_leaf(x)]
-
-        out, gdict = _backward(fun, args, diff_leaves)
-
-        flat_grads = []
-        for leaf in leaves:
-            if is_leaf(leaf):
-                gid = _id(leaf)
-                flat_grads.append(gdict.get(gid, b.xp().zeros_like(leaf.np)))
-            else:
-                flat_grads.append(None)
-
-        grads_tree = unflatten_pytree(flat_grads, treedef)
-
-        return out, grads_tree[0] if len(args) == 1 else grads_tree
+        return _value_and_grads(fun, args, argnum, create_graph)
 
     return wrapped
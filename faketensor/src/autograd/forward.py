@@ -0,0 +1,117 @@
+from typing import Callable, Sequence
+from ...backend import backend as b
+from .. import base
+from ..base import TangentTable
+from ..array import NDarray, as_nd
+from ..tree_util import flatten_pytree, unflatten_pytree
+from .backward import expand_cell
+
+
+# ================================================================
+# PUBLIC API: jvp()
+# ================================================================
+def jvp(fun: Callable, primals: Sequence, tangents: Sequence):
+    """
+    Forward-mode automatic differentiation (Jacobian-vector product).
+
+    This matches:
+        • JAX:  jax.jvp
+        • PyTorch: torch.func.jvp
+
+    Signature
+    ---------
+        out, out_tangent = jvp(fun, (x, y), (tx, ty))
+
+    Behavior
+    --------
+    • Seeds every array leaf of `primals` with the matching leaf of
+      `tangents` (a `Cell` primal takes a list of tangents, one per
+      trainable parameter, in the order `grad` returns them).
+    • Runs `fun(*primals)` once. Each primitive evaluates its `jvp_fn`
+      right after its forward computation, so the directional derivative
+      is carried alongside the values: no tape is recorded and nothing is
+      kept alive for a later pass.
+    • Costs about one extra forward pass per tangent direction, which beats
+      `grad` when there are few inputs and many outputs.
+
+    Nesting
+    -------
+    `jvp` composes with itself and with `grad` (e.g. `jvp(grad(f), ...)`
+    for Hessian-vector products): each call owns one level on
+    `base.JVP_STACK`.
+
+    Returns
+    -------
+    tuple
+        (fun(*primals), tangent of the output) — the tangent pytree matches
+        the output, with zeros for array leaves that do not depend on the
+        seeded inputs and None for non-array leaves.
+    """
+    primals, tangents = tuple(primals), tuple(tangents)
+    if len(primals) != len(tangents):
+        raise ValueError(
+            f"jvp: got {len(primals)} primals but {len(tangents)} tangents"
+        )
+
+    level = TangentTable()
+    args = [_seed(level, p, t) for p, t in zip(primals, tangents)]
+
+    base.JVP_STACK.append(level)
+    try:
+        out = fun(*args)
+    finally:
+        base.JVP_STACK.pop()
+
+    lib = b.xp()
+    leaves, treedef = flatten_pytree(out)
+    out_tangents = []
+    for leaf in leaves:
+        if isinstance(leaf, (NDarray, lib.ndarray)):
+            t = level.get(leaf)
+            # tangents pushed through raw grad rules (`jvp(grad(f))`) are
+            # backend arrays; hand out NDarrays either way
+            out_tangents.append(NDarray(lib.zeros_like(getattr(leaf, "np", leaf))) if t is None else as_nd(t))
+        else:
+            out_tangents.append(None)
+
+    return out, unflatten_pytree(out_tangents, treedef)
+
+
+def _seed(level, primal, tangent):
+    """Register the tangents of one primal argument; return the argument."""
+    params = expand_cell(primal)
+    if params is not None:
+        tangent = list(tangent)
+        if len(tangent) != len(params):
+            raise ValueError(
+                f"jvp: Cell has {len(params)} trainable parameters "
+                f"but {len(tangent)} tangents were given"
+            )
+        for p, t in zip(params, tangent):
+            _set(level, p, t)
+        return primal
+
+    p_leaves, treedef = flatten_pytree(primal)
+    t_leaves, _ = flatten_pytree(tangent)
+    if len(p_leaves) != len(t_leaves):
+        raise ValueError("jvp: tangent structure does not match its primal")
+
+    rebuild = False
+    new_leaves = []
+    for p, t in zip(p_leaves, t_leaves):
+        if t is not None and not isinstance(p, NDarray):
+            p = NDarray(p)
+            rebuild = True
+        if t is not None:
+            _set(level, p, t)
+        new_leaves.append(p)
+    return unflatten_pytree(new_leaves, treedef) if rebuild else primal
+
+
+def _set(level, primal, tangent):
+    t = tangent if isinstance(tangent, NDarray) else NDarray(tangent)
+    if t.shape != primal.shape:
+        raise ValueError(
+            f"jvp: tangent shape {t.shape} does not match primal shape {primal.shape}"
+        )
+    level.set(primal, t)
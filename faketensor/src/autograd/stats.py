@@ -0,0 +1,75 @@
+"""
+Tape and memory statistics for backward passes.
+
+    with ft.memory_stats() as stats:
+        grads = ft.grad(loss)(model, batch)
+
+    print(stats.report())
+
+For every backward pass run inside the block, the collector keeps the
+`Tape.stats()` of the recorded tape, taken right after the forward pass
+(when it holds the most), plus:
+
+  • live_nodes       – nodes left after pruning, i.e. whose grad rule runs
+  • peak_grad_bytes  – the largest size the gradient table reached during
+                       the reverse sweep
+
+Collection only happens while the block is active; outside it the
+backward pass checks `base.MEMORY_STATS` once and does no extra work.
+"""
+
+from contextlib import contextmanager
+from .. import base
+
+
+def _mb(n):
+    return f"{n / 2**20:.2f} MB"
+
+
+class MemoryStats:
+    """
+    Statistics of the backward passes run while active.
+
+    Attributes:
+        top (int): How many of the largest retained buffers to keep per pass.
+        passes (list[dict]): One `Tape.stats()` dict per backward pass,
+            extended with `live_nodes` and `peak_grad_bytes`.
+    """
+
+    def __init__(self, top=5):
+        self.top = top
+        self.passes = []
+
+    def report(self):
+        """Human-readable summary of every recorded pass."""
+        lines = []
+        for i, p in enumerate(self.passes):
+            lines.append(
+                f"pass {i}: {p['nodes']} nodes ({p['live_nodes']} live), "
+                f"outputs {_mb(p['output_bytes'])}, retained {_mb(p['retained_bytes'])}, "
+                f"peak grads {_mb(p['peak_grad_bytes'])}"
+            )
+            ops = ", ".join(f"{k}={v}" for k, v in p["nodes_by_op"].items())
+            lines.append(f"  nodes by op: {ops}")
+            for t in p["largest"]:
+                lines.append(
+                    f"  {_mb(t['bytes']):>10}  {t['op']:<14} {t['shape']} {t['dtype']}"
+                )
+        return "\n".join(lines)
+
+
+@contextmanager
+def memory_stats(top=5):
+    """
+    Collect `MemoryStats` for every backward pass run inside the block.
+
+    Args:
+        top (int): Number of largest retained buffers listed per pass.
+    """
+    prev = base.MEMORY_STATS
+    stats = MemoryStats(top)
+    base.MEMORY_STATS = stats
+    try:
+        yield stats
+    finally:
+        base.MEMORY_STATS = prev
@@ -4,12 +4,23 @@ Base utilities for FakeTensor's functional automatic differentiation system.
 This module implements:
   • A global tape stack for dynamic/eager-mode autodiff.
   • A `function` wrapper that turns a primitive into a traceable op.
+  • The `Primitive` table: ops whose forward, grad and jvp rules are
+    registered once at import time and run by a single dispatcher.
   • Context managers controlling whether operations are recorded.
   • The `Node` structure storing parents + backward function.
+  • The `Tape` holding Nodes and the integer slot of every recorded value.
+  • The stack of `TangentTable`s used by forward mode (`jvp`).
+  • A first-order mode in which grad rules compute on raw backend arrays.
+  • "Needs grad" propagation, letting primitives whose inputs no tape or
+    jvp level tracks skip the autodiff machinery entirely.
+  • Version counters of buffers written in place, checked by backward.
+  • An ordered chain of call hooks (profiler, autocast, strict dtype
+    checks) wrapped around the primitive dispatcher.
 
 FakeTensor follows a *functional* autograd design:
   – Arrays do NOT store gradient or graph info.
-  – Each primitive returns `(out, parents, grad_fn)` describing the local rule.
+  – Each primitive returns `(out, parents, grad_fn)` describing the local rule,
+    optionally followed by `jvp_fn` for forward mode.
   – Tapes collect nodes dynamically (similar to Chainer).
   – Backprop is implemented externally by reading the tape.
 
@@ -19,19 +30,40 @@ This file contains no gradient logic; it only defines how ops are logged.
 
 from typing import List, Callable, Protocol, Union
 from contextlib import contextmanager
-from dataclasses import dataclass
+import weakref
 import numpy as np
 from .utils import broadcast_backward
 from ._typing import Array 
+from ..backend.backend import xp
 
 # When True, primitives executed inside a `tape()` block
 # append a Node(out, parents, grad_fn) into the active tape.
 _RECORDING = True
 
 # The tape stack enables nested tapes.
-# Each active tape is a list of Node objects.
+# Each active tape is a `Tape` of Node objects.
 TAPE_STACK = []
 
+# Forward-mode levels, one `TangentTable` per active `jvp`, innermost last.
+JVP_STACK = []
+
+# When True (inside `first_order()`), primitives skip the `function` wrapper
+# and return raw backend arrays: nothing is recorded and no closures are built.
+_RAW = False
+
+# The active `profiler.Profiler`, if any. Checked once per backward pass;
+# primitive calls are only instrumented while a profiler is running.
+PROFILER = None
+
+# The active `autograd.stats.MemoryStats` collector, if any (see `memory_stats`).
+MEMORY_STATS = None
+
+# Write counters of backend buffers modified in place:
+# id(owning buffer) -> [weakref to it, version]. Buffers never written in
+# place have no entry (version 0), so while this is empty recording pays
+# nothing for version tracking.
+_VERSIONS = {}
+
 
 def active_tape():
     return TAPE_STACK[-1] if TAPE_STACK else None
@@ -42,23 +74,31 @@ def tape():
     Context manager enabling dynamic autodiff tracing.
 
     Usage:
-        with tape():
+        with tape() as t:
             y = f(x)
-        # The tape now contains a linearized list of Node(...)
+        # `t` now contains a linearized list of Node(...)
 
     Behavior:
-        – Pushes a new empty list into TAPE_STACK.
+        – Pushes a new empty `Tape` into TAPE_STACK and yields it.
         – All operations wrapped with `function` append Nodes here.
+        – Pops the tape when the block exits, so the recorded Nodes (and the
+          activations/closures they hold) live only as long as the caller
+          keeps a reference to the yielded tape.
         – Does NOT perform backprop. Users must call a separate backward runner.
 
     This design matches Chainer's "define-by-run" tape philosophy.
     """
 
-    TAPE_STACK.append([])  
+    global _RAW
+    prev = _RAW
+    _RAW = False   # a nested forward pass must be traced normally
+    records = Tape()
+    TAPE_STACK.append(records)
     try:
-        yield
+        yield records
     finally:
-        pass   
+        TAPE_STACK.pop()
+        _RAW = prev
 
 @contextmanager
 def no_record():
@@ -81,7 +121,96 @@ def no_record():
     finally:
         _RECORDING = prev
 
-@dataclass
+@contextmanager
+def first_order():
+    """
+    Run the enclosed block as a first-order backward pass.
+
+    Recording is disabled and primitives compute directly on raw backend
+    arrays (see `raw_mode`), so grad rules build no Nodes, closures or
+    NDarray wrappers. The result cannot be differentiated again; use
+    `create_graph=True` in `grad` for that.
+
+    Forward mode is unaffected: inside `jvp`, primitives keep carrying
+    tangents.
+    """
+
+    global _RECORDING, _RAW
+    prev = _RECORDING, _RAW
+    _RECORDING, _RAW = False, True
+    try:
+        yield
+    finally:
+        _RECORDING, _RAW = prev
+
+def raw_mode():
+    """True if primitives should return raw backend arrays (see `first_order`)."""
+    return _RAW and not JVP_STACK
+
+def raw(x):
+    """The backend array behind `x` (NDarray, Variable or raw value)."""
+    return getattr(x, "np", x)
+
+def needs_grad(*args):
+    """
+    True if an op on `args` must go through the `function` wrapper.
+
+    A value needs a gradient if an active tape tracks it (it is a
+    differentiable leaf or was computed from one), or if it carries a
+    tangent on an active `jvp` level. The flag is read off the tapes and
+    tangent tables, which are keyed by backend buffer, rather than stored
+    on the NDarray: primitives re-wrap their inputs, so the wrapper object
+    does not survive from one op to the next.
+
+    Ops on values that need no gradient (inference, data preprocessing,
+    constant subexpressions) can return their result directly, without
+    building closures or touching the tape.
+    """
+    if _RECORDING:
+        for t in TAPE_STACK:
+            for a in args:
+                if t.requires_grad(a):
+                    return True
+    for level in JVP_STACK:
+        for a in args:
+            if level.get(a) is not None:
+                return True
+    return False
+
+_as_nd = None
+
+def _wrap(x):
+    global _as_nd
+    if _as_nd is None:
+        from .array import as_nd as _as_nd
+    return _as_nd(x)
+
+_PY_SCALARS = (int, float, complex)
+
+def _weak_scalar(s, raws):
+    """
+    Python scalar operand `s` as an array of its partner's dtype.
+
+    NumPy treats Python scalars as weakly typed (`float32 * 2.0` stays
+    float32); grad rules see the scalar as an array, so give it the dtype
+    NumPy would have used rather than letting it widen the gradient.
+    """
+    for r in raws:
+        dt = getattr(r, "dtype", None)
+        if dt is None:
+            continue
+        if dt.kind == "c" or (dt.kind == "f" and not isinstance(s, complex)) \
+                or (dt.kind in "iu" and type(s) is int):
+            return xp().asarray(s, dtype=dt)
+        break
+    return s
+
+def untracked(out):
+    """Wrap the result of a primitive that skipped the `function` wrapper."""
+    if raw_mode():
+        return out
+    return _wrap(out)
+
 class Node:
     """
     One entry in the tape, representing a single primitive operation.
@@ -98,11 +227,311 @@ class Node:
                 g : gradient flowing from downstream (same shape as `out`)
                 returns: tuple of gradient contributions for each parent,
                          matching `parents` order.
+        out_slot (int):
+            Tape slot assigned to `out`.
+        parent_slots (tuple[int]):
+            Tape slots of `parents`, in the same order.
+        versions (tuple[int] | None):
+            Versions of `parents` and `out` at record time (see
+            `saved_versions`); None if they were all 0.
+    """
+
+    __slots__ = ("out", "parents", "grad_fn", "out_slot", "parent_slots", "versions")
+
+    def __init__(self, out, parents, grad_fn, out_slot, parent_slots, versions=None):
+        self.out = out
+        self.parents = parents
+        self.grad_fn = grad_fn
+        self.out_slot = out_slot
+        self.parent_slots = parent_slots
+        self.versions = versions
+
+    def check_versions(self):
+        """Raise if a value saved by this node was written in place since."""
+        if self.versions is None and not _VERSIONS:
+            return
+        now = saved_versions(self.parents + (self.out,))
+        if now != self.versions:
+            saved = self.versions or (0,) * len(now)
+            for i, (a, b) in enumerate(zip(saved, now)):
+                if a != b:
+                    what = "output" if i == len(now) - 1 else f"input {i}"
+                    raise RuntimeError(
+                        f"The {what} of '{op_name(self.grad_fn)}' was modified in place "
+                        f"after it was saved for backward (version {a} -> {b}). "
+                        "Use an out-of-place op, or write to it only after backward."
+                    )
+
+    def release(self):
+        """Drop the forward output, inputs and closure once backward is done."""
+        self.out = None
+        self.parents = None
+        self.grad_fn = None
+
+
+def op_name(grad_fn):
+    """Name of the op that produced a recorded `grad_fn`."""
+    name = getattr(grad_fn, "name", None)
+    if name is None:
+        name = getattr(grad_fn, "__name__", "grad_fn")
+    return name
+
+
+_LazyValue = None
+
+def _root(x):
+    """The backend array that owns the memory behind `x` (views -> base)."""
+    global _LazyValue
+    if _LazyValue is None:
+        from .lazy.value import LazyValue as _LazyValue
+    r = getattr(x, "np", x)
+    if r.__class__ is _LazyValue:
+        if r.value is None:
+            # Pending: no buffer yet, so nothing can have written to it.
+            return r
+        r = r.value
+    while getattr(r, "base", None) is not None:
+        r = r.base
+    return r
+
+
+def version(x):
+    """Number of in-place writes to the buffer behind `x` (views share it)."""
+    r = _root(x)
+    entry = _VERSIONS.get(id(r))
+    if entry is None or entry[0]() is not r:
+        return 0
+    lazy = getattr(x, "np", x)
+    if lazy.__class__ is _LazyValue:
+        # Counted from evaluation: a value saved while pending was at 0,
+        # even if it turned out to view a buffer written before.
+        return entry[1] - lazy.version0
+    return entry[1]
+
+
+def bump_version(x):
+    """Record an in-place write to the buffer behind `x`."""
+    r = _root(x)
+    key = id(r)
+    entry = _VERSIONS.get(key)
+    if entry is not None and entry[0]() is r:
+        entry[1] += 1
+        return
+    try:
+        ref = weakref.ref(r, lambda _, k=key: _VERSIONS.pop(k, None))
+    except TypeError:
+        ref = lambda b=r: b
+    _VERSIONS[key] = [ref, 1]
+
+
+def saved_versions(values):
+    """Versions of `values`, or None if none was ever written in place."""
+    if not _VERSIONS:
+        return None
+    vs = tuple(version(v) for v in values)
+    return vs if any(vs) else None
+
+
+def _buffer_id(x):
+    # Values are identified by their backend buffer: primitives re-wrap
+    # their inputs with `as_nd`, so the NDarray object itself is not stable.
+    return id(getattr(x, "np", x))
+
+
+class Tape:
     """
+    A linear record of Nodes plus an integer slot for every recorded value.
+
+    Slots are handed out at record time: each primitive output gets a fresh
+    slot, and each input is looked up (or assigned one on first sight).
+    Backward passes then keep gradients in a flat list indexed by slot
+    instead of hashing buffers on every edge.
 
-    out: Array
-    parents: tuple
-    grad_fn: Callable
+    Having a slot does not make a value require a gradient: a constant
+    used next to a tracked value gets one as a node parent. The tape
+    separately tracks the values that do (the leaves passed to `track`
+    and every node output), and only ops on those are recorded.
+
+    The buffer-id lookup is only done while recording. Every buffer with a
+    slot is kept alive by the Node that references it, so an id cannot be
+    reused by a different array while it is still in the table.
+    """
+
+    __slots__ = ("nodes", "num_slots", "_slot_of", "_requires")
+
+    def __init__(self):
+        self.nodes = []
+        self.num_slots = 0
+        self._slot_of = {}
+        self._requires = set()      # buffer ids of values that require grad
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __reversed__(self):
+        return reversed(self.nodes)
+
+    def _new_slot(self, x):
+        slot = self.num_slots
+        self.num_slots = slot + 1
+        self._slot_of[_buffer_id(x)] = slot
+        return slot
+
+    def slot(self, x):
+        """Return the slot of `x`, assigning a new one if it is unseen."""
+        s = self._slot_of.get(_buffer_id(x))
+        if s is None:
+            s = self._new_slot(x)
+        return s
+
+    def lookup(self, x):
+        """Return the slot of `x`, or None if it was never recorded."""
+        return self._slot_of.get(_buffer_id(x))
+
+    def track(self, x):
+        """Mark `x` (a differentiable leaf) as requiring grad; return its slot."""
+        self._requires.add(_buffer_id(x))
+        return self.slot(x)
+
+    def requires_grad(self, x):
+        """True if `x` is a tracked leaf or a recorded node output."""
+        return _buffer_id(x) in self._requires
+
+    def tracks(self, values):
+        """True if any of `values` requires grad on this tape."""
+        requires = self._requires
+        return any(_buffer_id(v) in requires for v in values)
+
+    def record(self, out, parents, grad_fn):
+        parent_slots = tuple(self.slot(p) for p in parents)
+        versions = saved_versions(tuple(parents) + (out,)) if _VERSIONS else None
+        node = Node(out, parents, grad_fn, self._new_slot(out), parent_slots, versions)
+        self._requires.add(_buffer_id(out))
+        self.nodes.append(node)
+        return node
+
+    def clear(self):
+        self.nodes.clear()
+        self._slot_of.clear()
+        self._requires.clear()
+
+    def stats(self, top=5):
+        """
+        Summarize what this tape is holding on to.
+
+        Memory is counted per owning buffer, so a view is charged to the
+        array it was taken from and a buffer shared by several nodes is
+        counted once.
+
+        Returns:
+            dict with
+              nodes          – number of recorded nodes
+              nodes_by_op    – {op name: node count}, largest first
+              output_bytes   – bytes of the buffers behind node outputs
+              retained_bytes – bytes of every buffer the nodes reference
+                               (outputs and inputs, i.e. saved activations)
+              largest        – the `top` largest retained buffers, as dicts
+                               with op, shape, dtype and bytes (op is the
+                               node that produced it, or "input")
+        """
+        by_op = {}
+        outputs = {}
+        retained = {}
+        for node in self.nodes:
+            if node.out is None:        # released by backward
+                continue
+            name = op_name(node.grad_fn)
+            by_op[name] = by_op.get(name, 0) + 1
+            r = _root(node.out)
+            outputs[id(r)] = r
+            if id(r) not in retained:
+                retained[id(r)] = (name, r)
+            for p in node.parents:
+                r = _root(p)
+                if id(r) not in retained:
+                    retained[id(r)] = ("input", r)
+
+        def nbytes(r):
+            return int(getattr(r, "nbytes", 0) or 0)
+
+        largest = sorted(retained.values(), key=lambda e: nbytes(e[1]), reverse=True)
+        return {
+            "nodes": len(self.nodes),
+            "nodes_by_op": dict(sorted(by_op.items(), key=lambda kv: kv[1], reverse=True)),
+            "output_bytes": sum(nbytes(r) for r in outputs.values()),
+            "retained_bytes": sum(nbytes(r) for _, r in retained.values()),
+            "largest": [
+                {
+                    "op": name,
+                    "shape": tuple(getattr(r, "shape", ())),
+                    "dtype": str(getattr(r, "dtype", "")),
+                    "bytes": nbytes(r),
+                }
+                for name, r in largest[:top]
+            ],
+        }
+
+
+class TangentTable:
+    """
+    Tangents of the values computed inside one `jvp` call.
+
+    Like the tape, values are identified by their backend buffer. Entries
+    only hold a weak reference to the primal buffer, so forward mode keeps
+    no intermediate alive: an entry disappears together with its primal.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self):
+        self._entries = {}
+
+    def set(self, x, t):
+        buf = getattr(x, "np", x)
+        key = id(buf)
+        entries = self._entries
+        try:
+            ref = weakref.ref(buf, lambda _, k=key: entries.pop(k, None))
+        except TypeError:
+            ref = lambda b=buf: b
+        entries[key] = (ref, t)
+
+    def get(self, x):
+        """Return the tangent of `x`, or None if it does not carry one."""
+        buf = getattr(x, "np", x)
+        entry = self._entries.get(id(buf))
+        if entry is None or entry[0]() is not buf:
+            return None
+        return entry[1]
+
+
+def _push_tangents(out, parents, jvp_fn, name):
+    """Propagate tangents from `parents` to `out` on every active level."""
+    global JVP_STACK
+    stack = JVP_STACK
+    for depth in range(len(stack) - 1, -1, -1):
+        level = stack[depth]
+        tangents = [level.get(p) for p in parents]
+        if all(t is None for t in tangents):
+            continue
+        if jvp_fn is None:
+            raise NotImplementedError(f"Function '{name}' has no jvp rule")
+
+        # The rule runs with only the outer levels active, so they see the
+        # tangent computation as ordinary ops (nested jvp).
+        JVP_STACK = stack[:depth]
+        try:
+            t = jvp_fn(*tangents)
+            if t is not None and t.shape != out.shape:
+                from .functions.primitive_array_ops import broadcast_to
+                t = broadcast_to(t, out.shape)
+        finally:
+            JVP_STACK = stack
+        if t is not None:
+            level.set(out, t)
 
 
 class function:
@@ -110,9 +539,14 @@ class function:
     Convert a low-level primitive into a traceable op in the autodiff system.
 
     A primitive must return either:
-        (out, parents, grad_fn)   – explicit parent list
+        (out, parents, grad_fn)           – explicit parent list
+        (out, parents, grad_fn, jvp_fn)   – plus a forward-mode rule
     or:
-        (out, grad_fn)            – parents inferred as `args`
+        (out, grad_fn)                    – parents inferred as `args`
+
+    `jvp_fn(*tangents)` receives one tangent per parent (None where the
+    parent carries none) and returns the tangent of `out`. It is only
+    called inside `jvp`, and only if some parent has a tangent.
 
     Parameters:
         fun: Callable
@@ -124,7 +558,10 @@ class function:
           (prevents accidental double tracing)
         – Validates output format.
         – After forward pass, records Node(out, parents, grad_fn)
-          into the active tape *if* recording is enabled.
+          into every active tape that tracks one of `parents`, *if*
+          recording is enabled. Outputs of untracked parents are
+          constants for that tape and are left off it.
+        – Inside `jvp`, computes the tangent of `out` with `jvp_fn`.
 
     Example primitive:
         def add_fun(x, y):
@@ -143,7 +580,7 @@ class function:
     def __init__(self, fun):
         self.fun = fun
 
-    def __call__(self, *args):
+    def _dispatch(self, *args):
 
         global _RECORDING
         prev = _RECORDING
@@ -158,8 +595,14 @@ class function:
                 )
 
             n = len(output)
+            jvp_fn = None
+
+            if n == 4:
+                out, parents, grad_fn, jvp_fn = output
+                if not isinstance(parents, (tuple, list)):
+                    raise TypeError("parents must be tuple/list")
 
-            if n == 3:
+            elif n == 3:
                 out, parents, grad_fn = output
                 if not isinstance(parents, (tuple, list)):
                     raise TypeError("parents must be tuple/list")
@@ -169,7 +612,9 @@ class function:
                 parents = args
 
             else:
-                raise ValueError("Function must return (out, parents, grad_fn) or (out, grad_fn)")
+                raise ValueError(
+                    "Function must return (out, parents, grad_fn[, jvp_fn]) or (out, grad_fn)"
+                )
             
             if not callable(grad_fn):
                 raise TypeError("grad_fn must be callable.")
@@ -177,9 +622,201 @@ class function:
         finally:
             _RECORDING = prev
 
-        # append to tape for dynamic mode
-        t = active_tape()
-        if t is not None and _RECORDING:
-            t.append(Node(out, parents, grad_fn))
-        
+        # append to every active tape for dynamic mode: an enclosing `grad`
+        # must see the inner forward pass to differentiate the inner backward
+        if _RECORDING:
+            for t in TAPE_STACK:
+                if t.tracks(parents):
+                    t.record(out, parents, grad_fn)
+
+        if JVP_STACK:
+            _push_tangents(out, parents, jvp_fn, self.fun.__name__)
+
         return out
+
+    __call__ = _dispatch
+
+
+# ----------------------------------------------------------------------
+# Registered primitives
+# ----------------------------------------------------------------------
+
+# name -> Primitive, filled as the `functions` modules are imported.
+PRIMITIVES = {}
+
+
+class _GradFn:
+    """The `grad_fn` of one recorded call: a registered rule plus its inputs."""
+
+    __slots__ = ("name", "rule", "out", "args", "params")
+
+    def __init__(self, name, rule, out, args, params):
+        self.name = name
+        self.rule = rule
+        self.out = out
+        self.args = args
+        self.params = params
+
+    def __call__(self, g):
+        return self.rule(g, self.out, *self.args, **self.params)
+
+
+def _no_grad(name):
+    def rule(g, out, *args, **params):
+        raise NotImplementedError(f"Primitive '{name}' has no grad rule")
+    return rule
+
+
+class Primitive:
+    """
+    A primitive op whose rules are defined once, at import time.
+
+    Unlike `function`, which is handed a fresh closure on every call, a
+    `Primitive` holds three module-level rules and a single dispatcher
+    (`__call__`) does the shared work: backend lookup, unwrapping the
+    array arguments, the "needs grad" check, wrapping, recording and
+    tangent propagation.
+
+    Rules
+    -----
+    impl(lib, *arrays, *static, **params) -> backend array
+        The forward computation on raw backend arrays.
+    grad(g, out, *arrays, *static, **params) -> tuple
+        One gradient per array argument. `arrays` are NDarrays sharing
+        the caller's buffers and `out` is the recorded output.
+    jvp(tangents, out, *arrays, *static, **params) -> tangent of `out`
+        `tangents` has one entry per array argument (None if absent).
+
+    The first `nargs` positional arguments are arrays (differentiable
+    inputs); anything after them, and all keyword arguments, are static
+    parameters passed through to every rule (axis, shape, ...).
+
+    Example
+    -------
+        @primitive(nargs=2)
+        def add(lib, x, y):
+            return lib.add(x, y)
+
+        @add.defgrad
+        def _add_grad(g, out, x, y):
+            return g, g
+    """
+
+    def __init__(self, impl, nargs=1):
+        self.impl = impl
+        self.nargs = nargs
+        self.name = impl.__name__
+        self.grad_rule = _no_grad(self.name)
+        self.jvp_rule = None
+        self.__name__ = self.name
+        self.__qualname__ = impl.__qualname__
+        self.__doc__ = impl.__doc__
+        self.__module__ = impl.__module__
+        PRIMITIVES[self.name] = self
+
+    def __repr__(self):
+        return f"<primitive {self.name}>"
+
+    def defgrad(self, rule):
+        """Register the reverse-mode rule (usable as a decorator)."""
+        self.grad_rule = rule
+        return rule
+
+    def defjvp(self, rule):
+        """Register the forward-mode rule (usable as a decorator)."""
+        self.jvp_rule = rule
+        return rule
+
+    def _dispatch(self, *args, **params):
+        n = self.nargs
+        arrays = args[:n]
+        static = args[n:]
+        raws = [getattr(a, "np", a) for a in arrays]
+        out = self.impl(xp(), *raws, *static, **params)
+
+        if not needs_grad(*arrays):
+            return untracked(out)
+
+        out = _wrap(out)
+        parents = tuple(
+            _wrap(_weak_scalar(r, raws) if type(r) in _PY_SCALARS else r) for r in raws
+        )
+        rule_args = parents + static if static else parents
+
+        if _RECORDING:
+            grad_fn = None
+            for t in TAPE_STACK:
+                if t.tracks(parents):
+                    if grad_fn is None:
+                        grad_fn = _GradFn(self.name, self.grad_rule, out, rule_args, params)
+                    t.record(out, parents, grad_fn)
+
+        if JVP_STACK:
+            rule = self.jvp_rule
+            jvp_fn = None if rule is None else (
+                lambda *tangents: rule(tangents, out, *rule_args, **params)
+            )
+            _push_tangents(out, parents, jvp_fn, self.name)
+
+        return out
+
+    __call__ = _dispatch
+
+
+def primitive(nargs=1):
+    """Decorator registering `impl` as a `Primitive` with `nargs` array inputs."""
+    def deco(impl):
+        return Primitive(impl, nargs)
+    return deco
+
+
+
+# ----------------------------------------------------------------------
+# Call hooks
+# ----------------------------------------------------------------------
+
+# Order of the built-in hooks in the chain, outermost first. The profiler
+# times everything below it; autocast casts the arguments before strict
+# mode checks the result against them.
+HOOK_PROFILER = 0
+HOOK_AUTOCAST = 10
+HOOK_STRICT = 20
+
+# cls -> [(order, hook)], outermost first.
+_CALL_HOOKS = {Primitive: [], function: []}
+
+
+def add_call_hook(hook, order, cls=Primitive):
+    """
+    Wrap every call of `cls` (`Primitive` or `function`) with `hook`.
+
+    `hook(call, op, *args, **params)` runs in place of the call and must
+    invoke `call(op, *args, **params)` to continue down the chain. Hooks
+    are ordered by `order` (lower is outer; ties keep registration order),
+    so they can be added and removed in any order. With no hooks left,
+    `__call__` is the plain dispatcher again and the chain costs nothing.
+    """
+    hooks = _CALL_HOOKS[cls]
+    hooks.append((order, hook))
+    hooks.sort(key=lambda e: e[0])
+    _install_hooks(cls)
+
+
+def remove_call_hook(hook, cls=Primitive):
+    """Remove a hook added with `add_call_hook` (no-op if absent)."""
+    hooks = _CALL_HOOKS[cls]
+    hooks[:] = [e for e in hooks if e[1] is not hook]
+    _install_hooks(cls)
+
+
+def _link(hook, call):
+    def hooked(op, *args, **params):
+        return hook(call, op, *args, **params)
+    return hooked
+
+
+def _install_hooks(cls):
+    call = cls._dispatch
+    for _, hook in reversed(_CALL_HOOKS[cls]):
+        call = _link(hook, call)
+    cls.__call__ = call
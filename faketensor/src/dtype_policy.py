@@ -0,0 +1,133 @@
+"""
+Default floating-point dtype policy and strict upcast checking.
+
+    ft.set_default_dtype(ft.float32)          # global (the initial default)
+
+    with ft.dtype_policy(ft.float16):         # scoped
+        ...
+
+    with ft.dtype_policy(strict=True):        # raise on silent upcasts
+        grads = ft.grad(loss)(model, x, y)
+
+The default float dtype is what values created without an explicit dtype
+get:
+
+  • `ones`, `zeros` and `full` (with a float fill value)
+  • Python floats and lists of floats turned into arrays (`as_ndarray`)
+  • the gradient seed of a non-floating output
+
+Backend arrays passed in keep their own dtype. Python scalars used as
+operands (`x * 2.0`, `x ** 2`) never widen the array they meet, in
+forward or backward: they take that array's dtype.
+
+Strict mode checks every primitive, forward and backward, and raises
+`DTypePromotionError` when its floating-point result is wider than its
+narrowest floating-point input (e.g. float32 mixed with float64), or,
+with no floating inputs, wider than the default dtype (e.g. int / int).
+Like the profiler, it adds a call hook on `Primitive` while active and
+costs nothing otherwise.
+"""
+
+from contextlib import contextmanager
+
+from ..backend.backend import xp
+from .DType import DType, float32, normalize_dtype
+from . import base
+
+
+class DTypePromotionError(TypeError):
+    """A primitive widened a floating-point dtype while strict mode was on."""
+
+
+_DEFAULT = float32
+_STRICT = False
+
+
+def default_float():
+    """The default float dtype as a native (numpy/cupy) dtype."""
+    return _DEFAULT.to_native(xp())
+
+
+def get_default_dtype():
+    """The default float dtype (a `DType`)."""
+    return _DEFAULT
+
+
+def _as_dtype(dtype):
+    native = xp().dtype(normalize_dtype(dtype))
+    if native.kind != "f":
+        raise TypeError(f"The default dtype must be floating-point, got {native}")
+    return DType(native.name)
+
+
+def set_default_dtype(dtype=None, strict=None):
+    """
+    Set the global dtype policy.
+
+    Args:
+        dtype: New default float dtype (`ft.float32`, 'float64', ...);
+            None keeps the current one.
+        strict (bool | None): Turn strict upcast checking on or off;
+            None keeps the current setting.
+    """
+    global _DEFAULT
+    if dtype is not None:
+        _DEFAULT = _as_dtype(dtype)
+    if strict is not None:
+        _set_strict(strict)
+
+
+@contextmanager
+def dtype_policy(dtype=None, strict=None):
+    """
+    Use `dtype` as the default float dtype (and/or `strict` mode) inside
+    the block; the previous policy is restored on exit.
+    """
+    prev = (_DEFAULT, _STRICT)
+    set_default_dtype(dtype, strict)
+    try:
+        yield
+    finally:
+        set_default_dtype(prev[0], prev[1])
+
+
+# ----------------------------------------------------------------------
+# Strict mode
+# ----------------------------------------------------------------------
+
+def _set_strict(on):
+    global _STRICT
+    on = bool(on)
+    if on == _STRICT:
+        return
+    if on:
+        base.add_call_hook(_strict_call, base.HOOK_STRICT)
+    else:
+        base.remove_call_hook(_strict_call)
+    _STRICT = on
+
+
+def _strict_call(call, p, *args, **params):
+    out = call(p, *args, **params)
+    _check(p, args[:p.nargs], out)
+    return out
+
+
+def _float_dtype(x):
+    dt = getattr(base.raw(x), "dtype", None)
+    return dt if dt is not None and dt.kind == "f" else None
+
+
+def _check(p, arrays, out):
+    dt = _float_dtype(out)
+    if dt is None or p.name == "cast":   # explicit casts are intended
+        return
+    ins = [d for d in map(_float_dtype, arrays) if d is not None]
+    limit = min(ins, key=lambda d: d.itemsize) if ins else xp().dtype(default_float())
+    if dt.itemsize > limit.itemsize:
+        given = ", ".join(str(getattr(base.raw(a), "dtype", type(a).__name__)) for a in arrays)
+        raise DTypePromotionError(
+            f"'{p.name}' promoted its result to {dt} (inputs: {given}; "
+            f"default dtype {_DEFAULT.name}). Cast the inputs explicitly "
+            "or leave strict mode."
+        )
@@ -1,3 +1,4 @@
 from .primitive_arithmetic import *
 from .primitive_reduct import *
-from .primitive_array_ops import *
\ No newline at end of file
+from .primitive_array_ops import *
+from .primitive_indexing import *
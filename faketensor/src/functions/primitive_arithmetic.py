@@ -2,13 +2,14 @@
 Vectorized primitive array operations with autograd support.
 
 This module defines core numerical operations (add, multiply, matmul, etc.)
-for the FakeTensor autograd system. Each operation is wrapped using `function`,
-which records the forward pass, its inputs, and a gradient function that
-computes partial derivatives during the backward pass.
+for the FakeTensor autograd system. Each operation is a registered
+`Primitive`: its forward computation, gradient rule and jvp rule are
+module-level functions, and the shared dispatcher in `base` records the
+call and binds the rules to its inputs.
 
 All operations support:
     • Broadcasting (NumPy/CuPy rules)
-    • Higher-order gradients (via functional closures)
+    • Higher-order gradients (rules are written with primitives)
     • Mixed scalar/array inputs
     • Any backend implementing the xp() interface (NumPy or CuPy)
 
@@ -17,22 +18,35 @@ FakeTensor NDarray, backend arrays, or Python scalars.
 """
 
 from __future__ import annotations
+import numpy as np
 from .._typing import Array as A
-from ..base import function
+from ..base import primitive, raw
 from ..utils import broadcast_backward
-from ...backend.backend import xp
-from .primitive_array_ops import squeeze
+from .primitive_array_ops import squeeze, expand_dims
 from .primitive_reduct import max
 
 # Allow scalars as valid inputs
 Array = A | int | float
 
 
+def _shape(x):
+    # Python scalars are accepted as operands and have no `.shape`.
+    return getattr(x, "shape", ())
+
+
+def _sum_tangents(a, b):
+    """Add two optional tangents."""
+    if a is None:
+        return b
+    return a if b is None else add(a, b)
+
+
 # =====================================================================
 # ADD
 # =====================================================================
 
-def add(x: Array, y: Array):
+@primitive(nargs=2)
+def add(lib, x: Array, y: Array):
     """
     Elementwise addition: ``x + y``.
 
@@ -46,29 +60,27 @@ def add(x: Array, y: Array):
     Autograd:
         dx = broadcast_backward(g, x.shape)
         dy = broadcast_backward(g, y.shape)
+        jvp: tx + ty
     """
-    lib = xp()
-
-    def _fun(x, y):
-        from ..array import as_nd
+    return lib.add(x, y)
 
-        out = as_nd(lib.add(x, y))
 
-        def grad_fn(g):
-            g1 = broadcast_backward(g, x.shape)
-            g2 = broadcast_backward(g, y.shape)
-            return g1, g2
+@add.defgrad
+def _add_grad(g, out, x, y):
+    return broadcast_backward(g, _shape(x)), broadcast_backward(g, _shape(y))
 
-        return out, (as_nd(x), as_nd(y)), grad_fn
 
-    return function(_fun)(x, y)
+@add.defjvp
+def _add_jvp(tangents, out, x, y):
+    return _sum_tangents(*tangents)
 
 
 # =====================================================================
 # SUBTRACT
 # =====================================================================
 
-def subtract(x: Array, y: Array):
+@primitive(nargs=2)
+def subtract(lib, x: Array, y: Array):
     """
     Elementwise subtraction: ``x - y``.
 
@@ -79,28 +91,28 @@ def subtract(x: Array, y: Array):
     Returns:
         A: Result of elementwise subtraction.
     """
-    lib = xp()
-
-    def _fun(x, y):
-        from ..array import as_nd, negative
+    return lib.subtract(x, y)
 
-        out = as_nd(lib.subtract(x, y))
 
-        def grad_fn(g):
-            g1 = broadcast_backward(g, x.shape)
-            g2 = broadcast_backward(negative(g), y.shape)
-            return g1, g2
+@subtract.defgrad
+def _subtract_grad(g, out, x, y):
+    return broadcast_backward(g, _shape(x)), broadcast_backward(negative(g), _shape(y))
 
-        return out, (as_nd(x), as_nd(y)), grad_fn
 
-    return function(_fun)(x, y)
+@subtract.defjvp
+def _subtract_jvp(tangents, out, x, y):
+    tx, ty = tangents
+    if ty is None:
+        return tx
+    return negative(ty) if tx is None else subtract(tx, ty)
 
 
 # =====================================================================
 # NEGATIVE
 # =====================================================================
 
-def negative(x: Array):
+@primitive(nargs=1)
+def negative(lib, x: Array):
     """
     Elementwise negation: ``-x``.
 
@@ -110,26 +122,25 @@ def negative(x: Array):
     Returns:
         A: The negated tensor.
     """
-    lib = xp()
+    return lib.negative(x)
 
-    def _fun(x):
-        from ..array import as_nd, negative as neg
 
-        out = as_nd(lib.negative(x))
+@negative.defgrad
+def _negative_grad(g, out, x):
+    return negative(g),
 
-        def grad_fn(g):
-            return neg(g),
 
-        return out, (as_nd(x),), grad_fn
-
-    return function(_fun)(x)
+@negative.defjvp
+def _negative_jvp(tangents, out, x):
+    return negative(tangents[0])
 
 
 # =====================================================================
 # MULTIPLY
 # =====================================================================
 
-def multiply(x: Array, y: Array):
+@primitive(nargs=2)
+def multiply(lib, x: Array, y: Array):
     """
     Elementwise multiplication: ``x * y``.
 
@@ -140,29 +151,31 @@ def multiply(x: Array, y: Array):
     Returns:
         A: Result of elementwise multiplication.
     """
-    lib = xp()
-
-    def _fun(x, y):
-        from ..array import as_nd
-        from . import multiply as mul  # safe recursive use
+    return lib.multiply(x, y)
 
-        out = as_nd(lib.multiply(x, y))
 
-        def grad_fn(g):
-            g1 = broadcast_backward(mul(g, y), x.shape)
-            g2 = broadcast_backward(mul(g, x), y.shape)
-            return g1, g2
+@multiply.defgrad
+def _multiply_grad(g, out, x, y):
+    g1 = broadcast_backward(multiply(g, y), _shape(x))
+    g2 = broadcast_backward(multiply(g, x), _shape(y))
+    return g1, g2
 
-        return out, (as_nd(x), as_nd(y)), grad_fn
 
-    return function(_fun)(x, y)
+@multiply.defjvp
+def _multiply_jvp(tangents, out, x, y):
+    # tx * y + x * ty
+    tx, ty = tangents
+    dx = None if tx is None else multiply(tx, y)
+    dy = None if ty is None else multiply(x, ty)
+    return _sum_tangents(dx, dy)
 
 
 # =====================================================================
 # DIVIDE
 # =====================================================================
 
-def divide(x: Array, y: Array):
+@primitive(nargs=2)
+def divide(lib, x: Array, y: Array):
     """
     Elementwise division: ``x / y``.
 
@@ -173,32 +186,48 @@ def divide(x: Array, y: Array):
     Returns:
         A: Result of elementwise division.
     """
-    lib = xp()
-
-    def _fun(x, y):
-        from ..array import as_nd, negative
-        from . import multiply as mul, power, divide as div
+    return lib.divide(x, y)
 
-        out = as_nd(lib.divide(x, y))
 
-        def grad_fn(g):
-            g1 = broadcast_backward(mul(g, div(as_nd(1.0), y)), x.shape)
-            g2 = broadcast_backward(
-                negative(mul(g, mul(x, power(y, as_nd(-2))))),
-                y.shape,
-            )
-            return g1, g2
+@divide.defgrad
+def _divide_grad(g, out, x, y):
+    # d/dy = -x / y^2 = -out / y
+    g1 = broadcast_backward(divide(g, y), _shape(x))
+    g2 = broadcast_backward(negative(multiply(g, divide(out, y))), _shape(y))
+    return g1, g2
 
-        return out, (as_nd(x), as_nd(y)), grad_fn
 
-    return function(_fun)(x, y)
+@divide.defjvp
+def _divide_jvp(tangents, out, x, y):
+    # (tx - out * ty) / y
+    tx, ty = tangents
+    if ty is None:
+        return divide(tx, y)
+    dy = multiply(out, ty)
+    return divide(negative(dy) if tx is None else subtract(tx, dy), y)
 
 
 # =====================================================================
 # LOG
 # =====================================================================
 
-def log(x: Array):
+_LOG_EPS = 1e-12
+
+
+def _log_eps(x):
+    """
+    Clamp used by `log` for `x`: 1e-12, raised to the smallest normal
+    number of float dtypes that cannot hold it (it is 0 in float16).
+    """
+    dt = getattr(raw(x), "dtype", None)
+    if dt is None or np.dtype(dt).kind != "f":
+        return _LOG_EPS
+    tiny = float(np.finfo(dt).tiny)
+    return tiny if tiny > _LOG_EPS else _LOG_EPS
+
+
+@primitive(nargs=1)
+def log(lib, x: Array):
     """
     Natural logarithm: ``log(x)``.
 
@@ -210,30 +239,27 @@ def log(x: Array):
 
     Autograd:
         d/dx log(x) = 1/x
+        jvp: tx / x
     """
-    lib = xp()
-
-    def _fun(x):
-        from ..array import as_nd
-
-        eps = 1e-12
-        inp = lib.maximum(x, eps)
-        out = as_nd(lib.log(inp))  # clamp
+    return lib.log(lib.maximum(x, _log_eps(x)))  # clamp
 
-        def grad_fn(g):
-            return (g / (x + eps),)
 
-        return out, (as_nd(x),), grad_fn
+@log.defgrad
+def _log_grad(g, out, x):
+    return divide(g, add(x, _log_eps(x))),
 
 
-    return function(_fun)(x)
+@log.defjvp
+def _log_jvp(tangents, out, x):
+    return divide(tangents[0], add(x, _log_eps(x)))
 
 
 # =====================================================================
 # POWER (x ** y)
 # =====================================================================
 
-def power(x: Array, y: Array):
+@primitive(nargs=2)
+def power(lib, x: Array, y: Array):
     """
     Elementwise power: ``x ** y``.
 
@@ -244,32 +270,33 @@ def power(x: Array, y: Array):
     Returns:
         A: Result of ``x ** y``.
     """
-    lib = xp()
+    return lib.power(x, y)
 
-    def _fun(x, y):
-        from ..array import as_nd
-        from . import add, subtract, multiply, log, power
 
-        out = as_nd(lib.power(x, y))
+@power.defgrad
+def _power_grad(g, out, x, y):
+    # d/dx = y * x^(y-1)
+    dx = multiply(g, multiply(y, power(x, subtract(y, 1))))
+    # d/dy = (x^y) * log(x)
+    dy = multiply(g, multiply(out, log(x)))
+    return broadcast_backward(dx, _shape(x)), broadcast_backward(dy, _shape(y))
 
-        def grad_fn(g):
-            # d/dx = y * x^(y-1)
-            dx = multiply(g, multiply(y, power(x, subtract(y, as_nd(1)))))
-            # d/dy = (x^y) * log(x)
-            dy = multiply(g, multiply(out, log(x)))
 
-            return broadcast_backward(dx, x.shape), broadcast_backward(dy, y.shape)
-
-        return out, (as_nd(x), as_nd(y)), grad_fn
-
-    return function(_fun)(x, y)
+@power.defjvp
+def _power_jvp(tangents, out, x, y):
+    # tx * y * x^(y-1) + ty * x^y * log(x)
+    tx, ty = tangents
+    dx = None if tx is None else multiply(tx, multiply(y, power(x, subtract(y, 1))))
+    dy = None if ty is None else multiply(ty, multiply(out, log(x)))
+    return _sum_tangents(dx, dy)
 
 
 # =====================================================================
 # TRANSPOSE
 # =====================================================================
 
-def transpose(x: Array, axes=None):
+@primitive(nargs=1)
+def transpose(lib, x: Array, axes=None):
     """
     Permute tensor axes.
 
@@ -280,31 +307,35 @@ def transpose(x: Array, axes=None):
     Returns:
         A: Transposed tensor.
     """
-    lib = xp()
-
-    def _fun(x):
-        from ..array import as_nd
-        from . import transpose
+    return lib.transpose(x, axes=axes)
 
-        out = as_nd(lib.transpose(x, axes=axes))
 
-        def grad_fn(g):
-            if axes is None:
-                rev_axes = None
-            else:
-                rev_axes = tuple(lib.argsort(lib.array(axes)))
-            return as_nd(transpose(g, axes=rev_axes)),
+@transpose.defgrad
+def _transpose_grad(g, out, x, axes=None):
+    if axes is None:
+        rev_axes = None
+    else:
+        rev_axes = tuple(sorted(range(len(axes)), key=axes.__getitem__))
+    return transpose(g, axes=rev_axes),
 
-        return out, (as_nd(x),), grad_fn
 
-    return function(_fun)(x)
+@transpose.defjvp
+def _transpose_jvp(tangents, out, x, axes=None):
+    return transpose(tangents[0], axes=axes)
 
 
 # =====================================================================
 # MATMUL
 # =====================================================================
 
-def matmul(a: Array, b: Array):
+def _swap_last(x):
+    """Swap the last two axes (differentiable)."""
+    axes = tuple(range(x.ndim - 2)) + (x.ndim - 1, x.ndim - 2)
+    return transpose(x, axes=axes)
+
+
+@primitive(nargs=2)
+def matmul(lib, a: Array, b: Array):
     """
     Matrix multiplication: ``a @ b``.
 
@@ -322,40 +353,33 @@ def matmul(a: Array, b: Array):
     Returns:
         A: The matrix product.
     """
-    lib = xp()
-
-    def _fun(a, b):
-        from ..array import as_nd
-        from . import matmul
-        from .primitive_array_ops import expand_dims
-
-        out = as_nd(lib.matmul(a, b))
-
-        def grad_fn(g):
-            A, B, G = a, b, g
-
-            # ----------------------------
-            # dA
-            # ----------------------------
-            if A.ndim == 1:              # vector @ matrix
-                A2 = expand_dims(A, 0)  # (1, K)
-                G2 = G if G.ndim > 1 else expand_dims(G, 0)
-                dA = squeeze(matmul(G2, lib.swapaxes(B, -1, -2)), 0)
-            else:
-                dA = G @ lib.swapaxes(B, -1, -2)
-
-            # ----------------------------
-            # dB
-            # ----------------------------
-            if B.ndim == 1:              # matrix @ vector
-                B2 = expand_dims(B, -1)  # (K, 1)
-                G2 = G if G.ndim > 1 else expand_dims(G, -1)
-                dB = squeeze(matmul(lib.swapaxes(A, -1, -2), G2), -1)
-            else:
-                dB = matmul(lib.swapaxes(A, -1, -2), G)
-
-            return as_nd(dA), as_nd(dB)
-
-        return out, (as_nd(a), as_nd(b)), grad_fn
-
-    return function(_fun)(a, b)
+    return lib.matmul(a, b)
+
+
+@matmul.defgrad
+def _matmul_grad(g, out, A, B):
+    # Promote vectors to matrices: (K,) -> (1, K) on the left,
+    # (K,) -> (K, 1) on the right, and give g the matching unit axes.
+    A2 = expand_dims(A, 0) if A.ndim == 1 else A
+    B2 = expand_dims(B, -1) if B.ndim == 1 else B
+    G2 = expand_dims(g, -1) if B.ndim == 1 else g
+    G2 = expand_dims(G2, -2) if A.ndim == 1 else G2
+
+    dA = matmul(G2, _swap_last(B2))
+    dB = matmul(_swap_last(A2), G2)
+    if A.ndim == 1:
+        dA = squeeze(dA, -2)
+    if B.ndim == 1:
+        dB = squeeze(dB, -1)
+
+    # Reduce the stacking dims that were broadcast (batched matmul).
+    return broadcast_backward(dA, A.shape), broadcast_backward(dB, B.shape)
+
+
+@matmul.defjvp
+def _matmul_jvp(tangents, out, a, b):
+    # ta @ b + a @ tb
+    ta, tb = tangents
+    da = None if ta is None else matmul(ta, b)
+    db = None if tb is None else matmul(a, tb)
+    return _sum_tangents(da, db)
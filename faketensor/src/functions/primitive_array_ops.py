@@ -1,9 +1,10 @@
 """
 Shape-manipulation and common array operations with autograd support.
 
-This module defines reshape, expand_dims, squeeze, clip, and abs for FakeTensor.
-Each operation uses the `function` wrapper, storing its inputs and a
-gradient function for reverse-mode autodiff.
+This module defines reshape, expand_dims, squeeze, broadcast_to, cast, clip
+and abs for FakeTensor. Each operation is a registered `Primitive` with a forward
+computation, a gradient rule for reverse-mode autodiff and a forward-mode
+(jvp) rule.
 
 All operations support:
     • Broadcasting (for clip/abs)
@@ -13,9 +14,11 @@ All operations support:
 
 from __future__ import annotations
 from .._typing import Array as A
-from ..base import function
+from ..base import primitive
 from ..utils import broadcast_backward
+from ..DType import normalize_dtype
 from ...backend.backend import xp
+from . import primitive_arithmetic as _arith
 
 Array = A   # alias
 
@@ -24,7 +27,8 @@ Array = A   # alias
 # RESHAPE
 # =====================================================================
 
-def reshape(x: Array, shape):
+@primitive(nargs=1)
+def reshape(lib, x: Array, shape):
     """
     Reshape tensor to a new shape.
 
@@ -38,27 +42,25 @@ def reshape(x: Array, shape):
     Gradient:
         d/dx reshape(x, shape) = reshape(g, x.shape)
     """
-    lib = xp()
+    return lib.reshape(x, shape)
 
-    def _fun(x):
-        from ..array import as_nd
-        from . import reshape
-        x_nd = as_nd(x)
-        out = as_nd(lib.reshape(x_nd, shape))
 
-        def grad_fn(g):
-            return reshape(g, x_nd.shape),
+@reshape.defgrad
+def _reshape_grad(g, out, x, shape):
+    return reshape(g, x.shape),
 
-        return out, (x_nd,), grad_fn
 
-    return function(_fun)(x)
+@reshape.defjvp
+def _reshape_jvp(tangents, out, x, shape):
+    return reshape(tangents[0], shape)
 
 
 # =====================================================================
 # EXPAND_DIMS
 # =====================================================================
 
-def expand_dims(x: Array, axis):
+@primitive(nargs=1)
+def expand_dims(lib, x: Array, axis):
     """
     Insert a new axis at the specified position.
 
@@ -72,27 +74,25 @@ def expand_dims(x: Array, axis):
     Gradient:
         d/dx expand_dims(x, axis) = squeeze(g, axis)
     """
-    lib = xp()
+    return lib.expand_dims(x, axis)
 
-    def _fun(x):
-        from ..array import as_nd
-        from . import squeeze
-        x_nd = as_nd(x)
-        out = as_nd(lib.expand_dims(x_nd, axis))
 
-        def grad_fn(g):
-            return squeeze(g, axis=axis),
+@expand_dims.defgrad
+def _expand_dims_grad(g, out, x, axis):
+    return squeeze(g, axis=axis),
 
-        return out, (x_nd,), grad_fn
 
-    return function(_fun)(x)
+@expand_dims.defjvp
+def _expand_dims_jvp(tangents, out, x, axis):
+    return expand_dims(tangents[0], axis)
 
 
 # =====================================================================
 # SQUEEZE
 # =====================================================================
 
-def squeeze(x: Array, axis=None):
+@primitive(nargs=1)
+def squeeze(lib, x: Array, axis=None):
     """
     Remove axes of size 1.
 
@@ -106,28 +106,90 @@ def squeeze(x: Array, axis=None):
     Gradient:
         d/dx squeeze(x, axis) = expand_dims(g, axis)
     """
-    lib = xp()
+    return lib.squeeze(x, axis=axis)
 
-    def _fun(x):
-        from ..array import as_nd
-        from . import expand_dims
-        x_nd = as_nd(x)
-        out = as_nd(lib.squeeze(x_nd, axis=axis))
 
-        def grad_fn(g):
-            # Note: expand_dims requires exact axis integer or tuple.
-            return expand_dims(g, axis=axis),
+@squeeze.defgrad
+def _squeeze_grad(g, out, x, axis=None):
+    # Note: expand_dims requires exact axis integer or tuple.
+    return expand_dims(g, axis),
 
-        return out, (x_nd,), grad_fn
 
-    return function(_fun)(x)
+@squeeze.defjvp
+def _squeeze_jvp(tangents, out, x, axis=None):
+    return squeeze(tangents[0], axis=axis)
+
+
+# =====================================================================
+# BROADCAST_TO
+# =====================================================================
+
+@primitive(nargs=1)
+def broadcast_to(lib, x: Array, shape):
+    """
+    Broadcast a tensor to a new shape.
+
+    Args:
+        x (Array): Input tensor.
+        shape (tuple[int]): Target shape (NumPy broadcasting rules).
+
+    Returns:
+        A: Broadcast (read-only view) tensor.
+
+    Gradient:
+        d/dx broadcast_to(x, shape) = broadcast_backward(g, x.shape)
+    """
+    return lib.broadcast_to(x, shape)
+
+
+@broadcast_to.defgrad
+def _broadcast_to_grad(g, out, x, shape):
+    return broadcast_backward(g, x.shape),
+
+
+@broadcast_to.defjvp
+def _broadcast_to_jvp(tangents, out, x, shape):
+    return broadcast_to(tangents[0], shape)
+
+
+# =====================================================================
+# CAST
+# =====================================================================
+
+@primitive(nargs=1)
+def cast(lib, x: Array, dtype):
+    """
+    Convert a tensor to another dtype (always a new array).
+
+    Args:
+        x (Array): Input tensor.
+        dtype: Target dtype (a native dtype or a faketensor `DType`).
+
+    Returns:
+        A: `x` as `dtype`.
+
+    Gradient:
+        d/dx cast(x, dtype) = cast(g, x.dtype)
+    """
+    return x.astype(normalize_dtype(dtype))
+
+
+@cast.defgrad
+def _cast_grad(g, out, x, dtype):
+    return cast(g, x.dtype),
+
+
+@cast.defjvp
+def _cast_jvp(tangents, out, x, dtype):
+    return cast(tangents[0], dtype)
 
 
 # =====================================================================
 # CLIP
 # =====================================================================
 
-def clip(x: Array, min_val, max_val):
+@primitive(nargs=1)
+def clip(lib, x: Array, min_val, max_val):
     """
     Clip values to the range [min_val, max_val].
 
@@ -143,28 +205,30 @@ def clip(x: Array, min_val, max_val):
         g if x ∈ [min_val, max_val]
         0 otherwise (subgradient chosen as 0 at boundary)
     """
-    lib = xp()
+    return lib.clip(x, min_val, max_val)
+
+
+def _clip_mask(x, min_val, max_val):
+    x_raw = x.np
+    return (x_raw >= min_val) & (x_raw <= max_val)
 
-    def _fun(x):
-        from ..array import as_nd
-        from .primitive_arithmetic import multiply as mul
-        x_nd = as_nd(x)
-        out = as_nd(lib.clip(x_nd, min_val, max_val))
 
-        def grad_fn(g):
-            mask = (x_nd >= min_val) & (x_nd <= max_val)
-            return mul(g, mask),
+@clip.defgrad
+def _clip_grad(g, out, x, min_val, max_val):
+    return _arith.multiply(g, _clip_mask(x, min_val, max_val)),
 
-        return out, (x_nd,), grad_fn
 
-    return function(_fun)(x)
+@clip.defjvp
+def _clip_jvp(tangents, out, x, min_val, max_val):
+    return _arith.multiply(tangents[0], _clip_mask(x, min_val, max_val))
 
 
 # =====================================================================
 # ABS
 # =====================================================================
 
-def abs(x: Array):
+@primitive(nargs=1)
+def abs(lib, x: Array):
     """
     Elementwise absolute value.
 
@@ -178,16 +242,14 @@ def abs(x: Array):
         d/dx abs(x) = sign(x)
         (subgradient at 0 chosen as 0)
     """
-    lib = xp()
+    return lib.abs(x)
 
-    def _fun(x):
-        from ..array import as_nd
-        x_nd = as_nd(x)
-        out = as_nd(lib.abs(x_nd))
 
-        def grad_fn(g):
-            return as_nd(g * lib.sign(x_nd)),
+@abs.defgrad
+def _abs_grad(g, out, x):
+    return _arith.multiply(g, xp().sign(x.np)),
 
-        return out, (x_nd,), grad_fn
 
-    return function(_fun)(x)
+@abs.defjvp
+def _abs_jvp(tangents, out, x):
+    return _arith.multiply(tangents[0], xp().sign(x.np))
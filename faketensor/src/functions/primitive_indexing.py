@@ -0,0 +1,281 @@
+"""
+Indexing, gather and scatter operations with autograd support.
+
+This module defines getitem, take, gather, scatter and scatter_add for
+FakeTensor. Each operation is a registered `Primitive` with a forward
+computation, a gradient rule for reverse-mode autodiff and a forward-mode
+(jvp) rule.
+
+    • getitem      – `x[key]`; basic keys (ints, slices, None, ...) give
+                     zero-copy views, advanced keys (integer or boolean
+                     arrays) gather
+    • take         – `xp().take(x, indices, axis)`
+    • gather       – `xp().take_along_axis(x, indices, axis)`
+    • scatter      – zeros of a given shape with values added at `[key]`;
+                     the adjoint of getitem
+    • scatter_add  – `x` with values added along `axis`; the adjoint of
+                     gather
+
+Gradients of the selecting ops are scatters that write only the selected
+entries of a zero buffer (repeated indices accumulate), instead of the
+dense one-hot products the same selection would need otherwise.
+"""
+
+from __future__ import annotations
+import numpy as _np
+from .._typing import Array as A
+from ..base import primitive
+from ...backend.backend import xp, apply
+from .primitive_array_ops import reshape
+
+Array = A   # alias
+
+
+def _raw_key(key):
+    """Index key with NDarrays replaced by their backend arrays."""
+    if isinstance(key, tuple):
+        return tuple(getattr(k, "np", k) for k in key)
+    return getattr(key, "np", key)
+
+
+def _is_basic(key):
+    """True if `key` only holds ints, slices, None and Ellipsis (a view, no repeats)."""
+    items = key if isinstance(key, tuple) else (key,)
+    for k in items:
+        if k is None or k is Ellipsis or isinstance(k, slice):
+            continue
+        if isinstance(k, bool) or not hasattr(k, "__index__") or getattr(k, "ndim", 0):
+            return False
+    return True
+
+
+def _axis_key(indices, axis, ndim):
+    """Key equivalent to `take(x, indices, axis)` for an `ndim`-d `x`."""
+    return (slice(None),) * (axis % ndim) + (indices,)
+
+
+def _along_axis_key(indices, axis, ndim, lib):
+    """Key equivalent to `take_along_axis(x, indices, axis)`."""
+    axis = axis % ndim
+    key = []
+    for d in range(ndim):
+        if d == axis:
+            key.append(indices)
+        else:
+            shape = [1] * ndim
+            shape[d] = indices.shape[d]
+            key.append(lib.arange(indices.shape[d]).reshape(shape))
+    return tuple(key)
+
+
+def _scatter_into(lib, out, key, updates):
+    """Add `updates` into `out[key]` in place; repeated indices accumulate."""
+    if _is_basic(key):
+        out[key] += updates
+    else:
+        lib.add.at(out, key, updates)
+    return out
+
+
+def _scatter(lib, updates, key, shape):
+    out = lib.zeros(shape, dtype=lib.result_type(updates))
+    return _scatter_into(lib, out, key, updates)
+
+
+def _scatter_add(lib, x, indices, updates, axis):
+    key = _along_axis_key(indices, axis, x.ndim, lib)
+    out = lib.array(x, dtype=lib.result_type(x, updates), copy=True)
+    return _scatter_into(lib, out, key, updates)
+
+
+# =====================================================================
+# GETITEM
+# =====================================================================
+
+@primitive(nargs=1)
+def getitem(lib, x: Array, key):
+    """
+    Index a tensor: ``x[key]``.
+
+    Args:
+        x (Array): Input tensor.
+        key: Any NumPy index (ints, slices, None, Ellipsis, integer or
+            boolean arrays, or a tuple of these).
+
+    Returns:
+        A: Basic keys return a view sharing `x`'s buffer; advanced keys
+        return a new array. Indexing a memory-mapped array reads only the
+        selected part of the file.
+
+    Gradient:
+        d/dx getitem(x, key) = scatter(g, key, x.shape)
+    """
+    out = x[_raw_key(key)]
+    if isinstance(x, _np.memmap) and not isinstance(out, lib.ndarray):
+        # Host memory map on a GPU backend: upload just the selection.
+        out = lib.asarray(out)
+    return out
+
+
+@getitem.defgrad
+def _getitem_grad(g, out, x, key):
+    return scatter(g, key, x.shape),
+
+
+@getitem.defjvp
+def _getitem_jvp(tangents, out, x, key):
+    return getitem(tangents[0], key)
+
+
+# =====================================================================
+# SCATTER
+# =====================================================================
+
+@primitive(nargs=1)
+def scatter(lib, updates: Array, key, shape):
+    """
+    Zeros of `shape` with `updates` added at ``[key]``.
+
+    Repeated indices in `key` accumulate. This is the adjoint of
+    `getitem`; only the selected entries are written.
+
+    Args:
+        updates (Array): Values, shaped like ``zeros(shape)[key]``.
+        key: NumPy index into the result.
+        shape (tuple[int]): Shape of the result.
+
+    Returns:
+        A: The scattered tensor.
+
+    Gradient:
+        d/dupdates scatter(updates, key, shape) = getitem(g, key)
+    """
+    return apply(_scatter, updates, _raw_key(key), tuple(shape))
+
+
+@scatter.defgrad
+def _scatter_grad(g, out, updates, key, shape):
+    return getitem(g, key),
+
+
+@scatter.defjvp
+def _scatter_jvp(tangents, out, updates, key, shape):
+    return scatter(tangents[0], key, shape)
+
+
+# =====================================================================
+# TAKE
+# =====================================================================
+
+@primitive(nargs=1)
+def take(lib, x: Array, indices, axis=None):
+    """
+    Take entries of `x` at integer `indices` along `axis`.
+
+    Args:
+        x (Array): Input tensor.
+        indices (Array): Integer indices (negative values count from the end).
+        axis (int | None): Axis to index; None indexes the flattened `x`.
+
+    Returns:
+        A: Tensor with `axis` replaced by the shape of `indices`.
+
+    Gradient:
+        Scatter-add of g into the taken positions of zeros(x.shape).
+    """
+    return lib.take(x, getattr(indices, "np", indices), axis=axis)
+
+
+@take.defgrad
+def _take_grad(g, out, x, indices, axis=None):
+    indices = getattr(indices, "np", indices)
+    if axis is None:
+        flat = scatter(g, indices, (x.size,))
+        return reshape(flat, x.shape),
+    return scatter(g, _axis_key(indices, axis, x.ndim), x.shape),
+
+
+@take.defjvp
+def _take_jvp(tangents, out, x, indices, axis=None):
+    return take(tangents[0], indices, axis=axis)
+
+
+# =====================================================================
+# GATHER
+# =====================================================================
+
+@primitive(nargs=1)
+def gather(lib, x: Array, indices, axis):
+    """
+    Gather entries of `x` along `axis` (``take_along_axis``).
+
+    ``out[i, j] = x[indices[i, j], j]`` for ``axis=0`` on 2-D inputs, and
+    likewise for other ranks and axes.
+
+    Args:
+        x (Array): Input tensor.
+        indices (Array): Integer indices with the same rank as `x`.
+        axis (int): Axis to gather along.
+
+    Returns:
+        A: Tensor shaped like `indices`.
+
+    Gradient:
+        d/dx gather(x, indices, axis) = scatter_add(zeros_like(x), indices, g, axis)
+    """
+    return lib.take_along_axis(x, getattr(indices, "np", indices), axis=axis)
+
+
+@gather.defgrad
+def _gather_grad(g, out, x, indices, axis):
+    indices = getattr(indices, "np", indices)
+    return scatter(g, _along_axis_key(indices, axis, x.ndim, xp()), x.shape),
+
+
+@gather.defjvp
+def _gather_jvp(tangents, out, x, indices, axis):
+    return gather(tangents[0], indices, axis)
+
+
+# =====================================================================
+# SCATTER_ADD
+# =====================================================================
+
+@primitive(nargs=2)
+def scatter_add(lib, x: Array, updates: Array, indices, axis):
+    """
+    `x` with `updates` added along `axis` at `indices`.
+
+    ``out[indices[i, j], j] += updates[i, j]`` for ``axis=0`` on 2-D
+    inputs, and likewise for other ranks and axes; repeated indices
+    accumulate. This is the adjoint of `gather`.
+
+    Args:
+        x (Array): Tensor to add into (not modified).
+        updates (Array): Values, shaped like `indices`.
+        indices (Array): Integer indices with the same rank as `x`.
+        axis (int): Axis to scatter along.
+
+    Returns:
+        A: The updated copy of `x`.
+
+    Gradient:
+        d/dx       = g
+        d/dupdates = gather(g, indices, axis)
+    """
+    return apply(_scatter_add, x, getattr(indices, "np", indices), updates, axis)
+
+
+@scatter_add.defgrad
+def _scatter_add_grad(g, out, x, updates, indices, axis):
+    return g, gather(g, indices, axis)
+
+
+@scatter_add.defjvp
+def _scatter_add_jvp(tangents, out, x, updates, indices, axis):
+    tx, tu = tangents
+    if tu is None:
+        return tx
+    if tx is None:
+        tx = xp().zeros(out.shape, dtype=out.dtype)
+    return scatter_add(tx, tu, indices, axis)
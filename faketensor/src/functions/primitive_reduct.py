@@ -5,201 +5,175 @@ Implements sum, mean, max, min, prod with:
     • axis=None or axis=int/tuple[int]
     • keepdims=True/False
     • NumPy or CuPy backend (xp)
-    • Broadcasting-correct backward pass
+    • Broadcasting-correct backward pass, written with primitives so that
+      it can itself be differentiated (`grad` of `grad`, `hvp`)
+    • Forward-mode (jvp) rules
 """
 
 from __future__ import annotations
 from .._typing import Array as A
-from ..base import function
+from ..base import primitive
 from ...backend.backend import xp
+from . import primitive_arithmetic as _arith
 
 Array = A
 
 
-# ============================================================
-# SUM
-# ============================================================
+def _unreduce(g, shape, axis):
+    """
+    Differentiably broadcast the cotangent of a reduction back to `shape`.
 
-def sum(x: Array, axis=None, keepdims=False):
-    lib = xp()
+    `g` may or may not keep the reduced dims; it is reshaped to the
+    keepdims layout first.
+    """
+    from .primitive_array_ops import reshape, broadcast_to
+    if axis is None:
+        kept = (1,) * len(shape)
+    else:
+        axes = axis if isinstance(axis, tuple) else (axis,)
+        axes = {a % len(shape) for a in axes}
+        kept = tuple(1 if i in axes else d for i, d in enumerate(shape))
+    return broadcast_to(reshape(g, kept), shape)
 
-    def _fun(x):
-        from ..array import as_nd
 
-        x_w = as_nd(x)
-        x_raw = x_w.np
+def _expand(lib, r, axis, keepdims, shape):
+    """Broadcast a reduction result back to the input `shape`."""
+    if not keepdims and axis is not None:
+        axes = axis if isinstance(axis, tuple) else (axis,)
+        for ax in sorted(a % len(shape) for a in axes):
+            r = lib.expand_dims(r, ax)
+    return lib.broadcast_to(r, shape)
 
-        out_raw = lib.sum(x_raw, axis=axis, keepdims=keepdims)
-        out = as_nd(out_raw)
 
-        def grad_fn(g):
-            g_raw = as_nd(g).np
+# ============================================================
+# SUM
+# ============================================================
+
+@primitive(nargs=1)
+def sum(lib, x: Array, axis=None, keepdims=False):
+    return lib.sum(x, axis=axis, keepdims=keepdims)
 
-            # Expand reduced dims
-            if not keepdims and axis is not None:
-                axes = axis if isinstance(axis, tuple) else (axis,)
-                for ax in sorted(axes):
-                    g_raw = lib.expand_dims(g_raw, ax)
 
-            g_raw = lib.broadcast_to(g_raw, x_raw.shape)
-            return as_nd(g_raw),
+@sum.defgrad
+def _sum_grad(g, out, x, axis=None, keepdims=False):
+    return _unreduce(g, x.shape, axis),
 
-        return out, (x_w,), grad_fn
 
-    return function(_fun)(x)
+@sum.defjvp
+def _sum_jvp(tangents, out, x, axis=None, keepdims=False):
+    return sum(tangents[0], axis=axis, keepdims=keepdims)
 
 
 # ============================================================
 # MEAN
 # ============================================================
 
-def mean(x: Array, axis=None, keepdims=False):
-    lib = xp()
-
-    def _fun(x):
-        from ..array import as_nd
-
-        x_w = as_nd(x)
-        x_raw = x_w.np
-
-        out_raw = lib.mean(x_raw, axis=axis, keepdims=keepdims)
-        out = as_nd(out_raw)
+def _count(shape, axis):
+    """Number of elements reduced over by `axis`."""
+    if axis is None:
+        axes = range(len(shape))
+    else:
+        axes = axis if isinstance(axis, tuple) else (axis,)
+    n = 1
+    for a in axes:
+        n *= shape[a]
+    return n
 
-        # compute N
-        if axis is None:
-            N = x_raw.size
-        else:
-            axes = axis if isinstance(axis, tuple) else (axis,)
-            dims = [x_raw.shape[a] for a in axes]
-            N = int(lib.prod(lib.array(dims)))
 
-        def grad_fn(g):
-            g_raw = as_nd(g).np
+@primitive(nargs=1)
+def mean(lib, x: Array, axis=None, keepdims=False):
+    return lib.mean(x, axis=axis, keepdims=keepdims)
 
-            if not keepdims and axis is not None:
-                axes = axis if isinstance(axis, tuple) else (axis,)
-                for ax in sorted(axes):
-                    g_raw = lib.expand_dims(g_raw, ax)
 
-            g_raw = g_raw / N
-            g_raw = lib.broadcast_to(g_raw, x_raw.shape)
-            return as_nd(g_raw),
+@mean.defgrad
+def _mean_grad(g, out, x, axis=None, keepdims=False):
+    return _arith.divide(_unreduce(g, x.shape, axis), _count(x.shape, axis)),
 
-        return out, (x_w,), grad_fn
 
-    return function(_fun)(x)
+@mean.defjvp
+def _mean_jvp(tangents, out, x, axis=None, keepdims=False):
+    return mean(tangents[0], axis=axis, keepdims=keepdims)
 
 
 # ============================================================
-# MAX
+# MAX / MIN
 # ============================================================
 
-def max(x: Array, axis=None, keepdims=False):
+def _extremum_grad(g, out, x, axis, keepdims):
+    # Split g evenly between tied extremal entries.
     lib = xp()
+    x_raw = x.np
+    mask = x_raw == _expand(lib, out.np, axis, keepdims, x_raw.shape)
+    denom = lib.sum(mask, axis=axis, keepdims=True)
+    return _arith.multiply(_unreduce(g, x_raw.shape, axis), (mask / denom).astype(x_raw.dtype)),
 
-    def _fun(x):
-        from ..array import as_nd
-
-        x_w = as_nd(x)
-        x_raw = x_w.np
-
-        out_raw = lib.max(x_raw, axis=axis, keepdims=keepdims)
-        out = as_nd(out_raw)
-
-        def grad_fn(g):
-            g_raw = as_nd(g).np
 
-            # Expand out_raw to x_raw shape
-            out_b = out_raw
-            if not keepdims and axis is not None:
-                axes = axis if isinstance(axis, tuple) else (axis,)
-                for ax in sorted(axes):
-                    out_b = lib.expand_dims(out_b, ax)
-            out_b = lib.broadcast_to(out_b, x_raw.shape)
-
-            mask = (x_raw == out_b)
-            denom = lib.sum(mask, axis=axis, keepdims=True)
-            denom = lib.broadcast_to(denom, x_raw.shape)
-
-            grad_raw = mask * (g_raw / denom)
-            return as_nd(grad_raw),
-
-        return out, (x_w,), grad_fn
-
-    return function(_fun)(x)
+def _extremum_jvp(tangents, out, x, axis, keepdims):
+    # Mean tangent over the (tied) extremal entries.
+    lib = xp()
+    x_raw = x.np
+    mask = x_raw == _expand(lib, out.np, axis, keepdims, x_raw.shape)
+    count = lib.sum(mask, axis=axis, keepdims=keepdims)
+    picked = sum(_arith.multiply(tangents[0], mask), axis=axis, keepdims=keepdims)
+    return _arith.divide(picked, count)
 
 
-# ============================================================
-# MIN
-# ============================================================
+@primitive(nargs=1)
+def max(lib, x: Array, axis=None, keepdims=False):
+    return lib.max(x, axis=axis, keepdims=keepdims)
 
-def min(x: Array, axis=None, keepdims=False):
-    lib = xp()
 
-    def _fun(x):
-        from ..array import as_nd
+@max.defgrad
+def _max_grad(g, out, x, axis=None, keepdims=False):
+    return _extremum_grad(g, out, x, axis, keepdims)
 
-        x_w = as_nd(x)
-        x_raw = x_w.np
 
-        out_raw = lib.min(x_raw, axis=axis, keepdims=keepdims)
-        out = as_nd(out_raw)
+@max.defjvp
+def _max_jvp(tangents, out, x, axis=None, keepdims=False):
+    return _extremum_jvp(tangents, out, x, axis, keepdims)
 
-        def grad_fn(g):
-            g_raw = as_nd(g).np
 
-            out_b = out_raw
-            if not keepdims and axis is not None:
-                axes = axis if isinstance(axis, tuple) else (axis,)
-                for ax in sorted(axes):
-                    out_b = lib.expand_dims(out_b, ax)
-            out_b = lib.broadcast_to(out_b, x_raw.shape)
+@primitive(nargs=1)
+def min(lib, x: Array, axis=None, keepdims=False):
+    return lib.min(x, axis=axis, keepdims=keepdims)
 
-            mask = (x_raw == out_b)
-            denom = lib.sum(mask, axis=axis, keepdims=True)
-            denom = lib.broadcast_to(denom, x_raw.shape)
 
-            grad_raw = mask * (g_raw / denom)
-            return as_nd(grad_raw),
+@min.defgrad
+def _min_grad(g, out, x, axis=None, keepdims=False):
+    return _extremum_grad(g, out, x, axis, keepdims)
 
-        return out, (x_w,), grad_fn
 
-    return function(_fun)(x)
+@min.defjvp
+def _min_jvp(tangents, out, x, axis=None, keepdims=False):
+    return _extremum_jvp(tangents, out, x, axis, keepdims)
 
 
 # ============================================================
 # PROD
 # ============================================================
 
-def prod(x: Array, axis=None, keepdims=False):
-    lib = xp()
-
-    def _fun(x):
-        from ..array import as_nd
-
-        x_w = as_nd(x)
-        x_raw = x_w.np
-
-        out_raw = lib.prod(x_raw, axis=axis, keepdims=keepdims)
-        out = as_nd(out_raw)
+@primitive(nargs=1)
+def prod(lib, x: Array, axis=None, keepdims=False):
+    return lib.prod(x, axis=axis, keepdims=keepdims)
 
-        def grad_fn(g):
-            g_raw = as_nd(g).np
 
-            out_b = out_raw
-            if not keepdims and axis is not None:
-                axes = axis if isinstance(axis, tuple) else (axis,)
-                for ax in sorted(axes):
-                    out_b = lib.expand_dims(out_b, ax)
-            out_b = lib.broadcast_to(out_b, x_raw.shape)
+@prod.defgrad
+def _prod_grad(g, out, x, axis=None, keepdims=False):
+    # g * prod / x, with zero entries masked out (x + 1 where x == 0
+    # keeps the division safe without cutting the graph to x).
+    x_raw = x.np
+    zero = x_raw == 0
+    safe = _arith.add(x, zero.astype(x_raw.dtype))
+    share = _arith.divide(_unreduce(out, x_raw.shape, axis), safe)
+    scale = _arith.multiply(share, ~zero)
+    return _arith.multiply(_unreduce(g, x_raw.shape, axis), scale),
 
-            # Safe: out / x
-            eps_mask = (x_raw != 0)
-            grad_raw = lib.where(eps_mask, out_b / x_raw, 0.0)
-            grad_raw = grad_raw * g_raw
 
-            return as_nd(grad_raw),
-
-        return out, (x_w,), grad_fn
-
-    return function(_fun)(x)
+@prod.defjvp
+def _prod_jvp(tangents, out, x, axis=None, keepdims=False):
+    # sum(t * prod / x) over the reduced axes
+    lib = xp()
+    x_raw = x.np
+    out_b = _expand(lib, out.np, axis, keepdims, x_raw.shape)
+    scale = lib.where(x_raw != 0, out_b / x_raw, 0.0)
+    return sum(_arith.multiply(tangents[0], scale), axis=axis, keepdims=keepdims)
@@ -0,0 +1,168 @@
+"""
+NumPy protocol support for NDarray (`__array_ufunc__`, `__array_function__`).
+
+NumPy calls on NDarrays dispatch to the matching faketensor primitive, so
+`np.log(x)`, `np.sum(x, axis=0)` or `arr @ x` stay differentiable:
+
+    np.add, np.subtract, np.multiply, np.divide, np.negative, np.power,
+    np.log, np.absolute, np.matmul,
+    np.sum, np.mean, np.max/amax, np.min/amin, np.prod, np.reshape,
+    np.transpose, np.expand_dims, np.squeeze, np.broadcast_to, np.clip,
+    np.take, np.take_along_axis
+
+Anything else (other ufuncs or functions, ufunc methods like `reduce`,
+`out=`/`dtype=`/`where=` arguments) runs on the underlying backend arrays
+without copying and returns NDarrays, but is not differentiated; a
+warning saying why is issued if one of its inputs is being
+differentiated. Writes through `out=` count as in-place writes, so a
+backward pass that needs the overwritten values raises instead of
+returning stale gradients.
+"""
+
+import warnings
+import numpy as np
+
+from .base import needs_grad, bump_version
+from .jit.utils import tree_map
+from .array import NDarray, as_nd
+from . import functions as F
+
+
+def _reduction(prim):
+    def call(a, axis=None, dtype=None, out=None, keepdims=False, **kw):
+        if dtype is not None or out is not None or kw:
+            return NotImplemented
+        return prim(a, axis=axis, keepdims=keepdims)
+    return call
+
+
+def _reshape(a, shape=None, order="C", *, newshape=None, copy=None):
+    if order != "C" or copy is not None:
+        return NotImplemented
+    return F.reshape(a, shape if shape is not None else newshape)
+
+
+def _transpose(a, axes=None):
+    return F.transpose(a, axes=axes)
+
+
+def _expand_dims(a, axis):
+    return F.expand_dims(a, axis)
+
+
+def _squeeze(a, axis=None):
+    return F.squeeze(a, axis=axis)
+
+
+def _broadcast_to(a, shape, subok=False):
+    return F.broadcast_to(a, shape)
+
+
+def _take(a, indices, axis=None, out=None, mode="raise"):
+    if out is not None or mode != "raise":
+        return NotImplemented
+    return F.take(a, indices, axis=axis)
+
+
+def _take_along_axis(arr, indices, axis):
+    if axis is None:
+        return NotImplemented
+    return F.gather(arr, indices, axis)
+
+
+def _clip(a, a_min=None, a_max=None, out=None, **kw):
+    if out is not None or kw:
+        return NotImplemented
+    return F.clip(a, a_min, a_max)
+
+
+UFUNCS = {
+    np.add: F.add,
+    np.subtract: F.subtract,
+    np.multiply: F.multiply,
+    np.divide: F.divide,
+    np.negative: F.negative,
+    np.power: F.power,
+    np.log: F.log,
+    np.absolute: F.abs,
+    np.matmul: F.matmul,
+}
+
+FUNCTIONS = {
+    np.sum: _reduction(F.sum),
+    np.mean: _reduction(F.mean),
+    np.max: _reduction(F.max),
+    np.amax: _reduction(F.max),
+    np.min: _reduction(F.min),
+    np.amin: _reduction(F.min),
+    np.prod: _reduction(F.prod),
+    np.reshape: _reshape,
+    np.transpose: _transpose,
+    np.expand_dims: _expand_dims,
+    np.squeeze: _squeeze,
+    np.broadcast_to: _broadcast_to,
+    np.clip: _clip,
+    np.take: _take,
+    np.take_along_axis: _take_along_axis,
+}
+
+
+def _unwrap(x):
+    return x.np if isinstance(x, NDarray) else x
+
+
+def _rewrap(x):
+    return as_nd(x) if isinstance(x, np.ndarray) else x
+
+
+def _reason(name, has_prim, kwargs):
+    """Why a call on `name` is not dispatched to a primitive (for the warning)."""
+    if not has_prim:
+        return "has no faketensor primitive"
+    if "out" in kwargs:
+        return "writes through out=, which the primitive does not support"
+    if kwargs:
+        given = ", ".join(f"{k}=" for k in kwargs)
+        return f"was called with {given}, which the primitive does not support"
+    return "was called with arguments the primitive does not support"
+
+
+def _fallback(name, reason, call, args, kwargs):
+    """Run `call` on the backend arrays behind `args`; results become NDarrays."""
+    leaves = []
+    tree_map(lambda x: leaves.append(x) if isinstance(x, NDarray) else None, (args, kwargs))
+    if needs_grad(*leaves):
+        warnings.warn(
+            f"'{name}' {reason}; its result is not differentiated",
+            stacklevel=3,
+        )
+    out = kwargs.get("out")
+    result = call(*tree_map(_unwrap, args), **tree_map(_unwrap, kwargs))
+    if out is not None:
+        # results were written into the caller's arrays: an in-place write
+        tree_map(lambda x: bump_version(x) if isinstance(x, (NDarray, np.ndarray)) else None, out)
+        return out[0] if isinstance(out, tuple) and len(out) == 1 else out
+    return tree_map(_rewrap, result)
+
+
+def array_ufunc(ufunc, method, inputs, kwargs):
+    prim = UFUNCS.get(ufunc)
+    if prim is not None and method == "__call__" and not kwargs:
+        return prim(*inputs)
+    if prim is not None and method != "__call__":
+        name, reason = f"{ufunc.__name__}.{method}", "has no faketensor primitive"
+    else:
+        name, reason = ufunc.__name__, _reason(ufunc.__name__, prim is not None, kwargs)
+    return _fallback(name, reason, getattr(ufunc, method), inputs, kwargs)
+
+
+def array_function(func, types, args, kwargs):
+    if not all(issubclass(t, (NDarray, np.ndarray)) for t in types):
+        return NotImplemented
+    impl = FUNCTIONS.get(func)
+    if impl is not None:
+        result = impl(*args, **kwargs)
+        if result is not NotImplemented:
+            return result
+    reason = _reason(func.__name__, impl is not None, kwargs)
+    return _fallback(func.__name__, reason, func, args, kwargs)
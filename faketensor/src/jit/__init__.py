@@ -0,0 +1,3 @@
+from .compiler import jit, Jitted
+from .placeholder import FT_Tracer, TracerError
+from .graph import Graph
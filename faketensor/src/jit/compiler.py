@@ -0,0 +1,286 @@
+"""
+`jit`: trace a function once per input signature and replay the captured
+graph on every later call.
+
+    step = jit(value_and_grad(loss))
+    loss_val, grads = step(model, x, y)    # first call: trace + run
+    loss_val, grads = step(model, x, y)    # same shapes: graph replay only
+
+The cache key is built from the pytree structure of the arguments, the
+shape/dtype (and `train` flag) of every array leaf, and the value of every
+non-array leaf. Non-array leaves (Python numbers, strings, flags) are baked
+into the graph as constants, so changing one triggers a retrace.
+
+NDarray leaves — including the `Variable`s inside a `Cell` — are fed to the
+graph by reference on each call, so in-place parameter updates are picked
+up without retracing. Arrays captured by closure are baked as constants
+(by reference, so in-place updates to them are visible too).
+
+After tracing, the graph is run through the optimization passes in
+`jit.passes` (constant folding, algebraic simplification, CSE, DCE). Each
+can be switched off via the matching keyword of `jit`, and
+`Jitted.report(*args)` returns how many ops every pass removed.
+Elementwise chains are then fused into chunked kernels (`jit.fusion`), and
+a static memory planner (`jit.memory`) gives intermediates
+reusable arena buffers so steady-state replays only allocate their outputs.
+Replays of one compiled graph are serialized because they share the arena.
+
+Limitations (same as any trace-based compiler):
+  – Python control flow on array *values* is not allowed (`float(x)`
+    inside the function raises `TracerError`); control flow on shapes is.
+  – Random numbers drawn through the backend are frozen at trace time.
+  – Calling a jitted function while a tape is recording (e.g. inside
+    `grad`), inside `jvp` or with traced inputs runs the original function
+    eagerly, so the surrounding transformation still sees every primitive.
+"""
+
+import functools
+import threading
+
+from .. import base
+from ...backend import backend as b
+from ..tree_util import flatten_pytree, unflatten_pytree
+from .fusion import fuse_elementwise
+from .graph import Ref
+from .memory import plan_memory
+from .passes import optimize
+from .trace import Trace
+from .utils import treedef_key
+
+
+def _shared_outputs(graph):
+    """
+    Positions of outputs a replay would hand out shared: constants (the
+    same array on every call), caller inputs (`x * 1` simplified to `x`)
+    and repeats of an earlier output.
+    """
+    inputs = set(graph.inputs)
+    seen = set()
+    shared = []
+    for i, o in enumerate(graph.outputs):
+        if isinstance(o, Ref):
+            if o.slot in inputs or o.slot in seen:
+                shared.append(i)
+            seen.add(o.slot)
+        elif hasattr(o, "shape"):
+            shared.append(i)
+    return tuple(shared)
+
+
+class _Compiled:
+    """One cache entry: a graph plus how to rebuild the output pytree."""
+
+    __slots__ = ("graph", "kinds", "treedef", "stats", "lock", "shared")
+
+    def __init__(self, graph, kinds, treedef, stats):
+        self.graph = graph
+        self.kinds = kinds
+        self.treedef = treedef
+        self.stats = stats
+        self.lock = threading.Lock() if graph.arena else None
+        self.shared = _shared_outputs(graph)
+
+    def __call__(self, values):
+        if self.lock is None:
+            return self.build(self.run(values))
+        with self.lock:
+            return self.build(self.run(values))
+
+    def run(self, values):
+        outs = self.graph.run(values)
+        # Like eager mode, every call returns arrays of its own.
+        for i in self.shared:
+            outs[i] = outs[i].copy()
+        return outs
+
+    def build(self, outs):
+        from ..array import NDarray
+        leaves = [NDarray(v) if nd else v for v, nd in zip(outs, self.kinds)]
+        return unflatten_pytree(leaves, self.treedef)
+
+
+class Jitted:
+    def __init__(self, fun, passes, fuse, plan):
+        self.fun = fun
+        self.passes = passes
+        self.fuse = fuse
+        self.plan = plan
+        self._cache = {}
+        functools.update_wrapper(self, fun)
+
+    def __repr__(self):
+        return f"jit({getattr(self.fun, '__name__', self.fun)!r})"
+
+    # -------------------------
+    # Signature
+    # -------------------------
+    def _inspect(self, args):
+        """Flatten args; return (cache_key, per-arg flatten info, inputs)."""
+        from ..array import NDarray
+        lib = b.xp()
+
+        key = []
+        infos = []
+        inputs = []          # leaf objects fed to the graph, in order
+        first_seen = {}
+        for a in args:
+            leaves, treedef = flatten_pytree(a)
+            sig = []
+            for leaf in leaves:
+                if isinstance(leaf, NDarray) or isinstance(leaf, lib.ndarray):
+                    v = leaf.np if isinstance(leaf, NDarray) else leaf
+                    alias = first_seen.setdefault(id(leaf), len(inputs))
+                    inputs.append(leaf)
+                    sig.append((type(leaf), getattr(v, "shape", None), str(getattr(v, "dtype", "")),
+                                getattr(leaf, "train", None), alias))
+                else:
+                    try:
+                        hash(leaf)
+                    except TypeError:
+                        raise TypeError(
+                            f"jit: non-array argument leaf {leaf!r} must be hashable"
+                        ) from None
+                    sig.append(("static", type(leaf), leaf))
+            key.append((type(a), treedef_key(treedef), tuple(sig)))
+            infos.append((leaves, treedef))
+        return tuple(key), infos, inputs
+
+    # -------------------------
+    # Call
+    # -------------------------
+    def __call__(self, *args):
+        if base.JVP_STACK or (base._RECORDING and base.active_tape() is not None):
+            return self.fun(*args)
+
+        from ..array import NDarray
+        key, infos, inputs = self._inspect(args)
+        values = [x.np if isinstance(x, NDarray) else x for x in inputs]
+
+        ndarray = b.xp().ndarray
+        if not all(isinstance(v, ndarray) for v in values):
+            # Traced / batched / foreign inputs: let the outer transform see
+            # the primitives instead of an opaque replay.
+            return self.fun(*args)
+
+        entry = self._cache.get(key)
+        if entry is None:
+            entry, result = self._trace(args, infos)
+            self._cache[key] = entry
+            return result
+        return entry(values)
+
+    def _entry(self, args):
+        key, infos, _ = self._inspect(args)
+        if key not in self._cache:
+            self._cache[key], _ = self._trace(args, infos)
+        return self._cache[key]
+
+    def graph(self, *args):
+        """Return the traced `Graph` for these arguments (tracing if needed)."""
+        return self._entry(args).graph
+
+    def report(self, *args):
+        """
+        Optimization summary for these arguments (tracing if needed).
+
+        Returns:
+            dict with `traced_ops` (ops recorded while tracing), `ops` (ops
+            left after optimization), the number removed by each pass and,
+            if enabled, the fusion summary (`fusion`) and memory plan
+            (`memory`).
+        """
+        return dict(self._entry(args).stats)
+
+    # -------------------------
+    # Tracing
+    # -------------------------
+    def _trace(self, args, infos):
+        from ..array import NDarray
+        lib = b.xp()
+        trace = Trace(lib)
+
+        swapped = {}           # id(NDarray) -> (leaf, original buffer, tracer)
+        call_args = []
+        for a, (leaves, treedef) in zip(args, infos):
+            new_leaves = []
+            rebuild = False
+            for leaf in leaves:
+                if isinstance(leaf, NDarray):
+                    hit = swapped.get(id(leaf))
+                    if hit is None:
+                        t = trace.new_input(leaf.np)
+                        swapped[id(leaf)] = (leaf, leaf.np, t)
+                        leaf.np = t
+                    else:
+                        trace.graph.inputs.append(hit[2].slot)
+                    new_leaves.append(leaf)
+                elif isinstance(leaf, lib.ndarray):
+                    new_leaves.append(trace.new_input(leaf))
+                    rebuild = True
+                else:
+                    new_leaves.append(leaf)
+            # Only rebuild containers that held raw arrays; Cells and other
+            # objects keep their identity and see tracers through `.np`.
+            call_args.append(unflatten_pytree(new_leaves, treedef) if rebuild else a)
+
+        try:
+            with trace.active():
+                out = self.fun(*call_args)
+        finally:
+            for leaf, buf, _ in swapped.values():
+                leaf.np = buf
+
+        out_leaves, out_treedef = flatten_pytree(out)
+        kinds, refs, concrete = [], [], []
+        for leaf in out_leaves:
+            nd = isinstance(leaf, NDarray)
+            v = leaf.np if nd else leaf
+            if trace._is_own(v):
+                refs.append(Ref(v.slot))
+                concrete.append(v.val)
+            else:
+                refs.append(v)
+                concrete.append(v)
+            kinds.append(nd)
+
+        graph = trace.graph
+        graph.outputs = refs
+        stats = {"traced_ops": len(graph.ops)}
+        stats.update(optimize(graph, **self.passes))
+        if self.fuse:
+            stats["fusion"] = fuse_elementwise(graph)
+        stats["ops"] = len(graph.ops)
+        if self.plan:
+            stats["memory"] = plan_memory(graph)
+
+        entry = _Compiled(graph, kinds, out_treedef, stats)
+        return entry, entry.build(concrete)
+
+
+def jit(fun, *, fold=True, simplify=True, cse=True, dce=True, fuse=True, plan_memory=True):
+    """
+    Compile `fun` into a trace-once, replay-many graph executor.
+
+    Args:
+        fun: A function built from FakeTensor primitives (it may itself be
+            a `grad` / `value_and_grad` transform).
+        fold: Run constant folding on the traced graph.
+        simplify: Run algebraic simplification.
+        cse: Run common-subexpression elimination.
+        dce: Run dead-code elimination.
+        fuse: Fuse elementwise chains into chunked kernels.
+        plan_memory: Reuse preallocated buffers for intermediates.
+
+    Returns:
+        A callable with the same signature as `fun`. The first call for a
+        given input signature traces `fun`; later calls replay the graph.
+
+    Example:
+        ```python
+        step = ft.jit(ft.value_and_grad(loss))
+        for x, y in batches:
+            l, g = step(model, x, y)
+            opt.update(g)
+        ```
+    """
+    return Jitted(fun, dict(fold=fold, simplify=simplify, cse=cse, dce=dce), fuse, plan_memory)
@@ -0,0 +1,221 @@
+"""
+Elementwise fusion for traced graphs.
+
+A chain such as the `power` backward
+
+    %7 = subtract(%1, 1)
+    %8 = power(%0, %7)
+    %9 = multiply(%1, %8)
+    %10 = multiply(%g, %9)
+
+makes one full pass over memory per op and materializes every temporary.
+`fuse_elementwise` groups such chains into a single `FusedKernel` that walks
+the output in cache-sized chunks (`CHUNK_ELEMENTS`) and runs every step on
+that chunk before moving on, so each input element is loaded once and the
+temporaries are chunk-sized scratch buffers that stay in cache.
+
+What is fused:
+  – single-output elementwise ufuncs (`add`, `subtract`, `multiply`,
+    `true_divide`, `negative`, `power`, `log`, `absolute`, `sign`, ...) and
+    `clip`, called without keyword arguments;
+  – only values of the same output shape, at least `MIN_FUSE_SIZE`
+    elements (below that, per-chunk call overhead outweighs the savings);
+  – an intermediate is absorbed only if every consumer is in the group and
+    it is not a graph output, so nothing outside the group ever needs it
+    materialized.
+
+Kernels accept `out=`, so the memory planner can still give their results
+arena buffers.
+"""
+
+import itertools
+import math
+from collections import Counter
+
+from .graph import Op, _is_ref
+from .utils import name
+
+
+CHUNK_ELEMENTS = 1 << 15
+MIN_FUSE_SIZE = 2 * CHUNK_ELEMENTS
+
+_IN, _TMP, _CONST = 0, 1, 2
+
+
+class FusedKernel:
+    """
+    A group of elementwise steps evaluated chunk by chunk.
+
+    Called as `kernel(*inputs, out=None)`; `inputs` are the group's external
+    operands (broadcastable to `shape`). Each step is `(fn, spec, dst)`
+    where `spec` holds `(_IN, i)`, `(_TMP, j)` or `(_CONST, value)` and
+    `dst` is a scratch index, or -1 for the kernel output.
+    """
+
+    supports_out = True
+
+    def __init__(self, lib, steps, tmp_dtypes, shape, dtype):
+        self.lib = lib
+        self.steps = steps
+        self.tmp_dtypes = tmp_dtypes
+        self.shape = shape
+        self.dtype = dtype
+        self.__name__ = "fused[" + ",".join(name(fn) for fn, _, _ in steps) + "]"
+
+        # Split along the outermost axis whose trailing block fits a chunk.
+        axis, inner = len(shape) - 1, 1
+        while axis > 0 and inner * shape[axis] <= CHUNK_ELEMENTS:
+            inner *= shape[axis]
+            axis -= 1
+        self.axis = axis
+        self.rows = max(1, min(shape[axis], CHUNK_ELEMENTS // inner))
+
+    def __repr__(self):
+        return f"{self.__name__}{self.shape}"
+
+    def __call__(self, *inputs, out=None):
+        lib = self.lib
+        shape, axis, rows = self.shape, self.axis, self.rows
+        if out is None:
+            out = lib.empty(shape, self.dtype)
+
+        views = [
+            x if x.ndim == 0 or x.shape == shape else lib.broadcast_to(x, shape)
+            for x in map(lib.asarray, inputs)
+        ]
+        chunk = (rows,) + shape[axis + 1:]
+        tmps = [lib.empty(chunk, dt) for dt in self.tmp_dtypes]
+
+        for outer in itertools.product(*map(range, shape[:axis])):
+            for lo in range(0, shape[axis], rows):
+                hi = min(lo + rows, shape[axis])
+                idx = outer + (slice(lo, hi),)
+                ins = [v if v.ndim == 0 else v[idx] for v in views]
+                bufs = tmps if hi - lo == rows else [t[:hi - lo] for t in tmps]
+                for fn, spec, dst in self.steps:
+                    args = [ins[i] if k == _IN else bufs[i] if k == _TMP else i for k, i in spec]
+                    fn(*args, out=bufs[dst] if dst >= 0 else out[idx])
+        return out
+
+
+def _fusible(lib, op, avals):
+    shape, dtype = avals[op.out]
+    if op.kwargs or dtype is None or math.prod(shape) < MIN_FUSE_SIZE:
+        return False
+    if any(isinstance(a, (tuple, list, dict)) for a in op.args):
+        return False
+    fn = op.fn
+    if isinstance(fn, lib.ufunc):
+        return fn.nout == 1 and fn.signature is None
+    return fn is lib.clip
+
+
+def _build(lib, ops, avals):
+    """Turn a topologically ordered group into `(kernel, external args)`."""
+    externals, position = [], {}
+    remaining = Counter(s for op in ops[:-1] for s in op.refs())
+    local = {}                      # slot -> scratch index
+    free = {}                       # dtype -> released scratch indices
+    tmp_dtypes = []
+    steps = []
+    root = ops[-1]
+
+    for op in ops:
+        spec = []
+        released = []
+        for a in op.args:
+            if _is_ref(a) and a.slot in local:
+                j = local[a.slot]
+                spec.append((_TMP, j))
+                remaining[a.slot] -= 1
+                if remaining[a.slot] == 0:
+                    released.append(j)
+            elif _is_ref(a) or getattr(a, "ndim", 0) > 0:
+                key = a.slot if _is_ref(a) else ("const", id(a))
+                if key not in position:
+                    position[key] = len(externals)
+                    externals.append(a)
+                spec.append((_IN, position[key]))
+            else:
+                spec.append((_CONST, a))
+        for j in released:
+            free.setdefault(tmp_dtypes[j], []).append(j)
+
+        if op is root:
+            dst = -1
+        else:
+            dt = avals[op.out][1]
+            pool = free.get(dt)
+            if pool:
+                dst = pool.pop()
+            else:
+                dst = len(tmp_dtypes)
+                tmp_dtypes.append(dt)
+            local[op.out] = dst
+        steps.append((op.fn, tuple(spec), dst))
+
+    shape, dtype = avals[root.out]
+    return FusedKernel(lib, steps, tmp_dtypes, shape, dtype), externals
+
+
+def fuse_elementwise(graph):
+    """Fuse elementwise chains in place; return `{"kernels", "fused_ops"}`."""
+    lib = graph.lib
+    avals = graph.avals
+    ops = graph.ops
+
+    outputs = {o.slot for o in graph.outputs if _is_ref(o)}
+    consumers = {}
+    for i, op in enumerate(ops):
+        for s in op.refs():
+            consumers.setdefault(s, set()).add(i)
+
+    producer = {}
+    root_of = {}
+    groups = {}                     # root op index -> member op indices
+
+    for i, op in enumerate(ops):
+        producer[op.out] = i
+        if not _fusible(lib, op, avals):
+            continue
+        candidates = {}
+        for s in op.refs():
+            r = root_of.get(producer.get(s))
+            if r in groups and s not in outputs and avals[s][0] == avals[op.out][0]:
+                candidates[r] = groups[r]
+
+        # A producer group joins only once all consumers of its result are
+        # inside the merged group; joining one may admit another.
+        inside = {i}
+        chosen = []
+        grown = True
+        while grown:
+            grown = False
+            for r in list(candidates):
+                if consumers[ops[r].out] <= inside:
+                    inside.update(candidates.pop(r))
+                    chosen.append(r)
+                    grown = True
+
+        members = sorted(inside)
+        for r in chosen:
+            del groups[r]
+        for j in members:
+            root_of[j] = i
+        groups[i] = members
+
+    groups = {r: m for r, m in groups.items() if len(m) > 1}
+    if not groups:
+        return {"kernels": 0, "fused_ops": 0}
+
+    absorbed = {j for m in groups.values() for j in m}
+    new_ops = []
+    for i, op in enumerate(ops):
+        if i in groups:
+            kernel, args = _build(lib, [ops[j] for j in groups[i]], avals)
+            new_ops.append(Op(kernel, tuple(args), {}, op.out))
+        elif i not in absorbed:
+            new_ops.append(op)
+
+    graph.replace_ops(new_ops)
+    return {"kernels": len(groups), "fused_ops": len(absorbed)}
@@ -0,0 +1,178 @@
+"""
+Static graph produced by tracing a function with `FT_Tracer` placeholders.
+
+A `Graph` is a flat SSA program over integer slots:
+
+    inputs   : slots filled by the caller on every replay
+    ops      : Op(fn, args, kwargs, out) — `fn` is a backend callable
+               (ufunc, array function, ...) and `args`/`kwargs` hold
+               `Ref(slot)` markers where a graph value is consumed
+    outputs  : Refs (or constants) returned to the caller
+    avals    : (shape, dtype) of every slot, as observed while tracing
+    literals : constants created inside the trace from Python values
+               (as opposed to arrays captured from the caller's scope,
+               which may be mutated in place between calls)
+    arena    : preallocated buffers written via `out=` (see jit.memory)
+
+Replaying a graph only calls the recorded backend functions; no primitive
+wrappers, closures or tapes are involved.
+"""
+
+from .utils import name, tree_map, tree_any
+
+
+class Ref:
+    """Marker for a graph value inside an op's argument template."""
+
+    __slots__ = ("slot",)
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __repr__(self):
+        return f"%{self.slot}"
+
+
+def _is_ref(x):
+    return x.__class__ is Ref
+
+
+class Op:
+    __slots__ = ("fn", "args", "kwargs", "out")
+
+    def __init__(self, fn, args, kwargs, out):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.out = out
+
+    def refs(self):
+        """Slots consumed by this op, in argument order (may repeat)."""
+        found = []
+        tree_map(lambda a: found.append(a.slot) if _is_ref(a) else None, (self.args, self.kwargs))
+        return found
+
+    def __repr__(self):
+        args = ", ".join(_fmt(a) for a in self.args)
+        if self.kwargs:
+            args += ", " + ", ".join(f"{k}={_fmt(v)}" for k, v in self.kwargs.items())
+        return f"%{self.out} = {name(self.fn)}({args})"
+
+
+def _fmt(x):
+    size = getattr(x, "size", None)
+    if size is not None and size > 4:
+        return f"const{tuple(x.shape)}:{x.dtype}"
+    return repr(x)
+
+
+class Graph:
+    def __init__(self, lib):
+        self.lib = lib
+        self.inputs = []
+        self.ops = []
+        self.outputs = []
+        self.avals = []
+        self.literals = {}
+        self.arena = []
+        self._program = None
+
+    @property
+    def num_slots(self):
+        return len(self.avals)
+
+    def new_slot(self, val):
+        self.avals.append((getattr(val, "shape", ()), getattr(val, "dtype", None)))
+        self._program = None
+        return len(self.avals) - 1
+
+    def add_literal(self, val):
+        self.literals[id(val)] = val
+
+    def is_literal(self, x):
+        """True for Python values and trace-created constant arrays."""
+        if _is_ref(x):
+            return False
+        if isinstance(x, (tuple, list)):
+            return all(self.is_literal(e) for e in x)
+        if hasattr(x, "shape"):
+            return id(x) in self.literals
+        return True
+
+    def replace_ops(self, ops):
+        self.ops = ops
+        self._program = None
+
+    def substitute(self, mapping):
+        """Replace every use of slot `s` by `mapping[s]` (a Ref or constant)."""
+        if not mapping:
+            return
+        sub = lambda a: mapping.get(a.slot, a) if _is_ref(a) else a
+        for op in self.ops:
+            op.args = tree_map(sub, op.args)
+            op.kwargs = tree_map(sub, op.kwargs)
+        self.outputs = [sub(o) for o in self.outputs]
+        self._program = None
+
+    def __repr__(self):
+        lines = [f"Graph(inputs={[Ref(s) for s in self.inputs]}) {{"]
+        lines += [f"  {op!r}" for op in self.ops]
+        lines.append(f"  return [{', '.join(_fmt(o) for o in self.outputs)}]")
+        lines.append("}")
+        return "\n".join(lines)
+
+    # -------------------------
+    # Replay
+    # -------------------------
+    def _compile(self):
+        """
+        Flatten ops into tuples the replay loop can consume cheaply.
+
+        Each entry also lists the slots whose last reader is that op, so
+        replay drops intermediates as soon as they are dead instead of
+        keeping every value alive until the end.
+        """
+        keep = {o.slot for o in self.outputs if _is_ref(o)}
+        last = {}
+        for i, op in enumerate(self.ops):
+            for s in op.refs():
+                last[s] = i
+        drops = [[] for _ in self.ops]
+        for s, i in last.items():
+            if s not in keep:
+                drops[i].append(s)
+
+        program = []
+        for op, drop in zip(self.ops, drops):
+            drop = tuple(drop)
+            flat = not tree_any(_is_ref, op.kwargs) and not any(
+                isinstance(a, (tuple, list, dict)) and tree_any(_is_ref, a) for a in op.args
+            )
+            if flat:
+                refs = tuple((i, a.slot) for i, a in enumerate(op.args) if _is_ref(a))
+                program.append((op.fn, list(op.args), refs, op.kwargs, op.out, None, drop))
+            else:
+                program.append((op.fn, op.args, (), op.kwargs, op.out, op, drop))
+        self._program = program
+        return program
+
+    def run(self, values):
+        """Execute the graph on `values` (one per input slot); return outputs."""
+        program = self._program or self._compile()
+        env = [None] * len(self.avals)
+        for s, v in zip(self.inputs, values):
+            env[s] = v
+
+        for fn, args, refs, kwargs, out, op, drop in program:
+            if op is None:
+                args = args.copy()
+                for i, s in refs:
+                    args[i] = env[s]
+                env[out] = fn(*args, **kwargs)
+            else:
+                sub = lambda a: env[a.slot] if _is_ref(a) else a
+                env[out] = fn(*tree_map(sub, op.args), **tree_map(sub, op.kwargs))
+            for s in drop:
+                env[s] = None
+
+        return [env[o.slot] if _is_ref(o) else o for o in self.outputs]
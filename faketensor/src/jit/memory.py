@@ -0,0 +1,119 @@
+"""
+Static memory planning for traced graphs.
+
+Every primitive allocates a fresh output (`lib.add(x, y)`, ...). Once a graph
+is fixed, the lifetime of every intermediate is known, so intermediates can
+share a small arena of preallocated buffers and ufuncs can write into them
+with `out=`. In steady state a replay then allocates only its outputs.
+
+Planning rules:
+  – Candidates are single-output ufunc calls with a non-scalar result
+    (elementwise ops and `matmul`) and fused kernels (`jit.fusion`); their
+    `out=` buffer comes from the arena.
+  – Any other op may return a view of its inputs (`reshape`, `transpose`,
+    `broadcast_to`, ...), so its result is treated as aliasing every arena
+    buffer its inputs alias; the buffers stay live until the view dies.
+  – Buffers that may be visible through a graph output are never planned:
+    values handed back to the caller must not be overwritten by the next call.
+  – A buffer is recycled for a value of identical shape and dtype once its
+    last reader has run. Elementwise ufuncs may even write over an input
+    that dies at that op (NumPy resolves overlapping operands).
+"""
+
+from collections import defaultdict
+
+
+def _fresh(lib, fn):
+    """True if `fn` always returns a newly allocated array (never a view)."""
+    return isinstance(fn, lib.ufunc) or getattr(fn, "supports_out", False)
+
+
+def _candidate(lib, op, avals):
+    fn = op.fn
+    shape, dtype = avals[op.out]
+    return (
+        _fresh(lib, fn)
+        and getattr(fn, "nout", 1) == 1
+        and "out" not in op.kwargs
+        and dtype is not None
+        and shape != ()
+    )
+
+
+def _elementwise(lib, fn):
+    return isinstance(fn, lib.ufunc) and fn.signature is None
+
+
+def plan_memory(graph):
+    """
+    Assign arena buffers to graph intermediates; return planning statistics.
+
+    Mutates `graph.ops` in place by adding `out=` buffers to planned ops.
+    """
+    lib = graph.lib
+    avals = graph.avals
+    ops = graph.ops
+
+    candidates = {op.out for op in ops if _candidate(lib, op, avals)}
+
+    # ---- alias roots and last use of every candidate buffer ----
+    roots = {}
+    last_use = {}
+    for i, op in enumerate(ops):
+        aliased = set()
+        for s in op.refs():
+            rs = roots.get(s)
+            if rs:
+                for r in rs:
+                    last_use[r] = i
+                aliased |= rs
+        if op.out in candidates:
+            roots[op.out] = {op.out}
+            last_use.setdefault(op.out, i)
+        elif aliased and not _fresh(lib, op.fn):
+            roots[op.out] = aliased
+
+    escaping = set()
+    for o in graph.outputs:
+        escaping |= roots.get(getattr(o, "slot", None), set())
+    planned = candidates - escaping
+
+    release_at = defaultdict(list)
+    for r, i in last_use.items():
+        if r in planned:
+            release_at[i].append(r)
+
+    # ---- linear-scan buffer assignment ----
+    free = defaultdict(list)
+    arena = []
+    assigned = {}
+
+    def release(i):
+        for r in release_at.get(i, ()):
+            free[avals[r]].append(assigned[r])
+
+    for i, op in enumerate(ops):
+        elementwise = _elementwise(lib, op.fn)
+        if elementwise:
+            release(i)
+        if op.out in planned:
+            pool = free[avals[op.out]]
+            if pool:
+                k = pool.pop()
+            else:
+                k = len(arena)
+                arena.append(lib.empty(*avals[op.out]))
+            assigned[op.out] = k
+            op.kwargs = dict(op.kwargs, out=arena[k])
+        if not elementwise:
+            release(i)
+
+    graph.replace_ops(ops)
+    graph.arena = arena
+    planned_bytes = sum(arena[assigned[s]].nbytes for s in planned)
+    return {
+        "planned_ops": len(planned),
+        "buffers": len(arena),
+        "arena_bytes": sum(a.nbytes for a in arena),
+        "planned_bytes": planned_bytes,
+    }
@@ -0,0 +1,226 @@
+"""
+Optimization passes over traced graphs.
+
+Each pass rewrites a `Graph` in place and returns the number of ops it
+removed, so the effect of every pass can be reported separately:
+
+    fold      – constant folding: ops whose inputs are all trace-created
+                constants (Python scalars wrapped by `as_nd`, shapes, ...)
+                and shape-only ops such as `ones_like` are evaluated once at
+                compile time.
+    simplify  – algebraic identities: `x * 1`, `x + 0`, `x - 0`, `x / 1`,
+                `x ** 1`, `-(-x)`, no-op `broadcast_to` / `reshape`.
+                Only applied when the result has exactly `x`'s shape and
+                dtype, so broadcasting and type promotion are preserved.
+    cse       – common-subexpression elimination: identical calls on the
+                same inputs (e.g. the `power(y, -2)` / `divide(1.0, y)`
+                built by every `divide` backward) are computed once.
+    dce       – dead-code elimination: ops that do not contribute to an
+                output (gradients of constants, unused forward values).
+
+`optimize` chains them until nothing changes and returns the totals.
+"""
+
+from .graph import Ref, _is_ref
+from .utils import tree_map
+
+
+PASS_ORDER = ("fold", "simplify", "cse", "dce")
+
+
+def _shape_only(lib):
+    return {lib.ones_like, lib.zeros_like, lib.full_like}
+
+
+# ================================================================
+# Constant folding
+# ================================================================
+
+def fold_constants(graph):
+    lib = graph.lib
+    shape_only = _shape_only(lib)
+    mapping = {}
+    kept = []
+
+    for op in graph.ops:
+        args = tree_map(lambda a: mapping.get(a.slot, a) if _is_ref(a) else a, op.args)
+        kwargs = tree_map(lambda a: mapping.get(a.slot, a) if _is_ref(a) else a, op.kwargs)
+        op.args, op.kwargs = args, kwargs
+
+        if op.fn in shape_only and args and _is_ref(args[0]):
+            # Only the shape/dtype of the template matter, and those are static.
+            shape, dtype = graph.avals[args[0].slot]
+            template = lib.empty(shape, dtype)
+            graph.add_literal(template)
+            args = (template,) + tuple(args[1:])
+
+        if not (graph.is_literal(args) and graph.is_literal(kwargs)):
+            kept.append(op)
+            continue
+
+        val = op.fn(*args, **kwargs)
+        graph.add_literal(val)
+        mapping[op.out] = val
+
+    graph.replace_ops(kept)
+    graph.substitute(mapping)
+    return len(mapping)
+
+
+# ================================================================
+# Algebraic simplification
+# ================================================================
+
+def _const_equals(graph, c, value):
+    if _is_ref(c) or not graph.is_literal(c):
+        return False
+    try:
+        return bool(graph.lib.all(graph.lib.asarray(c) == value))
+    except Exception:
+        return False
+
+
+def simplify(graph):
+    lib = graph.lib
+    avals = graph.avals
+    producer = {}
+    mapping = {}
+    kept = []
+
+    def resolve(a):
+        while _is_ref(a) and a.slot in mapping:
+            a = mapping[a.slot]
+        return a
+
+    identity = {
+        lib.multiply: ((1, 0, 1), (0, 1, 1)),     # (const pos, operand pos, neutral)
+        lib.add: ((1, 0, 0), (0, 1, 0)),
+        lib.subtract: ((1, 0, 0),),
+        lib.true_divide: ((1, 0, 1),),
+        lib.power: ((1, 0, 1),),
+    }
+
+    for op in graph.ops:
+        op.args = tree_map(resolve, op.args)
+        op.kwargs = tree_map(resolve, op.kwargs)
+        args = op.args
+        out_aval = avals[op.out]
+        same = None
+
+        if op.fn in identity and len(args) == 2 and not op.kwargs:
+            for ci, xi, neutral in identity[op.fn]:
+                x = args[xi]
+                if _is_ref(x) and avals[x.slot] == out_aval and _const_equals(graph, args[ci], neutral):
+                    same = x
+                    break
+
+        elif op.fn is lib.negative and len(args) == 1 and _is_ref(args[0]):
+            inner = producer.get(args[0].slot)
+            if inner is not None and inner.fn is lib.negative and _is_ref(inner.args[0]):
+                same = inner.args[0]
+
+        elif op.fn in (lib.broadcast_to, lib.reshape) and args and _is_ref(args[0]):
+            if avals[args[0].slot] == out_aval:
+                same = args[0]
+
+        if same is not None:
+            mapping[op.out] = same
+        else:
+            producer[op.out] = op
+            kept.append(op)
+
+    graph.replace_ops(kept)
+    graph.substitute({s: resolve(r) for s, r in mapping.items()})
+    return len(mapping)
+
+
+# ================================================================
+# Common-subexpression elimination
+# ================================================================
+
+def _key(graph, x):
+    if _is_ref(x):
+        return ("ref", x.slot)
+    if isinstance(x, (tuple, list)):
+        return (type(x), tuple(_key(graph, e) for e in x))
+    if isinstance(x, dict):
+        return ("dict", tuple((k, _key(graph, v)) for k, v in x.items()))
+    if hasattr(x, "shape"):
+        if id(x) in graph.literals and x.size <= 16:
+            return ("lit", str(x.dtype), x.shape, x.tobytes())
+        return ("obj", id(x))
+    hash(x)
+    return (type(x), x)
+
+
+def cse(graph):
+    seen = {}
+    mapping = {}
+    kept = []
+    sub = lambda a: mapping.get(a.slot, a) if _is_ref(a) else a
+
+    for op in graph.ops:
+        op.args = tree_map(sub, op.args)
+        op.kwargs = tree_map(sub, op.kwargs)
+        try:
+            key = (op.fn, _key(graph, op.args), _key(graph, op.kwargs))
+        except TypeError:               # unhashable argument: leave it alone
+            kept.append(op)
+            continue
+        hit = seen.get(key)
+        if hit is None:
+            seen[key] = op.out
+            kept.append(op)
+        else:
+            mapping[op.out] = Ref(hit)
+
+    graph.replace_ops(kept)
+    graph.substitute(mapping)
+    return len(mapping)
+
+
+# ================================================================
+# Dead-code elimination
+# ================================================================
+
+def dce(graph):
+    live = {o.slot for o in graph.outputs if _is_ref(o)}
+    kept = []
+    for op in reversed(graph.ops):
+        if op.out in live:
+            kept.append(op)
+            live.update(op.refs())
+    removed = len(graph.ops) - len(kept)
+    kept.reverse()
+    graph.replace_ops(kept)
+    return removed
+
+
+_PASSES = {
+    "fold": fold_constants,
+    "simplify": simplify,
+    "cse": cse,
+    "dce": dce,
+}
+
+
+def optimize(graph, fold=True, simplify=True, cse=True, dce=True, max_rounds=4):
+    """
+    Run the enabled passes until a fixed point; return ops removed per pass.
+
+    Example:
+        >>> optimize(g)
+        {'fold': 6, 'simplify': 3, 'cse': 9, 'dce': 14}
+    """
+    enabled = {"fold": fold, "simplify": simplify, "cse": cse, "dce": dce}
+    stats = {name: 0 for name in PASS_ORDER if enabled[name]}
+    for _ in range(max_rounds):
+        changed = 0
+        for name in PASS_ORDER:
+            if enabled[name]:
+                n = _PASSES[name](graph)
+                stats[name] += n
+                changed += n
+        if not changed:
+            break
+    return stats
@@ -0,0 +1,182 @@
+"""
+Placeholder values used while tracing a function into a static graph.
+
+An `FT_Tracer` stands in for a backend array during `jit` tracing. It carries
+the concrete value computed at trace time (so shapes, dtypes and Python-level
+shape arithmetic behave exactly as in eager mode) together with the graph
+slot that will hold the value on replay.
+
+Every backend operation that touches a tracer is routed to the active
+`Trace`, which evaluates it concretely and appends it to the graph:
+
+  – `xp().add(x, y)` and friends go through the tracing backend proxy.
+  – Raw NumPy calls (`np.sum(t)`, `ndarray * t`) arrive through
+    `__array_ufunc__` / `__array_function__`.
+  – Python operators on the tracer (`t + 1`, `t @ w`, `t[0]`) are defined
+    below and record the matching backend ufunc. Arithmetic with an
+    `NDarray` on the right is left to its reflected operator, so the
+    primitive runs and an enclosing `grad` records it.
+
+Reading the *value* of a tracer (`float(t)`, `bool(t)`, `np.asarray(t)`)
+is an error: the result would be baked into the graph and silently go stale
+on replay.
+"""
+
+import operator
+
+
+class TracerError(TypeError):
+    """Raised when a traced value is used in a way a static graph cannot replay."""
+
+
+def _astype(x, dtype):
+    return x.astype(dtype)
+
+
+def _reshape(x, *shape):
+    return x.reshape(*shape)
+
+
+def _transpose(x, *axes):
+    return x.transpose(*axes)
+
+
+_NDarray = None
+
+
+def _is_nd(x):
+    global _NDarray
+    if _NDarray is None:
+        from ..array import NDarray
+        _NDarray = NDarray
+    return isinstance(x, _NDarray)
+
+
+class FT_Tracer:
+    __slots__ = ("val", "slot", "_trace")
+
+    __array_priority__ = 1000  # win binary-op dispatch against ndarray/NDarray
+
+    def __init__(self, val, slot, trace):
+        self.val = val
+        self.slot = slot
+        self._trace = trace
+
+    # -------------------------
+    # Static metadata
+    # -------------------------
+    @property
+    def shape(self):
+        return self.val.shape
+
+    @property
+    def dtype(self):
+        return self.val.dtype
+
+    @property
+    def ndim(self):
+        return self.val.ndim
+
+    @property
+    def size(self):
+        return self.val.size
+
+    def __len__(self):
+        return len(self.val)
+
+    def __repr__(self):
+        return f"FT_Tracer(shape={self.shape}, dtype={self.dtype}, slot={self.slot})"
+
+    __hash__ = object.__hash__
+
+    # -------------------------
+    # Concretization (forbidden)
+    # -------------------------
+    def _concrete(self, *args, **kwargs):
+        raise TracerError(
+            f"{self!r} has no fixed value inside a jit-compiled function; "
+            "convert it outside of `jit` or keep the computation in array ops."
+        )
+
+    __array__ = __bool__ = __float__ = __int__ = __index__ = __complex__ = _concrete
+
+    def __setitem__(self, key, value):
+        raise TracerError("In-place updates of traced arrays are not supported inside `jit`.")
+
+    # -------------------------
+    # NumPy protocols
+    # -------------------------
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        fn = ufunc if method == "__call__" else getattr(ufunc, method)
+        return self._trace.call(fn, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        return self._trace.call(func, args, kwargs)
+
+    # -------------------------
+    # Methods
+    # -------------------------
+    def _op(self, name, *args):
+        return self._trace.call(getattr(self._trace.lib, name), args, {})
+
+    def _binop(self, name, o):
+        if _is_nd(o):
+            # `o.__r<op>__` dispatches the primitive; calling the backend
+            # here would hide the op from the tape.
+            return NotImplemented
+        return self._trace.call(getattr(self._trace.lib, name), (self, o), {})
+
+    def astype(self, dtype):
+        return self._trace.call(_astype, (self, dtype), {})
+
+    def reshape(self, *shape):
+        return self._trace.call(_reshape, (self,) + shape, {})
+
+    def transpose(self, *axes):
+        return self._trace.call(_transpose, (self,) + axes, {})
+
+    @property
+    def T(self):
+        return self._trace.call(_transpose, (self,), {})
+
+    def __getitem__(self, key):
+        return self._trace.call(operator.getitem, (self, key), {})
+
+    # -------------------------
+    # Operators
+    # -------------------------
+    def __neg__(self):          return self._op("negative", self)
+    def __pos__(self):          return self
+    def __abs__(self):          return self._op("absolute", self)
+    def __invert__(self):       return self._op("invert", self)
+
+    def __add__(self, o):       return self._binop("add", o)
+    def __radd__(self, o):      return self._op("add", o, self)
+    def __sub__(self, o):       return self._binop("subtract", o)
+    def __rsub__(self, o):      return self._op("subtract", o, self)
+    def __mul__(self, o):       return self._binop("multiply", o)
+    def __rmul__(self, o):      return self._op("multiply", o, self)
+    def __truediv__(self, o):   return self._binop("true_divide", o)
+    def __rtruediv__(self, o):  return self._op("true_divide", o, self)
+    def __floordiv__(self, o):  return self._op("floor_divide", self, o)
+    def __rfloordiv__(self, o): return self._op("floor_divide", o, self)
+    def __mod__(self, o):       return self._op("remainder", self, o)
+    def __rmod__(self, o):      return self._op("remainder", o, self)
+    def __pow__(self, o):       return self._binop("power", o)
+    def __rpow__(self, o):      return self._op("power", o, self)
+    def __matmul__(self, o):    return self._binop("matmul", o)
+    def __rmatmul__(self, o):   return self._op("matmul", o, self)
+
+    def __and__(self, o):       return self._op("bitwise_and", self, o)
+    def __rand__(self, o):      return self._op("bitwise_and", o, self)
+    def __or__(self, o):        return self._op("bitwise_or", self, o)
+    def __ror__(self, o):       return self._op("bitwise_or", o, self)
+    def __xor__(self, o):       return self._op("bitwise_xor", self, o)
+    def __rxor__(self, o):      return self._op("bitwise_xor", o, self)
+
+    def __eq__(self, o):        return self._op("equal", self, o)
+    def __ne__(self, o):        return self._op("not_equal", self, o)
+    def __lt__(self, o):        return self._op("less", self, o)
+    def __le__(self, o):        return self._op("less_equal", self, o)
+    def __gt__(self, o):        return self._op("greater", self, o)
+    def __ge__(self, o):        return self._op("greater_equal", self, o)
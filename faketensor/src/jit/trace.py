@@ -0,0 +1,140 @@
+"""
+Tracing a Python function into a `Graph`.
+
+While a `Trace` is active the backend returned by `xp()` is swapped for a
+thin proxy. Every call made through it is forwarded to `Trace.call`, which
+
+  1. unwraps NDarray arguments to their backend buffers,
+  2. evaluates the call on concrete values, and
+  3. if any argument was an `FT_Tracer`, appends an `Op` to the graph and
+     returns a new tracer for the result.
+
+Calls that do not involve a tracer (e.g. `xp().asarray(1.0)` for a Python
+scalar, or shape arithmetic) run eagerly and their results enter the graph
+as constants.
+"""
+
+from contextlib import contextmanager
+import operator
+
+from ...backend import backend as b
+from .graph import Graph, Op, Ref
+from .placeholder import FT_Tracer, TracerError
+from .utils import tree_map, tree_any
+
+
+def _unwrap(x):
+    from ..array import NDarray
+    return x.np if isinstance(x, NDarray) else x
+
+
+class _TracedCallable:
+    """A backend callable whose calls are redirected to a `Trace`."""
+
+    __slots__ = ("_fn", "_trace")
+
+    def __init__(self, fn, trace):
+        self._fn = fn
+        self._trace = trace
+
+    def __call__(self, *args, **kwargs):
+        return self._trace.call(self._fn, args, kwargs)
+
+    def __getattr__(self, item):       # ufunc methods such as `add.reduce`
+        attr = getattr(self._fn, item)
+        return _TracedCallable(attr, self._trace) if callable(attr) else attr
+
+
+class _TracingBackend:
+    """Stand-in for the numpy/cupy module while a trace is active."""
+
+    def __init__(self, lib, trace):
+        self._lib = lib
+        self._trace = trace
+        self._cache = {}
+
+    def __getattr__(self, item):
+        try:
+            return self._cache[item]
+        except KeyError:
+            pass
+        attr = getattr(self._lib, item)
+        # Types (ndarray, float32, ...), modules and constants pass through.
+        if callable(attr) and not isinstance(attr, type):
+            attr = _TracedCallable(attr, self._trace)
+        self._cache[item] = attr
+        return attr
+
+
+class Trace:
+    def __init__(self, lib):
+        self.lib = lib
+        self.graph = Graph(lib)
+
+    # -------------------------
+    # Values
+    # -------------------------
+    def new_input(self, val):
+        slot = self.graph.new_slot(val)
+        self.graph.inputs.append(slot)
+        return FT_Tracer(val, slot, self)
+
+    def _is_own(self, x):
+        if isinstance(x, FT_Tracer):
+            if x._trace is not self:
+                raise TracerError(f"{x!r} escaped from a different jit trace.")
+            return True
+        return False
+
+    def _template(self, x):
+        return Ref(x.slot) if self._is_own(x) else x
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def call(self, fn, args, kwargs):
+        args = tree_map(_unwrap, args)
+        kwargs = tree_map(_unwrap, kwargs)
+
+        if not (tree_any(self._is_own, args) or tree_any(self._is_own, kwargs)):
+            val = fn(*args, **kwargs)
+            if hasattr(val, "shape"):
+                # Created inside the trace from Python values only, so it can
+                # never change between calls: safe for constant folding.
+                self.graph.add_literal(val)
+            return val
+
+        concrete = lambda a: a.val if isinstance(a, FT_Tracer) else a
+        val = fn(*tree_map(concrete, args), **tree_map(concrete, kwargs))
+
+        if isinstance(val, tuple) and all(hasattr(v, "shape") for v in val):
+            whole = self._emit(fn, tree_map(self._template, args), tree_map(self._template, kwargs), val)
+            return tuple(
+                FT_Tracer(v, self._emit(operator.getitem, (Ref(whole), i), {}, v), self)
+                for i, v in enumerate(val)
+            )
+
+        if not hasattr(val, "shape"):
+            # Static metadata (shapes, flags, ...) depends only on avals.
+            return val
+
+        slot = self._emit(fn, tree_map(self._template, args), tree_map(self._template, kwargs), val)
+        return FT_Tracer(val, slot, self)
+
+    def _emit(self, fn, args, kwargs, val):
+        slot = self.graph.new_slot(val)
+        self.graph.ops.append(Op(fn, args, kwargs, slot))
+        return slot
+
+    # -------------------------
+    # Activation
+    # -------------------------
+    @contextmanager
+    def active(self):
+        """Route `xp()` through this trace for the duration of the block."""
+        prev = b._xp
+        b._xp = _TracingBackend(self.lib, self)
+        try:
+            yield self
+        finally:
+            b._xp = prev
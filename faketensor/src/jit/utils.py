@@ -0,0 +1,55 @@
+"""
+Small helpers shared by the tracing / graph machinery.
+"""
+
+from ..tree_util import TreeDef
+
+
+def name(fn):
+    """Readable name for a recorded backend callable (used in graph dumps)."""
+    n = getattr(fn, "__name__", None)
+    if n is None:
+        n = getattr(type(fn), "__name__", repr(fn))
+    return n.lstrip("_")
+
+
+def tree_map(f, x):
+    """Apply `f` to every non-container element of nested tuples/lists/dicts."""
+    if isinstance(x, tuple):
+        return tuple(tree_map(f, e) for e in x)
+    if isinstance(x, list):
+        return [tree_map(f, e) for e in x]
+    if isinstance(x, dict):
+        return {k: tree_map(f, v) for k, v in x.items()}
+    return f(x)
+
+
+def tree_any(pred, x):
+    """True if `pred` holds for any non-container element of `x`."""
+    if isinstance(x, (tuple, list)):
+        return any(tree_any(pred, e) for e in x)
+    if isinstance(x, dict):
+        return any(tree_any(pred, v) for v in x.values())
+    return pred(x)
+
+
+def _freeze(x):
+    if isinstance(x, dict):
+        return tuple((k, _freeze(v)) for k, v in x.items())
+    if isinstance(x, (list, tuple)):
+        return tuple(_freeze(v) for v in x)
+    return x
+
+
+def treedef_key(treedef: TreeDef):
+    """Hashable key describing the structure recorded in a `TreeDef`."""
+    typ = treedef.typ
+    if typ == "leaf":
+        return "leaf"
+    children = []
+    for c in treedef.children:
+        if isinstance(c, tuple):          # (key, child) for dicts/dataclasses
+            children.append((c[0], treedef_key(c[1])))
+        else:
+            children.append(treedef_key(c))
+    return (_freeze(typ), tuple(children))
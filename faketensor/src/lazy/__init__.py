@@ -0,0 +1,2 @@
+from .runtime import lazy, materialize
+from .value import LazyValue
@@ -0,0 +1,140 @@
+"""
+Abstract evaluation rules: the (shape, dtype) a primitive would produce.
+
+Every rule has the signature `rule(impl, args, static, params)`: `impl`
+is the primitive's eager implementation and `args` its array arguments
+(lazy values, backend arrays or Python scalars). The result is
+`(shape, dtype)`, computed without touching any data.
+
+Primitives without a rule are not deferred: lazy mode evaluates their
+inputs and runs them eagerly, which is always correct.
+"""
+
+import numpy as np
+
+from ..DType import normalize_dtype
+
+
+def _aval(x):
+    """A dtype or Python scalar NumPy can promote, for `np.result_type`."""
+    dt = getattr(x, "dtype", None)
+    return x if dt is None else dt
+
+
+def _shape(x):
+    return tuple(getattr(x, "shape", ()))
+
+
+def _dummy(x):
+    """A zero-stride stand-in for `x`: views and indexing on it are free."""
+    if not hasattr(x, "shape"):
+        return x
+    return np.broadcast_to(np.empty((), dtype=x.dtype), x.shape)
+
+
+# ================================================================
+# Elementwise
+# ================================================================
+
+def elementwise(impl, args, static, params):
+    shape = np.broadcast_shapes(*(_shape(a) for a in args))
+    return shape, np.result_type(*(_aval(a) for a in args))
+
+
+def _floating(impl, args, static, params):
+    # log and true division always produce floats
+    shape = np.broadcast_shapes(*(_shape(a) for a in args))
+    return shape, np.result_type(*(_aval(a) for a in args), 1.0)
+
+
+def _clip(impl, args, static, params):
+    bounds = [b for b in static if b is not None]
+    shape = np.broadcast_shapes(*(_shape(a) for a in list(args) + bounds))
+    return shape, np.result_type(*(_aval(a) for a in list(args) + bounds))
+
+
+def _cast(impl, args, static, params):
+    dtype = static[0] if static else params["dtype"]
+    return _shape(args[0]), np.dtype(normalize_dtype(dtype))
+
+
+# ================================================================
+# Linear algebra
+# ================================================================
+
+def _matmul(impl, args, static, params):
+    a, b = (_shape(x) for x in args)
+    if not a or not b:
+        raise ValueError("matmul: input operand does not have enough dimensions")
+    sa = (1,) + a if len(a) == 1 else a
+    sb = b + (1,) if len(b) == 1 else b
+    if sa[-1] != sb[-2]:
+        raise ValueError(f"matmul: shapes {a} and {b} are not aligned")
+    shape = np.broadcast_shapes(sa[:-2], sb[:-2]) + (sa[-2], sb[-1])
+    if len(a) == 1:
+        shape = shape[:-2] + shape[-1:]
+    if len(b) == 1:
+        shape = shape[:-1]
+    return shape, np.result_type(*(_aval(x) for x in args))
+
+
+# ================================================================
+# Reductions
+# ================================================================
+
+def _reduction(impl, args, static, params):
+    x = args[0]
+    shape = _shape(x)
+    axis = static[0] if static else params.get("axis")
+    keepdims = static[1] if len(static) > 1 else params.get("keepdims", False)
+    ndim = len(shape)
+    if axis is None:
+        axes = set(range(ndim))
+    else:
+        axes = {a % ndim for a in (axis if isinstance(axis, (tuple, list)) else (axis,))}
+    out = tuple(1 if i in axes else n for i, n in enumerate(shape) if keepdims or i not in axes)
+    # dtype from a one-element example (sum of ints -> int64, mean -> float, ...)
+    probe = impl(np, np.ones((1,) * ndim, dtype=_aval(x)), *static, **params)
+    return out, np.asarray(probe).dtype
+
+
+# ================================================================
+# Views and indexing
+# ================================================================
+
+def view(impl, args, static, params):
+    """Run the primitive itself on zero-stride stand-ins (no data is read)."""
+    out = impl(np, *(_dummy(a) for a in args), *static, **params)
+    return tuple(out.shape), out.dtype
+
+
+RULES = {
+    # elementwise
+    "add": elementwise,
+    "subtract": elementwise,
+    "multiply": elementwise,
+    "power": elementwise,
+    "negative": elementwise,
+    "abs": elementwise,
+    "divide": _floating,
+    "log": _floating,
+    "clip": _clip,
+    "cast": _cast,
+    # linear algebra
+    "matmul": _matmul,
+    # reductions
+    "sum": _reduction,
+    "mean": _reduction,
+    "max": _reduction,
+    "min": _reduction,
+    "prod": _reduction,
+    # views and indexing
+    "reshape": view,
+    "transpose": view,
+    "expand_dims": view,
+    "squeeze": view,
+    "broadcast_to": view,
+    "getitem": view,
+    "take": view,
+    "gather": view,
+}
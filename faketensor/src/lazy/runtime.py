@@ -0,0 +1,377 @@
+"""
+Lazy mode: primitives build an expression graph that runs when read.
+
+Inside `lazy()` every primitive with an abstract evaluation rule
+(`lazy.rules`) returns at once: its NDarray holds a `LazyValue` in `.np`
+that records the call and the result's shape and dtype. Taping, version
+checks and gradient rules work on these placeholders exactly as they do
+on arrays, so `value_and_grad` builds the forward and backward graph
+without computing anything.
+
+Nothing runs until a value is read (printing, `float()`, `np.asarray`,
+indexing, an in-place write, the end of `value_and_grad`). The whole
+pending expression behind it is then evaluated at once:
+
+  • it is scheduled depth-first, heaviest operand subtree first, which
+    keeps the number of simultaneously live intermediates low;
+  • it is lowered to a `jit.graph.Graph` and run through the jit passes:
+    constant folding, CSE, dead-code elimination (unused values are
+    never computed), elementwise fusion (`jit.fusion`) and the static
+    memory planner (`jit.memory`);
+  • intermediates are freed after their last reader, and only values
+    that are still referenced from outside the graph are materialized
+    (found by dropping the graph's own references and seeing which
+    values survive, through weak references).
+
+Primitives without a rule (and every call on jit or vmap tracers) run
+eagerly on concrete inputs, which is always correct; so does a primitive
+whose rule cannot handle its arguments.
+"""
+
+import weakref
+from contextlib import contextmanager
+
+import numpy as _np
+
+from ...backend.backend import xp
+from .. import base
+from ..base import PRIMITIVES
+from ..jit.fusion import fuse_elementwise
+from ..jit.graph import Graph, Op, Ref
+from ..jit.memory import plan_memory
+from ..jit.passes import optimize
+from ..jit.utils import tree_map
+from ..tree_util import flatten_pytree, unflatten_pytree
+from .rules import RULES
+from .value import LazyValue, PENDING, force
+
+
+_DEPTH = 0
+_EAGER = {}         # primitive -> eager impl, while lazy mode is installed
+
+_SCALARS = (int, float, complex, bool, _np.generic)
+
+
+def active():
+    """True inside a `lazy()` block."""
+    return _DEPTH > 0
+
+
+def _backend():
+    """The real array module, also while a jit/vmap trace swaps `xp()`."""
+    lib = xp()
+    trace = getattr(lib, "_trace", None)
+    return lib if trace is None else trace.lib
+
+
+def _eager_impl(p):
+    return _EAGER.get(p, p.impl)
+
+
+# ================================================================
+# Deferring primitive calls
+# ================================================================
+
+def _deferred(p, impl, rule):
+    n = p.nargs
+
+    def deferred(lib, *args, **params):
+        arrays = args[:n]
+        static = tree_map(force, args[n:])
+        params = tree_map(force, params)
+        if rule is not None and getattr(lib, "_trace", None) is None:
+            kinds = (LazyValue, lib.ndarray) + _SCALARS
+            if all(isinstance(a, kinds) for a in arrays):
+                try:
+                    shape, dtype = rule(impl, arrays, static, params)
+                except Exception:
+                    # let the eager call raise (or handle) it
+                    pass
+                else:
+                    return LazyValue(p, arrays, static, params, tuple(shape), dtype)
+        return impl(lib, *(force(a) for a in arrays), *static, **params)
+
+    deferred.__name__ = impl.__name__
+    deferred.__qualname__ = impl.__qualname__
+    return deferred
+
+
+def _install():
+    for p in list(PRIMITIVES.values()):
+        _EAGER[p] = p.impl
+        p.impl = _deferred(p, p.impl, RULES.get(p.name))
+
+
+def _uninstall():
+    for p, impl in _EAGER.items():
+        p.impl = impl
+    _EAGER.clear()
+
+
+class _BackendOp:
+    """A backend function recorded on lazy values; stands in for a primitive."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+_BACKEND_OPS = {}
+
+# Backend ops whose result is boolean whatever their inputs.
+_PREDICATES = frozenset({
+    "equal", "not_equal", "less", "less_equal", "greater", "greater_equal",
+})
+
+
+def defer_backend(name, *args):
+    """
+    `lib.<name>(*args)` for an elementwise backend function with no
+    primitive (comparisons, mask operators). Recorded as a lazy value
+    while lazy mode is on and every argument is a lazy value, backend
+    array or scalar; run on the concrete values otherwise.
+    """
+    lib = _backend()
+    if active() and all(isinstance(a, (LazyValue, lib.ndarray) + _SCALARS) for a in args):
+        op = _BACKEND_OPS.get(name)
+        if op is None:
+            op = _BACKEND_OPS[name] = _BackendOp(name)
+        shape, dtype = RULES["add"](None, args, (), {})
+        if name in _PREDICATES:
+            dtype = _np.dtype(bool)
+        return LazyValue(op, args, (), {}, tuple(shape), dtype)
+    return getattr(lib, name)(*(force(a) for a in args))
+
+
+@contextmanager
+def lazy():
+    """
+    Defer primitive evaluation inside the block.
+
+    Values created in the block stay lazy after it ends and are computed
+    when first read. Example:
+
+        with ft.lazy():
+            loss, grads = ft.value_and_grad(loss_fn)(model, x, y)
+        # `loss` and `grads` are materialized; intermediates that only fed
+        # them were fused or never stored
+    """
+    global _DEPTH
+    if _DEPTH == 0:
+        _install()
+    _DEPTH += 1
+    try:
+        yield
+    finally:
+        _DEPTH -= 1
+        if _DEPTH == 0:
+            _uninstall()
+
+
+# ================================================================
+# Evaluation
+# ================================================================
+
+def _deps(v):
+    return [a for a in v.args if isinstance(a, LazyValue) and a.value is None]
+
+
+def _schedule(starts):
+    """
+    Topological order of the pending graph under `starts`.
+
+    Depth-first, visiting the operand with the larger pending subtree
+    first: its intermediates are released before the smaller operand's
+    are created, which lowers the peak number of live buffers.
+    """
+    weight = {}
+    stack = [(v, False) for v in starts]
+    while stack:
+        v, done = stack.pop()
+        k = id(v)
+        if k in weight:
+            continue
+        deps = _deps(v)
+        if done:
+            weight[k] = 1 + sum(weight[id(a)] for a in deps)
+            continue
+        stack.append((v, True))
+        stack.extend((a, False) for a in deps if id(a) not in weight)
+
+    order = []
+    placed = set()
+    stack = [(v, False) for v in reversed(starts)]
+    while stack:
+        v, done = stack.pop()
+        k = id(v)
+        if k in placed:
+            continue
+        if done:
+            placed.add(k)
+            order.append(v)
+            continue
+        stack.append((v, True))
+        deps = sorted(_deps(v), key=lambda a: weight[id(a)])
+        stack.extend((a, False) for a in deps if id(a) not in placed)
+    return order
+
+
+def _live(order):
+    """
+    The values of `order` still referenced from outside the graph (None
+    for the others), in the same order; empties `order`.
+
+    Every value is already lowered, so the graph's own references to it
+    (its readers' arguments and `order` itself) are dropped; values that
+    only the graph held are released, and the weak references of the
+    rest stay alive. A released value is unreachable and need not be
+    stored; a surviving one becomes an output and gets its result.
+    """
+    refs = [weakref.ref(v) for v in order]
+    for v in order:
+        v.args = None
+    v = None
+    order.clear()
+    return [r() for r in refs]
+
+
+class _PrimImpl:
+    """A primitive's eager implementation as a graph op: `fn(*arrays, *static, **params)`."""
+
+    __slots__ = ("lib", "impl", "__name__")
+
+    def __init__(self, lib, impl):
+        self.lib = lib
+        self.impl = impl
+        self.__name__ = impl.__name__
+
+    def __call__(self, *args, **kwargs):
+        return self.impl(self.lib, *args, **kwargs)
+
+
+_OPAQUE = {}
+
+# Primitives that are a single backend function of their arguments; they
+# lower to that function so fusion and memory planning can see them.
+_LOWER = {
+    "add": "add",
+    "subtract": "subtract",
+    "multiply": "multiply",
+    "divide": "divide",
+    "negative": "negative",
+    "power": "power",
+    "abs": "abs",
+    "matmul": "matmul",
+    "clip": "clip",
+}
+_LOWER.update((name, name) for name in (
+    "equal", "not_equal", "less", "less_equal", "greater", "greater_equal",
+    "bitwise_and", "bitwise_or", "invert",
+))
+
+
+def _lower(g, v, args):
+    """Append the op(s) computing `v`; return its slot."""
+    lib = g.lib
+    p = v.prim
+    name = p.name
+    out = g.new_slot(v)
+    if name in _LOWER and not v.params:
+        g.ops.append(Op(getattr(lib, _LOWER[name]), tuple(args) + tuple(v.static), {}, out))
+    elif name == "log":
+        from ..functions.primitive_arithmetic import _log_eps
+        clamped = g.new_slot(v)
+        g.ops.append(Op(lib.maximum, (args[0], _log_eps(v.args[0])), {}, clamped))
+        g.ops.append(Op(lib.log, (Ref(clamped),), {}, out))
+    else:
+        key = (id(lib), p)
+        fn = _OPAQUE.get(key)
+        if fn is None:
+            fn = _OPAQUE[key] = _PrimImpl(lib, _eager_impl(p))
+        g.ops.append(Op(fn, tuple(args) + tuple(v.static), dict(v.params), out))
+    return out
+
+
+def _build(order):
+    """Lower `order` into a graph without outputs; return it, its inputs and each value's slot."""
+    g = Graph(_backend())
+    slots = {}
+    values = []
+
+    def operand(a):
+        if isinstance(a, LazyValue):
+            if a.value is None:
+                return Ref(slots[id(a)])
+            a = a.value
+        if hasattr(a, "shape") and not isinstance(a, _np.generic):
+            k = id(a)
+            if k not in slots:
+                s = g.new_slot(a)
+                g.inputs.append(s)
+                values.append(a)
+                slots[k] = s
+            return Ref(slots[k])
+        return a
+
+    out_slots = []
+    for v in order:
+        slots[id(v)] = s = _lower(g, v, [operand(a) for a in v.args])
+        out_slots.append(s)
+    return g, values, out_slots
+
+
+def evaluate(roots, everything=False):
+    """
+    Evaluate the pending graph behind `roots` (or behind every pending
+    value, with `everything=True`) and store the results.
+    """
+    roots = [v for v in roots if v.value is None]
+    starts = list(PENDING.values()) if everything else roots
+    if not starts:
+        return
+    order = _schedule(starts)
+    del starts
+    g, values, slots = _build(order)
+    # Materialize the roots (held by `roots`) and every other value that
+    # is referenced from outside the graph.
+    outputs = [(v, s) for v, s in zip(_live(order), slots) if v is not None]
+    g.outputs = [Ref(s) for _, s in outputs]
+
+    # `simplify` would return inputs for `x * 1` and the like; results
+    # must be new arrays, as in eager mode.
+    optimize(g, simplify=False)
+    fuse_elementwise(g)
+    plan_memory(g)
+    results = g.run(values)
+
+    seen = set()
+    for (v, _), r in zip(outputs, results):
+        if id(r) in seen:          # merged by CSE: give each value its own buffer
+            r = r.copy()
+        seen.add(id(r))
+        v._set(r)
+
+
+def materialize(tree):
+    """
+    Evaluate every lazy value in a pytree of NDarrays / raw values in one
+    graph; raw lazy values are replaced by their arrays.
+
+    NDarrays get the concrete array in `.np` too unless a tape or jvp is
+    still recording (their identity may be tracked there).
+    """
+    leaves, treedef = flatten_pytree(tree)
+    pending = [getattr(x, "np", x) for x in leaves]
+    evaluate([r for r in pending if isinstance(r, LazyValue)])
+    del pending
+    swap = not base.TAPE_STACK and not base.JVP_STACK
+
+    def concrete(x):
+        if isinstance(x, LazyValue):
+            return x.value
+        if swap and isinstance(getattr(x, "np", None), LazyValue):
+            x.np = x.np.value
+        return x
+
+    return unflatten_pytree([concrete(x) for x in leaves], treedef)
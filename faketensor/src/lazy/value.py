@@ -0,0 +1,247 @@
+"""
+`LazyValue`: the placeholder an NDarray holds in `.np` until it is read.
+
+A lazy value records the primitive that produces it, its arguments (other
+lazy values, backend arrays or Python scalars) and its abstract value
+(shape, dtype). Shape and dtype metadata is answered from the abstract
+value; anything that needs the data — `np.asarray`, `float()`, printing,
+indexing, NumPy functions, in-place writes, any other ndarray attribute —
+evaluates the pending graph behind it first (see `runtime.evaluate`).
+
+Python operators on a lazy value (`a + b` on raw values, as the backward
+pass does when accumulating gradients) go through the faketensor
+primitives, so they stay lazy while lazy mode is on; so do the NumPy
+ufuncs with a matching primitive (`ndarray + v`, `np.multiply(v, 2)`).
+Every other NumPy call runs on the concrete data.
+
+Reading `base` or `nbytes`, or probing for `np`, does not evaluate a
+pending value, so version tracking, tape statistics and the profiler
+leave the graph alone.
+
+Comparisons and boolean mask operators (`x >= 0`, `a & b`, `~m`), which
+grad rules use to build masks, have no primitive: while lazy mode is on
+they are recorded as plain backend ops (see `runtime.defer_backend`), so
+they neither evaluate the graph nor fall back to identity comparison.
+"""
+
+import math
+import weakref
+
+from .. import base
+from ..jit.utils import tree_map
+
+
+# Lazy values that have not been evaluated yet and are still referenced,
+# by id: a `WeakSet` would compare them with `==`, which records an op.
+PENDING = weakref.WeakValueDictionary()
+
+
+# NumPy ufuncs that map onto a primitive with the same semantics.
+_UFUNC_OPS = {
+    "add": "add",
+    "subtract": "subtract",
+    "multiply": "multiply",
+    "divide": "divide",
+    "true_divide": "divide",
+    "negative": "negative",
+    "power": "power",
+    "absolute": "abs",
+    "matmul": "matmul",
+}
+
+# NumPy ufuncs without a primitive that are recorded as backend ops.
+_BACKEND_UFUNCS = frozenset({
+    "equal", "not_equal", "less", "less_equal", "greater", "greater_equal",
+    "bitwise_and", "bitwise_or", "invert",
+})
+
+
+def force(x):
+    """The concrete value of `x` if it is a `LazyValue`, else `x`."""
+    return x.force() if isinstance(x, LazyValue) else x
+
+
+def flush():
+    """Evaluate every pending lazy value (before an in-place write)."""
+    if PENDING:
+        from .runtime import evaluate
+        evaluate((), everything=True)
+
+
+class LazyValue:
+    __slots__ = (
+        "prim", "args", "static", "params", "shape", "dtype", "value", "version0", "__weakref__",
+    )
+
+    __array_priority__ = 1000
+
+    def __init__(self, prim, args, static, params, shape, dtype):
+        self.prim = prim
+        self.args = args
+        self.static = static
+        self.params = params
+        self.shape = shape
+        self.dtype = dtype
+        self.value = None
+        self.version0 = 0
+        PENDING[id(self)] = self
+
+    # -------------------------
+    # Static metadata
+    # -------------------------
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return math.prod(self.shape)
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    __hash__ = object.__hash__
+
+    # -------------------------
+    # Evaluation
+    # -------------------------
+    @property
+    def pending(self):
+        return self.value is None
+
+    def force(self):
+        """Evaluate (if needed) and return the backend array."""
+        if self.value is None:
+            from .runtime import evaluate
+            evaluate((self,))
+        return self.value
+
+    def _set(self, value):
+        # In-place writes the buffer saw before this value existed (if it
+        # is a view) do not count against it; see `base.version`.
+        self.version0 = base.version(value) if base._VERSIONS else 0
+        self.value = value
+        self.prim = self.args = self.static = self.params = None
+        PENDING.pop(id(self), None)
+
+    def __repr__(self):
+        return repr(self.force())
+
+    def __str__(self):
+        return str(self.force())
+
+    # -------------------------
+    # Concrete access
+    # -------------------------
+    def __getattr__(self, item):
+        # Every other ndarray attribute or method (`.T`, `.astype`,
+        # `.strides`, ...) is read off the concrete array. `np` is what
+        # the autodiff code probes to tell an NDarray from a raw value:
+        # a raw value never has one, so answering must not evaluate.
+        if item == "np":
+            raise AttributeError(item)
+        return getattr(self.force(), item)
+
+    @property
+    def base(self):
+        # A pending value owns no buffer yet, so it is nobody's view.
+        return None if self.value is None else self.value.base
+
+    @property
+    def nbytes(self):
+        if self.value is None:
+            return self.size * self.dtype.itemsize
+        return self.value.nbytes
+
+    def __array__(self, dtype=None, copy=None):
+        v = self.force()
+        if dtype is not None and v.dtype != dtype:
+            return v.astype(dtype)
+        return v.copy() if copy else v
+
+    def __float__(self):
+        return float(self.force())
+
+    def __int__(self):
+        return int(self.force())
+
+    def __bool__(self):
+        return bool(self.force())
+
+    def __index__(self):
+        return self.force().__index__()
+
+    def __complex__(self):
+        return complex(self.force())
+
+    def __getitem__(self, key):
+        return self.force()[tree_map(force, key)]
+
+    def __setitem__(self, key, value):
+        flush()
+        self.force()[tree_map(force, key)] = force(value)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # `ndarray + lazy` lands here: keep it lazy while lazy mode is on
+        if method == "__call__" and not kwargs and ufunc.__name__ in _UFUNC_OPS:
+            from .runtime import active
+            if active():
+                return self._op(_UFUNC_OPS[ufunc.__name__], *inputs)
+        if method == "__call__" and not kwargs and ufunc.__name__ in _BACKEND_UFUNCS:
+            return self._backend_op(ufunc.__name__, *inputs)
+        fn = ufunc if method == "__call__" else getattr(ufunc, method)
+        return fn(*tree_map(force, inputs), **tree_map(force, kwargs))
+
+    def __array_function__(self, func, types, args, kwargs):
+        return func(*tree_map(force, args), **tree_map(force, kwargs))
+
+    def __dlpack__(self, *args, **kwargs):
+        return self.force().__dlpack__(*args, **kwargs)
+
+    def __dlpack_device__(self):
+        return self.force().__dlpack_device__()
+
+    # -------------------------
+    # Operators (lazy, through the primitives)
+    # -------------------------
+    def _op(self, name, *args):
+        from .. import functions as F
+        out = getattr(F, name)(*args)
+        return getattr(out, "np", out)
+
+    def __add__(self, o):       return self._op("add", self, o)
+    def __radd__(self, o):      return self._op("add", o, self)
+    def __sub__(self, o):       return self._op("subtract", self, o)
+    def __rsub__(self, o):      return self._op("subtract", o, self)
+    def __mul__(self, o):       return self._op("multiply", self, o)
+    def __rmul__(self, o):      return self._op("multiply", o, self)
+    def __truediv__(self, o):   return self._op("divide", self, o)
+    def __rtruediv__(self, o):  return self._op("divide", o, self)
+    def __pow__(self, o):       return self._op("power", self, o)
+    def __rpow__(self, o):      return self._op("power", o, self)
+    def __matmul__(self, o):    return self._op("matmul", self, o)
+    def __rmatmul__(self, o):   return self._op("matmul", o, self)
+    def __neg__(self):          return self._op("negative", self)
+    def __pos__(self):          return self
+    def __abs__(self):          return self._op("abs", self)
+
+    # -------------------------
+    # Comparisons and masks (lazy, as backend ops)
+    # -------------------------
+    def _backend_op(self, name, *args):
+        from .runtime import defer_backend
+        return defer_backend(name, *args)
+
+    def __eq__(self, o):        return self._backend_op("equal", self, o)
+    def __ne__(self, o):        return self._backend_op("not_equal", self, o)
+    def __lt__(self, o):        return self._backend_op("less", self, o)
+    def __le__(self, o):        return self._backend_op("less_equal", self, o)
+    def __gt__(self, o):        return self._backend_op("greater", self, o)
+    def __ge__(self, o):        return self._backend_op("greater_equal", self, o)
+    def __and__(self, o):       return self._backend_op("bitwise_and", self, o)
+    def __rand__(self, o):      return self._backend_op("bitwise_and", o, self)
+    def __or__(self, o):        return self._backend_op("bitwise_or", self, o)
+    def __ror__(self, o):       return self._backend_op("bitwise_or", o, self)
+    def __invert__(self):       return self._backend_op("invert", self)
@@ -1,18 +1,22 @@
+import numpy as _np
 from ...backend import backend as b
-from ..array import NDarray
+from ..array import NDarray, _new_nd
 from ...src.DType import DType, normalize_dtype
+from ..dtype_policy import default_float
 from typing import Optional
 
 def ones(shape, dtype=None):
-    dtype = normalize_dtype(dtype)
+    dtype = normalize_dtype(dtype) or default_float()
     return NDarray(b.xp().ones(shape, dtype))
 
 def zeros(shape, dtype=None):
-    dtype = normalize_dtype(dtype)
+    dtype = normalize_dtype(dtype) or default_float()
     return NDarray(b.xp().zeros(shape, dtype))
 
 def full(shape, value, dtype=None):
     dtype = normalize_dtype(dtype)
+    if dtype is None and type(value) is float:
+        dtype = default_float()
     return NDarray(b.xp().full(shape, value, dtype))
 
 def ones_like(_data, dtype=None):
@@ -26,3 +30,55 @@ def zeros_like(_data, dtype=None):
 def full_like(_data, value, dtype=None):
     dtype = normalize_dtype(dtype)
     return NDarray(b.xp().full_like(_data.np, value, dtype))
+
+def from_dlpack(x):
+    """
+    Wrap any DLPack-capable array (NumPy, CuPy, PyTorch, JAX, ...) as an
+    NDarray on the active backend, without copying when the device matches.
+    """
+    if isinstance(x, NDarray):
+        return x
+    return NDarray(b.xp().from_dlpack(x))
+
+
+def memmap(filename, dtype=None, mode="r", offset=0, shape=None, order="C"):
+    """
+    NDarray backed by a memory-mapped raw binary file (`numpy.memmap`).
+
+    Nothing is read up front: pages are loaded on demand when an op
+    touches them, so `x[i:j]` on a file larger than RAM only reads rows
+    i..j. Basic slices stay memory-mapped views; integer-array indexing
+    reads just the selected rows.
+
+    Args:
+        filename: Path or open file object.
+        dtype: Element type (default uint8, as for `numpy.memmap`).
+        mode (str): 'r' (read-only), 'r+', 'w+' or 'c' (copy-on-write).
+        offset (int): Byte offset of the data in the file.
+        shape (tuple[int] | None): Array shape; None maps the whole file as 1-D.
+        order (str): 'C' or 'F' memory layout.
+
+    The map always lives in host memory. With a GPU backend, index it
+    (e.g. per batch) before computing: `getitem` copies only the selected
+    part to the device.
+    """
+    dtype = _np.uint8 if dtype is None else normalize_dtype(dtype)
+    return _new_nd(_np.memmap(filename, dtype=dtype, mode=mode, offset=offset,
+                              shape=shape, order=order))
+
+
+def load(file, mmap_mode="r"):
+    """
+    Load a `.npy` file as an NDarray, memory-mapped by default.
+
+    Args:
+        file: Path or open file object of a `.npy` file.
+        mmap_mode (str | None): As for `memmap`; None reads the whole file
+            into memory on the active backend.
+    """
+    arr = _np.load(file, mmap_mode=mmap_mode, allow_pickle=False)
+    if not isinstance(arr, _np.ndarray):
+        raise TypeError(f"{file!r} is not a .npy file")
+    if mmap_mode is None:
+        return NDarray(arr)
+    return _new_nd(arr)
@@ -0,0 +1,244 @@
+"""
+Per-primitive profiler with Chrome/Perfetto trace export.
+
+    with ft.profile() as prof:
+        loss, grads = ft.value_and_grad(loss_fn)(model, x, y)
+
+    print(prof.table())
+    prof.export_chrome_trace("step.json")   # open in chrome://tracing or ui.perfetto.dev
+
+Every primitive call and every `grad_fn` run by the backward pass becomes
+one event holding its wall time, output shape/dtype, the bytes it
+allocated (views count as 0) and its phase:
+
+  • "forward"  – a primitive called from user code
+  • "backward" – a node's grad rule (named "grad:<op>") and every primitive
+                 it calls
+
+Events nest (grad rules call primitives), so each one keeps both its total
+and its self time; the table aggregates self time so nothing is counted
+twice.
+
+Disabled, the profiler costs nothing on the op path: starting it adds the
+outermost call hook on `Primitive` and `function` (see
+`base.add_call_hook`) and stopping it removes them. The backward loop reads
+`base.PROFILER` once per pass.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+from time import perf_counter
+import json
+
+from . import base
+from .base import Primitive, function, op_name
+
+
+Event = namedtuple(
+    "Event", "name phase start duration self_time depth shape dtype nbytes"
+)
+Event.__doc__ = """One profiled call. Times are in seconds, `start` relative to profiler start."""
+
+
+def _allocated(v):
+    """Bytes of the array behind `v`, or 0 if it is a view or not an array."""
+    r = getattr(v, "np", v)
+    if getattr(r, "base", None) is not None:
+        return 0
+    return int(getattr(r, "nbytes", 0) or 0)
+
+
+def _describe(value):
+    """(shape, dtype, allocated bytes) of a primitive output or grad tuple."""
+    if isinstance(value, (tuple, list)):
+        shapes, dtype, nbytes = [], None, 0
+        for v in value:
+            if v is None:
+                shapes.append(None)
+                continue
+            s, d, n = _describe(v)
+            shapes.append(s)
+            dtype = dtype or d
+            nbytes += n
+        return tuple(shapes), dtype, nbytes
+    r = getattr(value, "np", value)
+    shape = getattr(r, "shape", None)
+    dtype = getattr(r, "dtype", None)
+    return (
+        None if shape is None else tuple(shape),
+        None if dtype is None else str(dtype),
+        _allocated(r),
+    )
+
+
+class Profiler:
+    """
+    Collects `Event`s while active. Use `profile()` to run one.
+
+    Attributes:
+        events (list[Event]): In completion order (children before parents).
+    """
+
+    def __init__(self):
+        self.events = []
+        self._phase = "forward"
+        self._children = []   # accumulated child time of each open event
+        self._origin = None
+        self._hooks = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if base.PROFILER is not None:
+            raise RuntimeError("A profiler is already running")
+        self._origin = perf_counter()
+        prof = self
+
+        def primitive_call(call, p, *args, **params):
+            return prof._run(p.name, call, p, args, params)
+
+        def function_call(call, f, *args):
+            return prof._run(f.fun.__name__, call, f, args, {})
+
+        self._hooks = (primitive_call, function_call)
+        base.add_call_hook(primitive_call, base.HOOK_PROFILER, Primitive)
+        base.add_call_hook(function_call, base.HOOK_PROFILER, function)
+        base.PROFILER = self
+        return self
+
+    def stop(self):
+        if base.PROFILER is not self:
+            return
+        primitive_call, function_call = self._hooks
+        base.remove_call_hook(primitive_call, Primitive)
+        base.remove_call_hook(function_call, function)
+        base.PROFILER = None
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+    def _run(self, name, call, obj, args, params):
+        children = self._children
+        children.append(0.0)
+        start = perf_counter()
+        out = None
+        try:
+            out = call(obj, *args, **params)
+            return out
+        finally:
+            self._finish(name, self._phase, start, out)
+
+    def grad(self, node, g):
+        """Run `node.grad_fn(g)` as a backward event."""
+        prev = self._phase
+        self._phase = "backward"
+        self._children.append(0.0)
+        start = perf_counter()
+        grads = None
+        try:
+            grads = node.grad_fn(g)
+            return grads
+        finally:
+            self._phase = prev
+            # Allocations are charged to the primitives the rule calls.
+            self._finish("grad:" + op_name(node.grad_fn), "backward", start, grads, own_bytes=False)
+
+    def _finish(self, name, phase, start, value, own_bytes=True):
+        duration = perf_counter() - start
+        children = self._children
+        child = children.pop()
+        if children:
+            children[-1] += duration
+        shape, dtype, nbytes = _describe(value)
+        if not own_bytes:
+            nbytes = 0
+        self.events.append(Event(
+            name, phase, start - self._origin, duration, duration - child,
+            len(children), shape, dtype, nbytes,
+        ))
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+    def summary(self):
+        """
+        Aggregate events by (name, phase).
+
+        Returns:
+            list[dict]: keys name, phase, calls, total, self, bytes
+            (seconds / bytes), sorted by self time, largest first.
+        """
+        rows = {}
+        for e in self.events:
+            r = rows.get((e.name, e.phase))
+            if r is None:
+                r = rows[(e.name, e.phase)] = dict(
+                    name=e.name, phase=e.phase, calls=0, total=0.0, self=0.0, bytes=0
+                )
+            r["calls"] += 1
+            r["total"] += e.duration
+            r["self"] += e.self_time
+            r["bytes"] += e.nbytes
+        return sorted(rows.values(), key=lambda r: r["self"], reverse=True)
+
+    def table(self, limit=None):
+        """The `summary()` as a printable table."""
+        rows = self.summary()
+        total_self = sum(r["self"] for r in rows) or 1.0
+        if limit is not None:
+            rows = rows[:limit]
+        lines = [
+            f"{'op':<22} {'phase':<9} {'calls':>7} {'self ms':>9} {'self %':>7} "
+            f"{'total ms':>9} {'us/call':>8} {'alloc MB':>9}"
+        ]
+        for r in rows:
+            lines.append(
+                f"{r['name'][:22]:<22} {r['phase']:<9} {r['calls']:>7} "
+                f"{r['self'] * 1e3:9.3f} {100 * r['self'] / total_self:6.1f}% "
+                f"{r['total'] * 1e3:9.3f} {r['total'] / r['calls'] * 1e6:8.1f} "
+                f"{r['bytes'] / 2**20:9.3f}"
+            )
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """The events in Chrome trace-event format (a JSON-able dict)."""
+        trace = []
+        for e in self.events:
+            trace.append({
+                "name": e.name,
+                "cat": e.phase,
+                "ph": "X",
+                "ts": e.start * 1e6,
+                "dur": e.duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {
+                    "shape": str(e.shape),
+                    "dtype": e.dtype,
+                    "bytes": e.nbytes,
+                },
+            })
+        trace.sort(key=lambda ev: ev["ts"])
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Write `chrome_trace()` to `path` (loadable in Perfetto / chrome://tracing)."""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+@contextmanager
+def profile():
+    """
+    Profile every primitive and grad rule run inside the block.
+
+    Yields:
+        Profiler: holds the events; call `table()` or
+        `export_chrome_trace(path)` after (or during) the block.
+    """
+    prof = Profiler().start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
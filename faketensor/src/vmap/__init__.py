@@ -0,0 +1,2 @@
+from .transform import vmap
+from .tracer import BatchTracer
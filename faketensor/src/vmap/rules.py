@@ -0,0 +1,313 @@
+"""
+Batching rules: evaluate a backend call once for a whole batch.
+
+Every rule has the signature `rule(trace, fn, args, kwargs)`; batched values
+are `BatchTracer`s of `trace` whose `.val` carries the batch on axis 0.
+Axis arguments are given per example and are shifted by one; elementwise
+operands are padded with unit dims after the batch axis so that NumPy
+broadcasting lines up exactly as it does for a single example.
+
+Functions without a rule fall back to `loop`, which applies `fn` to every
+example and stacks the results: always correct, but not vectorized.
+"""
+
+from ..jit.utils import tree_map, tree_any
+
+
+# ================================================================
+# Helpers
+# ================================================================
+
+def _ndim(x):
+    return getattr(x, "ndim", 0)
+
+
+def _shift(axis, ndim):
+    """Per-example axis (int or tuple) -> batched axis."""
+    if isinstance(axis, (tuple, list)):
+        return tuple(_shift(a, ndim) for a in axis)
+    return axis % ndim + 1 if ndim else axis + 1
+
+
+def _pop_arg(args, kwargs, index, key, default=None):
+    """Remove and return an argument given positionally or by keyword."""
+    if len(args) > index:
+        return args[index], args[:index] + args[index + 1:]
+    return kwargs.pop(key, default), args
+
+
+# ================================================================
+# Generic rules
+# ================================================================
+
+def loop(trace, fn, args, kwargs):
+    """Fallback: map `fn` over the batch in Python and stack the results."""
+    lib = trace.lib
+    pick = lambda i: (lambda a: a.val[i] if trace.is_own(a) else a)
+    outs = [
+        fn(*tree_map(pick(i), args), **tree_map(pick(i), kwargs))
+        for i in range(trace.size)
+    ]
+    first = outs[0]
+    if isinstance(first, tuple) and all(hasattr(o, "shape") for o in first):
+        return tuple(trace.wrap(lib.stack(list(col))) for col in zip(*outs))
+    if hasattr(first, "shape"):
+        return trace.wrap(lib.stack(outs))
+    return first
+
+
+def elementwise(trace, fn, args, kwargs):
+    """Ufuncs and other broadcasting functions (`where`, `clip`, `*_like`)."""
+    if kwargs.get("out") is not None:
+        raise NotImplementedError("vmap: `out=` is not supported for batched values")
+    ndim = 0
+    for a in list(args) + list(kwargs.values()):
+        ndim = max(ndim, _ndim(a))
+    lift = lambda a: trace.lift(a, ndim) if trace.is_own(a) else a
+    return trace.wrap(fn(*tree_map(lift, args), **tree_map(lift, kwargs)))
+
+
+def _reduction(flatten):
+    """
+    Rule for functions taking an `axis` as their second argument.
+
+    `flatten=True` for functions that flatten the example on `axis=None`
+    (`argmax`, `cumsum`, `sort`, ...); otherwise `axis=None` means "every
+    example axis" (`sum`, `max`, ...).
+    """
+    def rule(trace, fn, args, kwargs, default=None):
+        x, rest = args[0], args[1:]
+        if not trace.is_own(x) or tree_any(trace.is_own, (rest, kwargs)):
+            return loop(trace, fn, args, kwargs)
+        kwargs = dict(kwargs)
+        axis, rest = _pop_arg(rest, kwargs, 0, "axis", default)
+        v = x.val
+        if axis is None and flatten:
+            v = trace.lib.reshape(v, (v.shape[0], -1))
+            axis = 1
+        elif axis is None:
+            axis = tuple(range(1, x.ndim + 1))
+        else:
+            axis = _shift(axis, x.ndim)
+        return trace.wrap(fn(v, axis, *rest, **kwargs))
+    return rule
+
+
+def _ufunc_method(trace, fn, args, kwargs):
+    """`ufunc.reduce` / `ufunc.accumulate` (default axis 0)."""
+    return _reduction(False)(trace, fn, args, kwargs, default=0)
+
+
+# ================================================================
+# Shape manipulation
+# ================================================================
+
+def _reshape(trace, fn, args, kwargs):
+    x, rest = args[0], args[1:]
+    if not trace.is_own(x):
+        return loop(trace, fn, args, kwargs)
+    kwargs = dict(kwargs)
+    if len(rest) == 1 and isinstance(rest[0], (tuple, list)):
+        shape = tuple(rest[0])
+    elif rest:
+        shape = tuple(rest)
+    else:
+        shape = kwargs.pop("shape", kwargs.pop("newshape", ()))
+        shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,)
+    return trace.wrap(trace.lib.reshape(x.val, (trace.size,) + shape, **kwargs))
+
+
+def _ravel(trace, fn, args, kwargs):
+    x = args[0]
+    return trace.wrap(trace.lib.reshape(x.val, (trace.size, -1)))
+
+
+def _transpose(trace, fn, args, kwargs):
+    x, rest = args[0], args[1:]
+    if not trace.is_own(x):
+        return loop(trace, fn, args, kwargs)
+    kwargs = dict(kwargs)
+    if len(rest) == 1 and (rest[0] is None or isinstance(rest[0], (tuple, list))):
+        axes = rest[0]
+    elif rest:
+        axes = tuple(rest)
+    else:
+        axes = kwargs.pop("axes", None)
+    if axes is None:
+        axes = tuple(range(x.ndim - 1, -1, -1))
+    axes = (0,) + _shift(tuple(axes), x.ndim)
+    return trace.wrap(trace.lib.transpose(x.val, axes))
+
+
+def _swapaxes(trace, fn, args, kwargs):
+    x, a1, a2 = args
+    return trace.wrap(trace.lib.swapaxes(x.val, _shift(a1, x.ndim), _shift(a2, x.ndim)))
+
+
+def _moveaxis(trace, fn, args, kwargs):
+    x, src, dst = args
+    return trace.wrap(trace.lib.moveaxis(x.val, _shift(src, x.ndim), _shift(dst, x.ndim)))
+
+
+def _expand_dims(trace, fn, args, kwargs):
+    kwargs = dict(kwargs)
+    x = args[0]
+    axis, _ = _pop_arg(args[1:], kwargs, 0, "axis")
+    ndim = x.ndim + (len(axis) if isinstance(axis, (tuple, list)) else 1)
+    return trace.wrap(trace.lib.expand_dims(x.val, _shift(axis, ndim)))
+
+
+def _squeeze(trace, fn, args, kwargs):
+    kwargs = dict(kwargs)
+    x = args[0]
+    axis, _ = _pop_arg(args[1:], kwargs, 0, "axis")
+    if axis is None:
+        axis = tuple(i for i, d in enumerate(x.shape) if d == 1)
+    return trace.wrap(trace.lib.squeeze(x.val, _shift(axis, x.ndim)))
+
+
+def _broadcast_to(trace, fn, args, kwargs):
+    kwargs = dict(kwargs)
+    x = args[0]
+    shape, _ = _pop_arg(args[1:], kwargs, 0, "shape")
+    shape = tuple(shape) if isinstance(shape, (tuple, list)) else (shape,)
+    v = trace.lift(x, len(shape))
+    return trace.wrap(trace.lib.broadcast_to(v, (trace.size,) + shape))
+
+
+def _getitem(trace, fn, args, kwargs):
+    x, key = args
+    if not trace.is_own(x) or tree_any(trace.is_own, key):
+        return loop(trace, fn, args, kwargs)
+    key = key if isinstance(key, tuple) else (key,)
+    return trace.wrap(x.val[(slice(None),) + key])
+
+
+def _asarray(trace, fn, args, kwargs):
+    x = args[0]
+    dtype = kwargs.get("dtype", args[1] if len(args) > 1 else None)
+    if not trace.is_own(x):
+        return loop(trace, fn, args, kwargs)
+    return x if dtype is None else trace.wrap(x.val.astype(dtype))
+
+
+def _copy(trace, fn, args, kwargs):
+    return trace.wrap(trace.lib.copy(args[0].val))
+
+
+def _concatenate(trace, fn, args, kwargs):
+    kwargs = dict(kwargs)
+    arrays = list(args[0])
+    axis, _ = _pop_arg(args[1:], kwargs, 0, "axis", 0)
+    ndim = max(_ndim(a) for a in arrays)
+    if axis is None:
+        vals = [trace.lib.reshape(trace.broadcast(a), (trace.size, -1)) for a in arrays]
+        return trace.wrap(trace.lib.concatenate(vals, axis=1))
+    vals = [trace.broadcast(a) for a in arrays]
+    return trace.wrap(trace.lib.concatenate(vals, axis=_shift(axis, ndim)))
+
+
+def _stack(trace, fn, args, kwargs):
+    kwargs = dict(kwargs)
+    arrays = list(args[0])
+    axis, _ = _pop_arg(args[1:], kwargs, 0, "axis", 0)
+    ndim = max(_ndim(a) for a in arrays) + 1
+    vals = [trace.broadcast(a) for a in arrays]
+    return trace.wrap(trace.lib.stack(vals, axis=_shift(axis, ndim)))
+
+
+# ================================================================
+# Linear algebra
+# ================================================================
+
+def _matmul(trace, fn, args, kwargs):
+    if kwargs.get("out") is not None:
+        raise NotImplementedError("vmap: `out=` is not supported for batched values")
+    a, bb = args
+    lib = trace.lib
+    own_a, own_b = trace.is_own(a), trace.is_own(bb)
+
+    # Batched 1-D operands become explicit row / column matrices.
+    squeeze = []
+    va = a.val if own_a else a
+    vb = bb.val if own_b else bb
+    nda, ndb = _ndim(a), _ndim(bb)
+    if own_a and nda == 1:
+        va = lib.expand_dims(va, -2)
+        nda = 2
+        squeeze.append(-2)
+    if own_b and ndb == 1:
+        vb = lib.expand_dims(vb, -1)
+        ndb = 2
+        squeeze.append(-1)
+
+    # Line up the stacking dims of both operands behind the batch axis.
+    ndim = max(nda, ndb)
+    if own_a and nda < ndim:
+        va = lib.reshape(va, (trace.size,) + (1,) * (ndim - nda) + tuple(va.shape[1:]))
+    if own_b and ndb < ndim:
+        vb = lib.reshape(vb, (trace.size,) + (1,) * (ndim - ndb) + tuple(vb.shape[1:]))
+
+    out = fn(va, vb, **kwargs)
+    if squeeze:
+        out = lib.squeeze(out, axis=tuple(squeeze) if len(squeeze) > 1 else squeeze[0])
+    return trace.wrap(out)
+
+
+# ================================================================
+# Registry
+# ================================================================
+
+_reduce = _reduction(False)
+_flat = _reduction(True)
+
+RULES = {
+    # broadcasting array functions
+    "where": elementwise,
+    "clip": elementwise,
+    "ones_like": elementwise,
+    "zeros_like": elementwise,
+    "empty_like": elementwise,
+    "full_like": elementwise,
+    "astype": elementwise,
+    # reductions
+    "sum": _reduce,
+    "mean": _reduce,
+    "max": _reduce,
+    "min": _reduce,
+    "amax": _reduce,
+    "amin": _reduce,
+    "prod": _reduce,
+    "any": _reduce,
+    "all": _reduce,
+    "std": _reduce,
+    "var": _reduce,
+    "count_nonzero": _reduce,
+    "flip": _reduce,
+    "argmax": _flat,
+    "argmin": _flat,
+    "cumsum": _flat,
+    "cumprod": _flat,
+    "sort": _flat,
+    "argsort": _flat,
+    "reduce": _ufunc_method,
+    "accumulate": _ufunc_method,
+    # shapes
+    "reshape": _reshape,
+    "ravel": _ravel,
+    "transpose": _transpose,
+    "swapaxes": _swapaxes,
+    "moveaxis": _moveaxis,
+    "expand_dims": _expand_dims,
+    "squeeze": _squeeze,
+    "broadcast_to": _broadcast_to,
+    "getitem": _getitem,
+    "asarray": _asarray,
+    "array": _asarray,
+    "ascontiguousarray": _asarray,
+    "copy": _copy,
+    "concatenate": _concatenate,
+    "stack": _stack,
+    # linear algebra
+    "matmul": _matmul,
+}
@@ -0,0 +1,85 @@
+"""
+Applying batching rules while a `vmap` is active.
+
+Like a `jit` trace, a `BatchTrace` swaps the backend returned by `xp()` for a
+proxy, so every backend call made by a primitive (or by its `grad_fn`) comes
+through `BatchTrace.call`. Calls without a batched argument run unchanged;
+calls with one are dispatched by function name to a rule in `vmap.rules`
+that evaluates the batched equivalent once for the whole batch.
+
+Rules call back into `self.lib` — the backend that was active when the
+`vmap` started — so batching composes with an enclosing `jit` trace or
+another `vmap`.
+"""
+
+from contextlib import contextmanager
+
+from ...backend import backend as b
+from ..jit.trace import _TracingBackend, _unwrap
+from ..jit.utils import name, tree_map, tree_any
+from .tracer import BatchTracer
+
+
+class BatchTrace:
+    def __init__(self, lib, size):
+        self.lib = lib
+        self.size = size
+
+    # -------------------------
+    # Values
+    # -------------------------
+    def is_own(self, x):
+        return isinstance(x, BatchTracer) and x._trace is self
+
+    def wrap(self, val):
+        """Wrap a batched result (or a tuple of them)."""
+        if isinstance(val, tuple):
+            return tuple(self.wrap(v) for v in val)
+        if not hasattr(val, "shape"):
+            return val
+        return BatchTracer(val, self)
+
+    def lift(self, x, ndim):
+        """Batched value of `x` with ones inserted to reach `ndim` example dims."""
+        v = x.val
+        pad = ndim - x.ndim
+        if pad <= 0:
+            return v
+        return self.lib.reshape(v, (v.shape[0],) + (1,) * pad + tuple(v.shape[1:]))
+
+    def broadcast(self, x):
+        """Batched value for `x`, which may be unbatched."""
+        if self.is_own(x):
+            return x.val
+        x = self.lib.asarray(x)
+        return self.lib.broadcast_to(x, (self.size,) + tuple(x.shape))
+
+    # -------------------------
+    # Dispatch
+    # -------------------------
+    def call(self, fn, args, kwargs):
+        from .rules import RULES, elementwise, loop
+
+        args = tree_map(_unwrap, args)
+        kwargs = tree_map(_unwrap, kwargs)
+        if not (tree_any(self.is_own, args) or tree_any(self.is_own, kwargs)):
+            return fn(*args, **kwargs)
+
+        rule = RULES.get(name(fn))
+        if rule is None:
+            is_ufunc = hasattr(fn, "nin") and getattr(fn, "signature", None) is None
+            rule = elementwise if is_ufunc else loop
+        return rule(self, fn, args, kwargs)
+
+    # -------------------------
+    # Activation
+    # -------------------------
+    @contextmanager
+    def active(self):
+        """Route `xp()` through this trace for the duration of the block."""
+        prev = b._xp
+        b._xp = _TracingBackend(self.lib, self)
+        try:
+            yield self
+        finally:
+            b._xp = prev
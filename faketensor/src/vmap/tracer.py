@@ -0,0 +1,60 @@
+"""
+Batched values flowing through a `vmap`.
+
+A `BatchTracer` wraps a backend array whose axis 0 is the batch axis and
+presents the *per-example* view of it: `shape`, `ndim`, `size` and `len`
+describe one example, so primitives and their `grad_fn`s run unchanged.
+
+It reuses the `FT_Tracer` machinery from `jit`: operators, methods and the
+NumPy protocols all route into `self._trace.call`, which here is the
+`BatchTrace` applying batching rules instead of recording a graph.
+"""
+
+from ..jit.placeholder import FT_Tracer, TracerError
+
+
+class BatchTracer(FT_Tracer):
+    __slots__ = ()
+
+    def __init__(self, val, trace):
+        super().__init__(val, None, trace)
+
+    # -------------------------
+    # Per-example metadata
+    # -------------------------
+    @property
+    def shape(self):
+        return self.val.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.val.ndim - 1
+
+    @property
+    def size(self):
+        n = 1
+        for d in self.shape:
+            n *= d
+        return n
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"BatchTracer(shape={self.shape}, dtype={self.dtype}, batch={self.val.shape[0]})"
+
+    # -------------------------
+    # Concretization (forbidden)
+    # -------------------------
+    def _concrete(self, *args, **kwargs):
+        raise TracerError(
+            f"{self!r} holds a different value per example inside `vmap`; "
+            "keep the computation in array ops."
+        )
+
+    __array__ = __bool__ = __float__ = __int__ = __index__ = __complex__ = _concrete
+
+    def __setitem__(self, key, value):
+        raise TracerError("In-place updates of batched arrays are not supported inside `vmap`.")
@@ -0,0 +1,137 @@
+"""
+`vmap`: vectorize a per-example function over a batch axis.
+
+    per_example_grads = vmap(grad(loss), in_axes=(None, 0, 0))(model, xs, ys)
+
+The function runs once, on `BatchTracer`s holding the whole batch. Every
+backend call made by the primitives — and by their `grad_fn`s during the
+backward pass — is rewritten into its batched equivalent (`vmap.rules`), so
+`vmap(grad(f))` builds a single tape for the whole batch instead of one per
+example.
+"""
+
+import functools
+
+from ...backend import backend as b
+from ..tree_util import flatten_pytree, unflatten_pytree
+from .trace import BatchTrace
+
+
+def _is_array(x, lib):
+    from ..array import NDarray
+    return isinstance(x, (NDarray, lib.ndarray))
+
+
+def _broadcast_axes(axes, n, what):
+    if isinstance(axes, (tuple, list)):
+        if len(axes) != n:
+            raise ValueError(f"vmap: {what} has {len(axes)} entries for {n} values")
+        return tuple(axes)
+    return (axes,) * n
+
+
+def vmap(fun, in_axes=0, out_axes=0):
+    """
+    Vectorize `fun` over a batch axis of its arguments.
+
+    This matches:
+        • JAX:  jax.vmap
+        • PyTorch: torch.func.vmap
+
+    Args:
+        fun: A function of single examples built from FakeTensor primitives
+            (it may itself be a `grad` / `value_and_grad` / `jvp` transform).
+        in_axes: Batch axis of every argument — an int, None (argument is
+            shared by all examples, e.g. a `Cell`), or a tuple with one such
+            entry per positional argument. The axis applies to every array
+            leaf of that argument.
+        out_axes: Where to put the batch axis in the outputs — an int, or a
+            tuple with one entry per element of a tuple output. Outputs
+            that do not depend on a batched input are broadcast.
+
+    Returns:
+        A callable with the signature of `fun` that processes the batch in
+        one vectorized pass.
+
+    Example:
+        ```python
+        loss = lambda w, x, y: ft.sum((x @ w - y) ** 2)
+        g = ft.vmap(ft.grad(loss), in_axes=(None, 0, 0))(w, xs, ys)
+        ```
+    """
+    @functools.wraps(fun)
+    def wrapped(*args):
+        from ..array import NDarray
+        lib = b.xp()
+        axes = _broadcast_axes(in_axes, len(args), "in_axes")
+
+        # ---- batch size ----
+        size = None
+        for a, ax in zip(args, axes):
+            if ax is None:
+                continue
+            for leaf in flatten_pytree(a)[0]:
+                if _is_array(leaf, lib):
+                    n = leaf.shape[ax]
+                    if size is not None and n != size:
+                        raise ValueError(
+                            f"vmap: inconsistent batch sizes {size} and {n} along in_axes"
+                        )
+                    size = n
+        if size is None:
+            raise ValueError("vmap: no argument is batched (all in_axes are None)")
+
+        trace = BatchTrace(lib, size)
+
+        # ---- batched arguments ----
+        call_args = []
+        for a, ax in zip(args, axes):
+            if ax is None:
+                call_args.append(a)
+                continue
+            leaves, treedef = flatten_pytree(a)
+            new_leaves = []
+            for leaf in leaves:
+                if isinstance(leaf, NDarray):
+                    t = NDarray(trace.wrap(lib.moveaxis(leaf.np, ax, 0)))
+                    t.train = leaf.train
+                    new_leaves.append(t)
+                elif isinstance(leaf, lib.ndarray):
+                    new_leaves.append(trace.wrap(lib.moveaxis(leaf, ax, 0)))
+                else:
+                    new_leaves.append(leaf)
+            call_args.append(unflatten_pytree(new_leaves, treedef))
+
+        with trace.active():
+            out = fun(*call_args)
+
+        # ---- unbatched outputs ----
+        top = out if isinstance(out, tuple) else (out,)
+        o_axes = _broadcast_axes(out_axes, len(top), "out_axes")
+        results = []
+        for o, ax in zip(top, o_axes):
+            leaves, treedef = flatten_pytree(o)
+            new_leaves = []
+            for leaf in leaves:
+                nd = isinstance(leaf, NDarray)
+                v = leaf.np if nd else leaf
+                if trace.is_own(v):
+                    v = v.val
+                elif _is_array(v, lib) or isinstance(v, (int, float)):
+                    if ax is None:
+                        new_leaves.append(leaf)
+                        continue
+                    v = lib.asarray(v)
+                    v = lib.broadcast_to(v, (size,) + v.shape).copy()
+                else:
+                    new_leaves.append(leaf)
+                    continue
+                if ax is None:
+                    raise ValueError("vmap: out_axes=None for an output that depends on the batch")
+                v = lib.moveaxis(v, 0, ax)
+                new_leaves.append(NDarray(v) if nd else v)
+            results.append(unflatten_pytree(new_leaves, treedef))
+
+        return tuple(results) if isinstance(out, tuple) else results[0]
+
+    return wrapped
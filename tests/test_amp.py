@@ -0,0 +1,50 @@
+import numpy as np
+
+import faketensor as ft
+
+
+def test_scaled_loss_overflowing_float16_backs_off_the_scale():
+    w = ft.Variable(np.array([1.0, 2.0], dtype="float32"))
+    scaler = ft.LossScaler()                  # 2**15
+    step = ft.value_and_grad(scaler.scaled(lambda w: ft.sum(w * w) + 0.0))
+
+    # 5 * 2**15 is past float16's max (65504); scaling must not overflow.
+    with ft.autocast():
+        scaled, grads = step(w)
+    assert str(scaled.dtype) == "float32"
+    assert np.isfinite(scaled)
+    assert float(scaled) / scaler.scale == 5.0
+
+    grads = scaler.unscale(grads)
+    assert scaler.found_inf
+    scaler.update()
+    assert scaler.scale == 2.0 ** 14
+
+
+def test_autocast_and_strict_mode_exit_in_any_order():
+    x = ft.Variable(np.ones(2, dtype="float32"))
+    try:
+        with ft.autocast():
+            ft.set_default_dtype(strict=True)
+        # Strict mode outlives the autocast block.
+        try:
+            x + np.ones(2, dtype="float64")
+        except ft.DTypePromotionError:
+            pass
+        else:
+            raise AssertionError("strict mode was dropped")
+    finally:
+        ft.set_default_dtype(strict=False)
+    assert str((x + x).dtype) == "float32"
+
+
+def test_autocast_leaves_float64_alone():
+    x64 = ft.Variable(np.ones((2, 2), dtype="float64"))
+    x32 = ft.Variable(np.ones((2, 2), dtype="float32"))
+    with ft.autocast():
+        assert str((x64 @ x64).dtype) == "float64"
+        assert str(ft.sum(x64 * x64).dtype) == "float64"
+        assert str((x32 @ x32).dtype) == "float16"
+        assert str(ft.sum(x32 @ x32).dtype) == "float32"
+        g = ft.grad(lambda w: ft.sum(w @ w))(x64)
+    assert str(g.dtype) == "float64"
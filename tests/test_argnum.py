@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src.array import NDarray
+
+
+def _args():
+    rng = np.random.default_rng(0)
+    return (
+        ft.Variable(rng.normal(size=(3, 4))),
+        ft.Variable(rng.normal(size=(4,))),
+        ft.Variable(rng.normal(size=(2, 3))),
+    )
+
+
+def _f(x, y, z):
+    return ft.sum((x * y) ** 2.0) + ft.sum(ft.log(ft.abs(z) + 1.0))
+
+
+def _expected(x, y, z):
+    x, y, z = x.np, y.np, z.np
+    return (
+        2.0 * x * y * y,
+        (2.0 * x * x * y).sum(axis=0),
+        np.sign(z) / (np.abs(z) + 1.0),
+    )
+
+
+def test_default_argnum_differentiates_every_argument():
+    args = _args()
+    grads = ft.grad(_f)(*args)
+    assert isinstance(grads, list) and len(grads) == 3
+    for g, e, a in zip(grads, _expected(*args), args):
+        assert isinstance(g, NDarray) and g.shape == a.shape
+        np.testing.assert_allclose(g.np, e)
+
+
+@pytest.mark.parametrize("argnum", [0, 1, 2, -1])
+def test_int_argnum_returns_one_grad(argnum):
+    args = _args()
+    g = ft.grad(_f, argnum=argnum)(*args)
+    assert isinstance(g, NDarray) and g.shape == args[argnum].shape
+    np.testing.assert_allclose(g.np, _expected(*args)[argnum])
+
+
+@pytest.mark.parametrize("argnum", [(0,), (2, 0), [1, 2], (-1, 1)])
+def test_tuple_argnum_returns_grads_in_that_order(argnum):
+    args = _args()
+    value, grads = ft.value_and_grad(_f, argnum=argnum)(*args)
+    np.testing.assert_allclose(value.np, _f(*args).np)
+    assert isinstance(grads, tuple) and len(grads) == len(argnum)
+    for g, i in zip(grads, argnum):
+        assert g.shape == args[i].shape
+        np.testing.assert_allclose(g.np, _expected(*args)[i])
+
+
+def test_pytree_argument_keeps_its_structure():
+    x, y, z = _args()
+    f = lambda p, z: _f(p["x"], p["y"][0], z)
+    g = ft.grad(f, argnum=0)({"x": x, "y": [y]}, z)
+    e = _expected(x, y, z)
+    assert set(g) == {"x", "y"} and isinstance(g["y"], list)
+    np.testing.assert_allclose(g["x"].np, e[0])
+    np.testing.assert_allclose(g["y"][0].np, e[1])
+
+
+@pytest.mark.parametrize("argnum", [3, -4, (0, 5)])
+def test_out_of_range_argnum_raises(argnum):
+    with pytest.raises(ValueError, match="argnum"):
+        ft.grad(_f, argnum=argnum)(*_args())
+
+
+def _backward_ops(argnum):
+    """(recorded ops, grad rules run) for `grad(_f, argnum)`."""
+    with ft.memory_stats() as stats, ft.profile() as prof:
+        ft.grad(_f, argnum=argnum)(*_args())
+    p = stats.passes[-1]
+    rules = {e.name[len("grad:"):] for e in prof.events if e.name.startswith("grad:")}
+    return p["nodes_by_op"], p["live_nodes"], rules
+
+
+def test_branches_not_selected_by_argnum_are_pruned():
+    ops, live, rules = _backward_ops(None)
+    assert {"multiply", "power", "abs", "log"} <= set(ops) and {"multiply", "log"} <= rules
+
+    # the z branch: neither recorded nor differentiated for argnum=0 ...
+    ops0, live0, rules0 = _backward_ops(0)
+    assert not {"abs", "log"} & (set(ops0) | rules0)
+    # ... and the x * y branch likewise for argnum=2
+    ops2, live2, rules2 = _backward_ops(2)
+    assert not {"multiply", "power"} & (set(ops2) | rules2)
+    assert live0 < live and live2 < live
+
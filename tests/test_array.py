@@ -0,0 +1,62 @@
+import weakref
+
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src.array import NDarray, _new_nd, as_nd
+
+
+def _slot_values(x):
+    return {
+        name: getattr(x, name)
+        for cls in type(x).__mro__
+        for name in getattr(cls, "__slots__", ())
+        if name != "__weakref__" and hasattr(x, name)
+    }
+
+
+@pytest.mark.parametrize("make", [
+    lambda: NDarray(np.ones(3)),
+    lambda: _new_nd(np.ones(3)),
+    lambda: ft.Variable(np.ones(3), name="w"),
+])
+def test_instances_have_no_dict(make):
+    x = make()
+    assert not hasattr(x, "__dict__")
+    with pytest.raises(AttributeError):
+        x.something_else = 1
+    # weak references still work (tape and tangent tables rely on them)
+    assert weakref.ref(x)() is x
+
+
+@pytest.mark.parametrize("arr", [
+    np.arange(6.0).reshape(2, 3),
+    np.arange(4, dtype="int32"),
+    np.array(2.5, dtype="float32"),
+    np.ones((3, 4))[:, 1],
+])
+def test_new_nd_matches_the_public_constructor(arr):
+    fast, public = _new_nd(arr), NDarray(arr)
+    assert type(fast) is type(public) is NDarray
+    assert _slot_values(fast).keys() == _slot_values(public).keys()
+    assert fast.train == public.train
+    assert fast.np is public.np is arr
+    assert fast.shape == public.shape and fast.np.dtype == public.np.dtype
+    np.testing.assert_array_equal((fast * 2.0).np, (public * 2.0).np)
+
+
+def test_as_nd_shares_the_buffer():
+    arr = np.ones(3)
+    assert as_nd(arr).np is arr
+    x = NDarray(arr)
+    assert as_nd(x).np is arr
+
+
+def test_variable_keeps_its_slots():
+    w = ft.Variable(np.ones(2), name="w")
+    assert (w.name, w.train) == ("w", True)
+    w.train = False
+    assert w.train is False
+    assert "name" in type(w).__slots__ and "np" in NDarray.__slots__
+
@@ -0,0 +1,42 @@
+import numpy as np
+
+import faketensor as ft
+from faketensor.src.array import NDarray, as_nd
+
+
+def _recorded_nodes(f, x):
+    with ft.memory_stats() as stats:
+        ft.value_and_grad(f)(ft.Variable(x))
+    return stats.passes[-1]["nodes"]
+
+
+def test_ops_on_constants_are_not_recorded_after_meeting_a_tracked_value():
+    c = as_nd(np.ones(3, dtype="float32"))
+    x = np.arange(3, dtype="float32")
+
+    def before(x):
+        z = ((c + 1.0) * 2.0 - 3.0) * c
+        return ft.sum(x * c * z)
+
+    def after(x):
+        y = x * c
+        z = ((c + 1.0) * 2.0 - 3.0) * c
+        return ft.sum(y * z)
+
+    assert _recorded_nodes(before, x) == _recorded_nodes(after, x) == 3
+
+
+def test_nested_grad_without_create_graph():
+    x = ft.Variable(np.array([1.0, 2.0, 3.0]))
+    f = lambda x: ft.sum(x * x * x)
+    d2 = ft.grad(lambda x: ft.sum(ft.grad(f)(x)))(x)
+    np.testing.assert_allclose(d2.np, 6.0 * x.np)
+
+
+def test_grads_are_ndarrays():
+    x = ft.Variable(np.array([1.0, 2.0]))
+    w = ft.Variable(np.array([3.0, 4.0]))
+    f = lambda x, w: ft.sum(x * x)
+    for create_graph in (False, True):
+        gx, gw = ft.grad(f, create_graph=create_graph)(x, w)
+        assert isinstance(gx, NDarray) and isinstance(gw, NDarray)
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32", "float64"])
+def test_log_of_zero_stays_finite(dtype):
+    f = lambda x: ft.sum(ft.log(x))
+    x = np.array([0.0, 1.0], dtype=dtype)
+    value, grad = ft.value_and_grad(f)(ft.Variable(x))
+    assert str(grad.dtype) == dtype
+    assert np.isfinite(float(getattr(value, "np", value)))
+    assert np.isfinite(grad.np).all()
+    with ft.lazy():
+        lazy_value, _ = ft.value_and_grad(f)(ft.Variable(x.copy()))
+    assert float(getattr(lazy_value, "np", lazy_value)) == float(getattr(value, "np", value))
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src.array import NDarray
+
+
+_B = np.random.default_rng(1).uniform(0.5, 1.5, size=(4,))
+
+# scalar and non-scalar functions of a (3, 4) input: elementwise,
+# broadcasting against a (4,) constant, reductions and matmul
+_FUNCS = {
+    "log_pow": lambda x: ft.sum(ft.log(x) * x ** 3.0),
+    "broadcast": lambda x: ft.sum(ft.log(x * _B + 1.0) / (x + _B)),
+    "mean_axis": lambda x: ft.mean(x * x, axis=0) ** 2.0,
+    "max_axis": lambda x: ft.max(x * x * x, axis=1, keepdims=True),
+    "matmul": lambda x: (x @ ft.transpose(x)) ** 2.0,
+}
+
+
+def _raw(x):
+    return getattr(x, "np", x)
+
+
+def _point():
+    rng = np.random.default_rng(0)
+    return rng.uniform(0.5, 1.5, size=(3, 4)), rng.normal(size=(3, 4))
+
+
+def _central(f, x, v, eps=1e-6):
+    return (_raw(f(x + eps * v)) - _raw(f(x - eps * v))) / (2 * eps)
+
+
+@pytest.mark.parametrize("name", sorted(_FUNCS))
+def test_jvp_matches_finite_differences(name):
+    f = _FUNCS[name]
+    x, v = _point()
+    out, t = ft.jvp(f, (x,), (v,))
+    assert isinstance(t, NDarray) and t.shape == out.shape
+    np.testing.assert_allclose(out.np, _raw(f(x)))
+    np.testing.assert_allclose(t.np, _central(f, x, v), rtol=1e-6, atol=1e-8)
+
+
+def test_jvp_of_two_arguments_with_broadcasting():
+    rng = np.random.default_rng(2)
+    x, tx = rng.uniform(0.5, 1.5, size=(3, 4)), rng.normal(size=(3, 4))
+    y, ty = rng.uniform(0.5, 1.5, size=(4,)), rng.normal(size=(4,))
+    f = lambda x, y: ft.sum(x / y + ft.log(x * y), axis=1)
+
+    _, t = ft.jvp(f, (x, y), (tx, ty))
+    eps = 1e-6
+    fd = (f(x + eps * tx, y + eps * ty).np - f(x - eps * tx, y - eps * ty).np) / (2 * eps)
+    np.testing.assert_allclose(t.np, fd, rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("name", ["log_pow", "broadcast"])
+def test_jvp_of_grad_matches_grad_of_grad(name):
+    f = _FUNCS[name]
+    x, v = _point()
+    x = ft.Variable(x)
+    _, t = ft.jvp(ft.grad(f), (x,), (v,))
+    expected = ft.grad(lambda x: ft.sum(ft.grad(f)(x) * v))(x)
+    assert isinstance(t, NDarray)
+    np.testing.assert_allclose(t.np, expected.np, rtol=1e-10)
+
+
+def test_tangent_of_an_output_that_ignores_the_inputs_is_zero():
+    x, v = _point()
+    out, (t_dep, t_const) = ft.jvp(lambda x: (ft.sum(x), ft.sum(ft.log(_B))), (x,), (v,))
+    np.testing.assert_allclose(t_dep.np, v.sum())
+    assert t_const.np == 0.0
+
+
+_SCALAR = ["log_pow", "broadcast", "mean_axis", "max_axis", "matmul"]
+
+
+def _scalar(name):
+    f = _FUNCS[name]
+    return lambda x: ft.sum(f(x))
+
+
+def _grad_fd(f, x, v, eps=1e-6):
+    g = ft.grad(f)
+    return (g(ft.Variable(x + eps * v)).np - g(ft.Variable(x - eps * v)).np) / (2 * eps)
+
+
+@pytest.mark.parametrize("name", _SCALAR)
+def test_hvp_matches_grad_of_grad_and_finite_differences(name):
+    f = _scalar(name)
+    x, v = _point()
+    hv = ft.hvp(f, ft.Variable(x), v)
+    assert isinstance(hv, NDarray) and hv.shape == x.shape
+
+    expected = ft.grad(lambda x: ft.sum(ft.grad(f)(x) * v))(ft.Variable(x))
+    np.testing.assert_allclose(hv.np, expected.np, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(hv.np, _grad_fd(f, x, v), rtol=1e-5, atol=1e-6)
+
+
+def _diag_fd(f, x):
+    basis = np.eye(x.size).reshape((x.size,) + x.shape)
+    return np.array([_grad_fd(f, x, e).ravel()[i] for i, e in enumerate(basis)]).reshape(x.shape)
+
+
+@pytest.mark.parametrize("name", _SCALAR)
+@pytest.mark.parametrize("batch_size", [64, 5])
+def test_hessian_diag_matches_finite_differences(name, batch_size):
+    f = _scalar(name)
+    x, _ = _point()
+    d = ft.hessian_diag(f, ft.Variable(x), batch_size=batch_size)
+    assert isinstance(d, NDarray) and d.shape == x.shape
+    np.testing.assert_allclose(d.np, _diag_fd(f, x), rtol=1e-5, atol=1e-6)
+
+
+def test_hutchinson_estimate_is_exact_for_a_diagonal_hessian():
+    f = _scalar("log_pow")
+    x, _ = _point()
+    x = ft.Variable(x)
+    exact = ft.hessian_diag(f, x)
+    # v * (H @ v) == diag(H) for every Rademacher v when H is diagonal
+    est = ft.hessian_diag(f, x, num_samples=3, batch_size=2, seed=0)
+    np.testing.assert_allclose(est.np, exact.np, rtol=1e-10)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src.array import NDarray
+
+
+def _numerical_grad(f, args, i, eps=1e-6):
+    """Central differences of scalar `f(*args)` w.r.t. `args[i]`."""
+    x = args[i]
+    g = np.zeros_like(x)
+    for j in np.ndindex(x.shape):
+        hi, lo = x.copy(), x.copy()
+        hi[j] += eps
+        lo[j] -= eps
+        f_hi = f(*args[:i], hi, *args[i + 1:]).np
+        f_lo = f(*args[:i], lo, *args[i + 1:]).np
+        g[j] = (f_hi - f_lo) / (2 * eps)
+    return g
+
+
+def _check(f, *args):
+    grads = ft.grad(f, argnum=tuple(range(len(args))))(*map(ft.Variable, args))
+    for i, g in enumerate(grads):
+        assert isinstance(g, NDarray) and g.shape == args[i].shape
+        np.testing.assert_allclose(g.np, _numerical_grad(f, args, i), rtol=1e-6, atol=1e-8)
+
+
+def _x(shape=(4, 5)):
+    return np.random.default_rng(0).normal(size=shape)
+
+
+def _loss(y):
+    return ft.sum(y ** 3.0)
+
+
+_REPEAT = np.array([1, -1, 1, 0, -4, 1])
+
+_GETITEM = {
+    "int": -1,
+    "slice": (slice(1, None, 2), slice(None, -1)),
+    "negative_slice": (slice(None, None, -1), -2),
+    "repeated_rows": _REPEAT,
+    "repeated_pairs": (np.array([0, -1, 0, 0]), np.array([-1, 2, -1, -1])),
+    "mixed": (slice(1, 3), _REPEAT[:3]),
+    "ellipsis_newaxis": (Ellipsis, None, np.array([4, -5])),
+    "bool_mask": np.array([True, False, True, True]),
+}
+
+
+@pytest.mark.parametrize("name", sorted(_GETITEM))
+def test_getitem_grad_matches_numerical(name):
+    key = _GETITEM[name]
+    _check(lambda x: _loss(x[key]), _x())
+    _check(lambda x: _loss(ft.getitem(x, key)), _x())
+
+
+@pytest.mark.parametrize("axis", [None, 0, 1, -1])
+def test_take_grad_with_repeated_and_negative_indices(axis):
+    _check(lambda x: _loss(ft.take(x, _REPEAT[:4], axis=axis)), _x())
+
+
+@pytest.mark.parametrize("axis", [0, 1, -2])
+def test_gather_grad_with_repeated_indices(axis):
+    idx = np.random.default_rng(1).integers(-4, 4, size=(6, 5) if axis in (0, -2) else (4, 7))
+    _check(lambda x: _loss(ft.gather(x, idx, axis)), _x())
+
+
+def test_scatter_accumulates_repeated_indices():
+    updates = np.arange(6.0)
+    out = ft.scatter(updates, _REPEAT, (5,))
+    expected = np.zeros(5)
+    np.add.at(expected, _REPEAT, updates)
+    np.testing.assert_allclose(out.np, expected)
+    _check(lambda u: _loss(ft.scatter(u, _REPEAT, (5,)) + 1.0), updates)
+
+
+@pytest.mark.parametrize("axis", [0, 1, -1])
+def test_scatter_add_with_repeated_indices(axis):
+    x = _x()
+    shape = (7, 5) if axis == 0 else (4, 6)
+    rng = np.random.default_rng(2)
+    idx = rng.integers(-x.shape[axis], x.shape[axis], size=shape)
+    lanes = np.moveaxis(idx, axis, 0)
+    lanes[1:3] = lanes[0]                 # collisions in every lane
+    updates = rng.normal(size=shape)
+
+    out = ft.scatter_add(x, updates, idx, axis)
+    expected = x.copy()
+    for j in np.ndindex(idx.shape):
+        k = list(j)
+        k[axis] = idx[j]
+        expected[tuple(k)] += updates[j]
+    np.testing.assert_allclose(out.np, expected)
+
+    _check(lambda x, u: _loss(ft.scatter_add(x, u, idx, axis)), x, updates)
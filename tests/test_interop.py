@@ -0,0 +1,50 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import faketensor as ft
+
+
+def test_out_write_to_a_saved_value_raises_in_backward():
+    def f(x):
+        c = x * 1.0
+        y = c * c
+        np.add(c, 1.0, out=c)
+        return ft.sum(y)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with pytest.raises(RuntimeError, match="modified in place"):
+            ft.grad(f)(ft.Variable(np.array([1.0])))
+
+
+def test_fallback_warning_states_the_reason():
+    def f(x):
+        np.add(x, 1.0, dtype="float64")
+        np.sin(x)
+        return ft.sum(x)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        ft.grad(f)(ft.Variable(np.array([1.0])))
+    messages = [str(w.message) for w in caught]
+    assert "'add' was called with dtype=, which the primitive does not support" in messages[0]
+    assert "'sin' has no faketensor primitive" in messages[1]
+
+
+def test_array_protocol_copy_semantics():
+    x = ft.Variable(np.arange(3.0))
+    assert x.__array__() is x.np
+    assert x.__array__(copy=False) is x.np
+    assert x.__array__(np.float64, copy=False) is x.np
+
+    copied = x.__array__(copy=True)
+    assert copied is not x.np and (copied == x.np).all()
+
+    converted = x.__array__(np.float32)
+    assert converted.dtype == np.float32 and (converted == x.np).all()
+    with pytest.raises(ValueError, match="copy=False"):
+        x.__array__(np.float32, copy=False)
+    with pytest.raises(ValueError, match="copy=False"):
+        np.array(x, dtype=np.float32, copy=False)
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+
+
+def _replay(f, *args):
+    f(*args)                # trace
+    return f(*args)         # replay
+
+
+def test_simplified_output_does_not_alias_the_input():
+    x = ft.Variable(np.ones(3))
+    y = _replay(ft.jit(lambda x: x * 1.0), x)
+    y += 5.0
+    np.testing.assert_array_equal(x.np, np.ones(3))
+
+
+def test_constant_output_is_a_new_array_on_every_call():
+    x = ft.Variable(np.ones(3))
+    g = ft.jit(ft.grad(lambda x: ft.sum(x * 2.0)))
+    b = _replay(g, x)
+    b += 1.0
+    np.testing.assert_array_equal(g(x).np, np.full(3, 2.0))
+
+
+def test_repeated_outputs_are_distinct_arrays():
+    x = ft.Variable(np.ones(3))
+    a, b = _replay(ft.jit(lambda x: (x * 2.0, x * 2.0)), x)
+    a += 1.0
+    np.testing.assert_array_equal(b.np, np.full(3, 2.0))
+
+
+def _f(x, y):
+    return ft.sum(ft.log(x * y + 1.0) * x - y, axis=0)
+
+
+def _inputs(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return ft.Variable(rng.uniform(0.5, 1.5, shape)), ft.Variable(rng.uniform(0.5, 1.5, shape))
+
+
+def test_replay_matches_eager_and_reuses_the_trace():
+    f = ft.jit(_f)
+    for seed in range(3):
+        x, y = _inputs((5, 3), seed)
+        np.testing.assert_allclose(f(x, y).np, _f(x, y).np)
+    assert len(f._cache) == 1
+
+
+def test_changed_shape_retraces():
+    f = ft.jit(_f)
+    for shape in [(5, 3), (2, 7), (5, 3)]:
+        x, y = _inputs(shape)
+        np.testing.assert_allclose(f(x, y).np, _f(x, y).np)
+    assert len(f._cache) == 2
+
+
+def test_replay_sees_in_place_parameter_updates():
+    f = ft.jit(_f)
+    x, y = _inputs((4, 4))
+    f(x, y)
+    x[...] = 2.0
+    np.testing.assert_allclose(f(x, y).np, _f(x, y).np)
+
+
+def test_jit_of_value_and_grad_matches_eager():
+    step = ft.value_and_grad(lambda x, y: ft.sum(_f(x, y)))
+    f = ft.jit(step)
+    x, y = _inputs((6, 2))
+    for _ in range(2):
+        value, grads = f(x, y)
+        e_value, e_grads = step(x, y)
+        np.testing.assert_allclose(value.np, e_value.np)
+        for g, e in zip(grads, e_grads):
+            np.testing.assert_allclose(g.np, e.np)
+
+
+def _chain(x, w):
+    a = x * 2.0 + 1.0
+    b = ft.transpose(a) @ w         # a view of `a` read after more ops
+    c = (b - 3.0) * (b + 3.0)
+    d = ft.log(c * c + 1.0) * 0.5
+    return d + ft.sum(a, axis=0), ft.reshape(d, (-1,))
+
+
+def test_arena_reuse_keeps_live_values_intact():
+    rng = np.random.default_rng(0)
+    x = ft.Variable(rng.uniform(0.5, 1.5, (6, 4)))
+    w = ft.Variable(rng.uniform(0.5, 1.5, (6, 4)))
+    f = ft.jit(_chain, fuse=False)
+    memory = f.report(x, w)["memory"]
+    assert memory["planned_ops"] > memory["buffers"] > 0
+
+    expected = [e.np for e in _chain(x, w)]
+    first = [o.np.copy() for o in f(x, w)]
+    kept = f(x, w)
+    for _ in range(3):                  # later replays reuse the arena
+        again = f(x, w)
+    for out, e, k, a in zip(first, expected, kept, again):
+        np.testing.assert_allclose(out, e)
+        np.testing.assert_allclose(k.np, e)     # not overwritten by later calls
+        np.testing.assert_allclose(a.np, e)
+
+
+def _elementwise(x, row, col):
+    return ft.abs(ft.log(x * row + col) - x / (row + 2.0)) * col
+
+
+@pytest.mark.parametrize("shape", [(257, 263), (3 * (1 << 15) + 7,)])
+def test_fused_kernels_on_broadcast_and_odd_sizes(shape):
+    rng = np.random.default_rng(0)
+    x = ft.Variable(rng.uniform(0.5, 1.5, shape))
+    row = ft.Variable(rng.uniform(0.5, 1.5, shape[-1:]))
+    col = ft.Variable(rng.uniform(0.5, 1.5, shape[:-1] + (1,)))
+    f = ft.jit(_elementwise)
+    assert f.report(x, row, col)["fusion"]["kernels"] >= 1
+    expected = _elementwise(x, row, col).np
+    for _ in range(2):
+        np.testing.assert_allclose(f(x, row, col).np, expected, rtol=1e-12)
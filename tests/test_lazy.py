@@ -0,0 +1,98 @@
+import weakref
+from contextlib import nullcontext
+
+import numpy as np
+
+import faketensor as ft
+from faketensor.src.lazy import runtime
+
+
+X = np.array([-2.0, 0.5, 0.0, 3.0], dtype="float32")
+
+
+def _eager_and_lazy(f, x=X):
+    expected = ft.value_and_grad(f)(ft.Variable(x.copy()))
+    with ft.lazy():
+        got = ft.value_and_grad(f)(ft.Variable(x.copy()))
+    for e, g in zip(expected, got):
+        np.testing.assert_allclose(getattr(g, "np", g), getattr(e, "np", e))
+
+
+def test_grad_through_clip_of_an_intermediate():
+    _eager_and_lazy(lambda x: ft.sum(ft.clip(x * 2.0, -1.0, 2.0)))
+
+
+def test_grad_through_prod_of_an_intermediate():
+    _eager_and_lazy(lambda x: ft.prod(x * 2.0), np.array([1.5, -2.0, 0.5], dtype="float32"))
+    _eager_and_lazy(lambda x: ft.prod(x * 2.0))             # with a zero entry
+
+
+def test_comparisons_stay_lazy():
+    with ft.lazy():
+        y = (ft.Variable(X.copy()) * 2.0).np
+        mask = (y >= 0.0) & ~(y == 0.0)
+        assert mask.pending
+    np.testing.assert_array_equal(np.asarray(mask), [False, True, False, True])
+
+
+def test_only_referenced_values_are_materialized():
+    with ft.lazy():
+        a = ft.Variable(X.copy()) * 2.0
+        b = a + 1.0
+        c = b * 3.0
+    kept, out, dropped = a.np, c.np, weakref.ref(b.np)
+    del a, b, c
+    out.force()
+    assert not kept.pending                  # still referenced: stored too
+    np.testing.assert_allclose(np.asarray(kept), X * 2.0)
+    assert dropped() is None                 # only the graph held it
+
+
+class _Model(ft.nn.Cell):
+    def __init__(self):
+        super().__init__()
+        self.w = ft.Variable(np.ones((4, 3), dtype="float32"))
+        self.b = ft.Variable(np.zeros(3, dtype="float32"))
+
+    def call(self, x):
+        return ft.sum((x @ self.w + self.b) * 2.0 - 1.0)
+
+
+def _count_evaluations(monkeypatch):
+    calls = []
+    evaluate = runtime.evaluate
+    monkeypatch.setattr(runtime, "evaluate", lambda *a, **k: calls.append(1) or evaluate(*a, **k))
+    return calls
+
+
+def test_one_graph_evaluation_per_training_step(monkeypatch):
+    from faketensor.optimizers.gradient_descent import GradientDescent
+
+    model = _Model()
+    opt = GradientDescent(model)
+    x = ft.Variable(np.ones((2, 4), dtype="float32"))
+    x.freeze()
+    calls = _count_evaluations(monkeypatch)
+    for context in (nullcontext, ft.profile, ft.memory_stats):
+        for _ in range(2):          # the second step follows an in-place write
+            del calls[:]
+            with ft.lazy(), context():
+                loss, grads = ft.value_and_grad(lambda m: m(x))(model)
+            assert len(calls) == 1
+            opt.update(grads)
+
+
+def test_pending_view_of_a_written_buffer_is_not_stale():
+    w = ft.Variable(np.ones((2, 2), dtype="float32"))
+    w[...] = 2.0
+    other = ft.Variable(np.zeros(2, dtype="float32"))
+    other.freeze()
+
+    def f(w):
+        z = ft.transpose(w) * 3.0
+        other[...] = 1.0            # evaluates the pending transpose
+        return ft.sum(z)
+
+    with ft.lazy():
+        _, g = ft.value_and_grad(f)(w)
+    np.testing.assert_allclose(getattr(g, "np", g), np.full((2, 2), 3.0))
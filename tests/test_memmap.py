@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.ndarray import load, memmap
+
+
+def _data():
+    return np.arange(20.0).reshape(5, 4)
+
+
+@pytest.fixture
+def npy(tmp_path):
+    path = tmp_path / "x.npy"
+    np.save(path, _data())
+    return str(path)
+
+
+@pytest.fixture
+def raw(tmp_path):
+    path = tmp_path / "x.bin"
+    _data().astype("float32").tofile(path)
+    return str(path)
+
+
+def test_load_maps_the_file(npy):
+    x = load(npy)
+    assert isinstance(x.np, np.memmap)
+    assert x.shape == (5, 4) and x.np.dtype == np.float64
+    np.testing.assert_array_equal(x.np, _data())
+
+    eager = load(npy, mmap_mode=None)
+    assert not isinstance(eager.np, np.memmap)
+    np.testing.assert_array_equal(eager.np, _data())
+
+
+def test_memmap_reads_raw_files(raw):
+    x = memmap(raw, dtype="float32", shape=(5, 4))
+    assert isinstance(x.np, np.memmap) and x.np.dtype == np.float32
+    np.testing.assert_array_equal(x.np, _data())
+    # default dtype and shape: the whole file as uint8
+    assert memmap(raw).shape == (5 * 4 * 4,)
+    # offset skips the first row
+    tail = memmap(raw, dtype="float32", offset=4 * 4, shape=(4, 4))
+    np.testing.assert_array_equal(tail.np, _data()[1:])
+
+
+def test_slices_stay_mapped_and_advanced_keys_read_rows(npy):
+    x = load(npy)
+    view = x[1:3]
+    assert isinstance(view.np, np.memmap)
+    np.testing.assert_array_equal(view.np, _data()[1:3])
+
+    rows = x[np.array([4, 0, -1])]
+    assert not isinstance(rows.np, np.memmap)
+    np.testing.assert_array_equal(rows.np, _data()[[4, 0, -1]])
+    np.testing.assert_array_equal(ft.take(x, [3, 1], axis=0).np, _data()[[3, 1]])
+
+
+def test_grad_through_mapped_batches(npy):
+    x = load(npy)
+    w = ft.Variable(np.linspace(-1.0, 1.0, 4))
+    loss = lambda w, batch: ft.sum((batch @ w) ** 2.0)
+
+    for sl in (slice(0, 2), slice(2, 5)):
+        g = ft.grad(loss, argnum=0)(w, x[sl])
+        expected = ft.grad(loss, argnum=0)(w, _data()[sl])
+        np.testing.assert_allclose(g.np, expected.np)
+
+
+def test_grad_with_respect_to_mapped_values(npy):
+    g = ft.grad(lambda x: ft.sum(x[1:3] ** 2.0))(ft.Variable(load(npy)))
+    expected = np.zeros((5, 4))
+    expected[1:3] = 2.0 * _data()[1:3]
+    np.testing.assert_allclose(g.np, expected)
+
+
+def test_writes_to_read_only_maps_raise(npy, raw):
+    for x in (load(npy), memmap(raw, dtype="float32", shape=(5, 4))):
+        with pytest.raises(ValueError, match="read-only"):
+            x[0] = 1.0
+        with pytest.raises(ValueError, match="read-only"):
+            x += 1.0
+    np.testing.assert_array_equal(load(npy).np, _data())
+
+
+def test_writable_modes(npy, raw):
+    x = load(npy, mmap_mode="r+")
+    x[0] = -1.0
+    x.np.flush()
+    assert (np.load(npy)[0] == -1.0).all()
+
+    c = memmap(raw, dtype="float32", mode="c", shape=(5, 4))
+    c[1] = -1.0
+    assert (c.np[1] == -1.0).all()
+    np.testing.assert_array_equal(np.fromfile(raw, dtype="float32").reshape(5, 4), _data())
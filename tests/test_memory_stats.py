@@ -0,0 +1,89 @@
+import numpy as np
+
+import faketensor as ft
+from faketensor.src.base import tape
+
+
+def _args():
+    return ft.Variable(np.linspace(1.0, 2.0, 100)), ft.Variable(np.linspace(2.0, 3.0, 100))
+
+
+def _f(x, w):
+    return ft.sum(ft.log(x * w))
+
+
+def _passes(f, *args, **kwargs):
+    with ft.memory_stats(**kwargs) as stats:
+        ft.value_and_grad(f)(*args)
+    return stats
+
+
+def test_fields_of_one_pass():
+    stats = _passes(_f, *_args())
+    assert len(stats.passes) == 1
+    p = stats.passes[0]
+    assert set(p) == {
+        "nodes", "nodes_by_op", "output_bytes", "retained_bytes",
+        "largest", "live_nodes", "peak_grad_bytes",
+    }
+    assert p["nodes"] == p["live_nodes"] == 3
+    assert p["nodes_by_op"] == {"multiply": 1, "log": 1, "sum": 1}
+    # outputs: x * w, its log and the scalar; retained adds x and w
+    assert p["output_bytes"] == 800 + 800 + 8
+    assert p["retained_bytes"] == p["output_bytes"] + 2 * 800
+    # gradients of both (100,) leaves plus the one in flight
+    assert 2 * 800 <= p["peak_grad_bytes"] <= 4 * 800
+
+
+def test_largest_is_sorted_and_limited_by_top():
+    p = _passes(_f, *_args(), top=2).passes[0]
+    assert len(p["largest"]) == 2
+    for t in p["largest"]:
+        assert set(t) == {"op", "shape", "dtype", "bytes"}
+        assert t["shape"] == (100,) and t["dtype"] == "float64" and t["bytes"] == 800
+    ops = {t["op"] for t in _passes(_f, *_args(), top=10).passes[0]["largest"]}
+    assert ops == {"multiply", "log", "sum", "input"}
+
+
+def test_views_are_charged_to_their_base_once():
+    x, _ = _args()
+    p = _passes(lambda x: ft.sum(x[:50] * x[50:] + x[::2]), x).passes[0]
+    assert p["nodes_by_op"]["getitem"] == 3
+    # x is counted once although three nodes hold views of it
+    assert p["retained_bytes"] == 800 + 2 * 400 + 8
+    assert [t["bytes"] for t in p["largest"] if t["shape"] == (100,)] == [800]
+
+
+def test_live_nodes_exclude_pruned_branches():
+    def f(x):
+        ft.log(x)           # recorded, but the output does not depend on it
+        return ft.sum(x * x)
+
+    p = _passes(f, _args()[0]).passes[0]
+    assert p["nodes_by_op"]["log"] == 1
+    assert p["live_nodes"] < p["nodes"]
+
+
+def test_one_pass_per_backward_and_a_report_per_pass():
+    stats = _passes(lambda x: ft.sum(ft.grad(lambda x: ft.sum(x ** 3.0))(x)), _args()[0])
+    assert len(stats.passes) == 2
+    report = stats.report()
+    assert report.count("pass ") == 2 and "nodes by op:" in report
+
+
+def test_collection_stops_with_the_block():
+    with ft.memory_stats() as stats:
+        pass
+    ft.grad(_f)(*_args())
+    assert stats.passes == []
+
+
+def test_tape_stats_match_the_recorded_nodes():
+    x, w = _args()
+    with tape() as t:
+        t.track(x)
+        t.track(w)
+        _f(x, w)
+        s = t.stats()
+    assert s["nodes"] == len(t) == 3
+    assert s["retained_bytes"] == 3208
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src import base
+
+
+def _args():
+    return ft.Variable(np.linspace(1.0, 2.0, 100)), ft.Variable(np.linspace(2.0, 3.0, 100))
+
+
+def _f(x, w):
+    return ft.sum(ft.log(x * w))
+
+
+def _profiled():
+    with ft.profile() as prof:
+        ft.value_and_grad(_f)(*_args())
+    return prof
+
+
+def test_per_primitive_counts():
+    calls = {(r["name"], r["phase"]): r["calls"] for r in _profiled().summary()}
+    for name in ("multiply", "log", "sum"):
+        assert calls[(name, "forward")] == 1
+        assert calls[("grad:" + name, "backward")] == 1
+    # primitives called by grad rules are charged to the backward phase
+    assert not {n for n, phase in calls if phase == "forward"} - {"multiply", "log", "sum"}
+
+
+def test_forward_events_describe_their_outputs():
+    events = {e.name: e for e in _profiled().events if e.phase == "forward"}
+    assert events["multiply"].shape == (100,) and events["multiply"].dtype == "float64"
+    assert events["multiply"].nbytes == 800
+    assert events["sum"].shape == () and events["sum"].nbytes == 8
+
+
+def test_grad_rules_nest_the_primitives_they_call():
+    prof = _profiled()
+    for e in prof.events:
+        assert e.duration >= e.self_time >= 0
+        if e.name.startswith("grad:"):
+            assert e.depth == 0 and e.nbytes == 0
+    children = [e for e in prof.events if e.phase == "backward" and e.depth == 1]
+    assert children
+    rules = [e for e in prof.events if e.name.startswith("grad:")]
+    for c in children:
+        assert any(r.start <= c.start <= r.start + r.duration for r in rules)
+
+
+def test_chrome_trace_structure(tmp_path):
+    prof = _profiled()
+    path = tmp_path / "trace.json"
+    prof.export_chrome_trace(str(path))
+    with open(path) as f:
+        trace = json.load(f)
+
+    assert trace == json.loads(json.dumps(prof.chrome_trace()))
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    assert len(events) == len(prof.events)
+    assert [e["ts"] for e in events] == sorted(e["ts"] for e in events)
+    for e in events:
+        assert set(e) == {"name", "cat", "ph", "ts", "dur", "pid", "tid", "args"}
+        assert e["ph"] == "X" and e["cat"] in ("forward", "backward")
+        assert e["ts"] >= 0 and e["dur"] >= 0
+        assert set(e["args"]) == {"shape", "dtype", "bytes"}
+    by_name = {e["name"]: e for e in events}
+    assert by_name["log"]["args"] == {"shape": "(100,)", "dtype": "float64", "bytes": 800}
+
+
+def test_hooks_are_removed_on_exit():
+    with ft.profile() as prof:
+        ft.log(np.ones(3))
+        assert base.PROFILER is prof
+        with pytest.raises(RuntimeError):
+            ft.profile().__enter__()
+    n = len(prof.events)
+    ft.log(np.ones(3))
+    assert base.PROFILER is None and len(prof.events) == n == 1
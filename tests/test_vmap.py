@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import faketensor as ft
+from faketensor.src.array import NDarray
+
+
+def _raw(x):
+    return getattr(x, "np", x)
+
+
+def _loop(f, args, in_axes, out_axis=0):
+    """Reference: call `f` per example and stack the results along `out_axis`."""
+    size = next(a.shape[ax] for a, ax in zip(args, in_axes) if ax is not None)
+    outs = []
+    for i in range(size):
+        ex = [a if ax is None else np.take(a, i, axis=ax) for a, ax in zip(args, in_axes)]
+        outs.append(_raw(f(*ex)))
+    return np.stack(outs, axis=out_axis)
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(5, 3, 4)), rng.normal(size=(4, 2))
+
+
+def _f(x, w):
+    return ft.sum(ft.log(ft.abs(x @ w) + 1.0), axis=0) * ft.mean(x)
+
+
+@pytest.mark.parametrize("in_axis", [0, 1, 2, -1])
+def test_in_axes_match_a_python_loop(in_axis):
+    xs, w = _data()
+    xs = np.moveaxis(xs, 0, in_axis)
+    out = ft.vmap(_f, in_axes=(in_axis, None))(xs, w)
+    assert isinstance(out, NDarray)
+    np.testing.assert_allclose(_raw(out), _loop(_f, (xs, w), (in_axis, None)), rtol=1e-12)
+
+
+def test_two_batched_arguments_match_a_python_loop():
+    xs, _ = _data()
+    ws = np.random.default_rng(1).normal(size=(4, 2, 5))
+    out = ft.vmap(_f, in_axes=(0, 2))(xs, ws)
+    np.testing.assert_allclose(_raw(out), _loop(_f, (xs, ws), (0, 2)), rtol=1e-12)
+
+
+@pytest.mark.parametrize("out_axis", [0, 1, 2, -1])
+def test_out_axes_match_a_python_loop(out_axis):
+    xs, w = _data()
+    f = lambda x: x @ w
+    out = ft.vmap(f, out_axes=out_axis)(xs)
+    np.testing.assert_allclose(_raw(out), _loop(f, (xs,), (0,), out_axis), rtol=1e-12)
+
+
+def test_per_output_out_axes_and_unbatched_outputs():
+    xs, w = _data()
+    s, y, c = ft.vmap(lambda x: (ft.sum(x), x * 2.0, ft.sum(w)), out_axes=(0, 2, 0))(xs)
+    np.testing.assert_allclose(s.np, xs.sum(axis=(1, 2)))
+    np.testing.assert_allclose(_raw(y), np.moveaxis(xs * 2.0, 0, 2))
+    # an output that ignores the batch is broadcast over it
+    np.testing.assert_allclose(c.np, np.full(5, w.sum()))
+
+
+def test_vmap_of_grad_matches_per_example_grads():
+    xs, w = _data()
+    ys = np.random.default_rng(2).normal(size=(5, 3, 2))
+    loss = lambda w, x, y: ft.sum((x @ w - y) ** 2.0)
+    w = ft.Variable(w)
+
+    g = ft.vmap(ft.grad(loss, argnum=0), in_axes=(None, 0, 0))(w, xs, ys)
+    expected = np.stack([ft.grad(loss, argnum=0)(w, x, y).np for x, y in zip(xs, ys)])
+    assert g.shape == (5,) + w.shape
+    np.testing.assert_allclose(g.np, expected, rtol=1e-12)
+
+
+_IDX = np.array([2, -1, 0, 0])
+_GATHER = np.array([[0, 2, 1, 1], [2, 2, 0, 1]])
+
+_INDEXING = {
+    "take": lambda x: ft.take(x, _IDX, axis=1),
+    "take_flat": lambda x: ft.take(x, _IDX),
+    "gather": lambda x: ft.gather(x, _GATHER, axis=0),
+    "advanced": lambda x: x[[0, -1, 0]],
+    "mixed": lambda x: x[1:, _IDX],
+    "basic": lambda x: x[:, 1:3][-1],
+}
+
+
+@pytest.mark.parametrize("name", sorted(_INDEXING))
+def test_indexing_matches_a_python_loop(name):
+    f = _INDEXING[name]
+    xs, _ = _data()
+    out = ft.vmap(f)(xs)
+    np.testing.assert_allclose(_raw(out), _loop(f, (xs,), (0,)))
+
+
+@pytest.mark.parametrize("name", sorted(_INDEXING))
+def test_vmap_of_grad_through_indexing(name):
+    f = _INDEXING[name]
+    loss = lambda x: ft.sum(f(x) ** 2.0)
+    xs, _ = _data()
+    g = ft.vmap(ft.grad(loss))(ft.Variable(xs))
+    expected = np.stack([ft.grad(loss)(ft.Variable(x)).np for x in xs])
+    np.testing.assert_allclose(g.np, expected)